@@ -1,7 +1,7 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-from src.utils.permissions import is_bot_admin, add_bot_master, add_bot_editor, load_permissions, save_permissions, save_permissions_from_bot_roles
+from src.utils.permissions import is_bot_admin, add_bot_master, add_bot_editor, load_permissions, save_permissions, queue_bot_roles_save
 from src.utils.path_manager import get_application_path
 import os
 import json
@@ -36,11 +36,11 @@ class AdminCog(commands.Cog):
     def save_bot_roles(self, bot_roles):
         """Speichert die Bot-Rollen über das einheitliche verschlüsselte System"""
         try:
-            # Verwende das einheitliche Permission-System
-            success = save_permissions_from_bot_roles(bot_roles)
+            # Verwende das einheitliche Permission-System (Speichern im Hintergrund-Thread)
+            success = queue_bot_roles_save(bot_roles)
             
             if success:
-                logging.info(f"🔐 Bot-Rollen sicher gespeichert: {len(bot_roles)} Server")
+                logging.info(f"🔐 Bot-Rollen zum sicheren Speichern vorgemerkt: {len(bot_roles)} Server")
                 return True
             else:
                 logging.error("❌ Fehler beim Speichern der Bot-Rollen")
@@ -426,12 +426,7 @@ class AdminCog(commands.Cog):
                 return
             
             # Archivierte Messages für diesen Server laden
-            archived_messages = sticky_cog.load_archived_sticky_messages()
-            server_archives = {}
-            
-            for channel_id, data in archived_messages.items():
-                if data.get('guild_id') == interaction.guild.id:
-                    server_archives[channel_id] = data
+            server_archives = sticky_cog.load_archived_sticky_messages(interaction.guild.id)
             
             if not server_archives:
                 await interaction.followup.send(
@@ -139,7 +139,7 @@ class Events(commands.Cog):
                            f"{masters_count} Masters, {editors_count} Editors entfernt")
             
             # 2. Sticky Messages für diesen Server löschen
-            sticky_cog = self.bot.get_cog('Sticky')
+            sticky_cog = self.bot.get_cog('StickyCog')
             if sticky_cog:
                 removed_count = await sticky_cog.cleanup_server_data(guild.id)
                 if removed_count > 0:
@@ -180,20 +180,5 @@ class Events(commands.Cog):
         except Exception as e:
             logging.error(f"❌ Fehler beim Bereinigen von Member-Berechtigungen: {e}")
 
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        """Wird bei jeder neuen Nachricht ausgeführt"""
-        # Ignoriere Bot-Nachrichten
-        if message.author.bot:
-            return
-        
-        # Sticky Message Handler
-        try:
-            sticky_cog = self.bot.get_cog('Sticky')
-            if sticky_cog:
-                await sticky_cog.handle_message_for_sticky(message)
-        except Exception as e:
-            logging.error(f"❌ Fehler beim Sticky Message Handling: {e}")
-
 async def setup(bot):
     await bot.add_cog(Events(bot))
\ No newline at end of file
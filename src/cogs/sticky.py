@@ -1,116 +1,325 @@
 import discord
-import random
-import aiohttp
 from discord import app_commands
 from discord.ext import commands
 from src.utils.permissions import is_bot_editor, is_bot_admin
-from src.utils.secure_storage import load_sticky_messages_secure, save_sticky_messages_secure
+from src.utils.sticky_store import StickyStore
+from src.utils.sticky_embeds import StickyEmbedCache
+from src.utils.pokemon_images import PokemonImageProvider, PokemonPrefetchPool
+from src.utils.sticky_scheduler import StickyScheduler
+from src.utils.channel_activity import ChannelActivity, adaptive_delay
+from src.utils.sticky_trigger import MIN_DELAY, MIN_MESSAGE_COUNT, apply_trigger, format_trigger, describe_trigger
+from src.utils.message_router import get_message_router
+from src.utils.repost_pipeline import RepostPipeline
+from src.utils.sticky_cleanup import (
+    CLEANUP_INTERVAL,
+    RECONCILE_CONCURRENCY,
+    find_sticky_messages,
+    is_sticky_message,
+    bulk_delete,
+    run_bounded,
+    with_jitter
+)
+from src.utils.request_scheduler import (
+    get_request_scheduler,
+    PRIORITY_INTERACTION,
+    PRIORITY_REPOST,
+    PRIORITY_CLEANUP
+)
+from src.utils.secure_storage import (
+    UNASSIGNED_GUILD,
+    load_archived_sticky_messages_secure,
+    save_archived_sticky_messages_secure,
+    add_archived_sticky_messages_secure,
+    delete_archived_sticky_messages_secure,
+    delete_expired_archives_secure
+)
 from src.config.config import STICKY_FILE
 from src.ui.modals import StickyModal
 import asyncio
 import datetime
 import logging
+import time
 import os
 import json
+from typing import Optional
 
 # Logging konfigurieren
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# Bearbeitungs-Modus: maximale Anzahl Nachrichten unter der Sticky, bis sie neu gesendet wird
+DEFAULT_EDIT_DISTANCE = 3
+
+# Wartezeit bis zum erneuten Versuch, wenn ein Repost fällig wird während der Channel noch bearbeitet wird
+BUSY_RETRY_DELAY = 1.0
+
 class StickyCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.bot_token = getattr(bot, 'token', None)  # Bot-Token für sichere Speicherung
-        self.sticky_messages = load_sticky_messages_secure(self.bot_token)
+        self.store = StickyStore(self.bot_token)  # Autoritativer In-Memory Store (geladen in cog_load)
+        self.embed_cache = StickyEmbedCache()  # Vorgerenderte Embeds pro Channel
+        self.pokemon_images = PokemonImageProvider()  # Thumbnails aus dem Pokémon-Index
+        self.pokemon_pool = PokemonPrefetchPool(self.pokemon_images)  # Geprüfte Thumbnails zum Senden
+        self.scheduler = StickyScheduler(self.repost_sticky)  # Alle ausstehenden Reposts
+        self.activity = ChannelActivity()  # Nachrichtenrate pro Channel (adaptive Verzögerung)
+        self.message_counts = {}  # channel_id -> neue Nachrichten seit der letzten Sticky
+        self._triggered_at = {}  # channel_id -> Zeitpunkt der auslösenden Nachricht des geplanten Reposts
         self.last_sent_time = {}
-        self.last_message = {}
         self.processing_channels = set()
-        self.sticky_tasks = {}
+        self._repost_again = set()  # Channels, deren Repost fällig wurde während sie bearbeitet wurden
+        self.repost_counters = {"sent": 0, "edited": 0, "skipped": 0}  # Übersprungen: Sticky war noch die letzte Nachricht
+        self.repost_stats = {}  # channel_id -> {"sent", "edited", "skipped"} seit dem Start
+        # channel_id -> IDs der noch vorhandenen Nachrichten unter der Sticky, auch von Bots (unbekannt nach Neustart)
+        self.below_sticky = {}
+        self.requests = get_request_scheduler(bot)  # Alle API-Aufrufe mit Priorität und Budget
+        self.repost_pipeline = RepostPipeline(self.requests)  # Löschen und Senden parallel, Latenz pro Stufe
+        self._watch_task = None
+        self._maintenance_task = None
+
+    async def cog_load(self):
+        """Lädt den Store und registriert den Message-Handler, startet Scheduler, GUI-Abgleich und Thumbnail-Prefetch"""
+        await self.load_sticky_messages()
+        # Nur Nachrichten in Sticky-Channels erreichen die Handler (Set-Lookup im Router)
+        router = get_message_router(self.bot)
+        router.add_route("sticky_distance", self.track_message_below, self.store, include_bots=True)
+        router.add_route("sticky", self.handle_message_for_sticky, self.store)
+        self.scheduler.start()
+        self._watch_task = asyncio.create_task(self._watch_store())
+        self.pokemon_images.start_refresh()
+        self.pokemon_pool.start()
+        self._maintenance_task = asyncio.create_task(self._maintenance_loop())
+
+    async def cog_unload(self):
+        """Schreibt ausstehende Änderungen bevor der Cog entladen wird"""
+        router = get_message_router(self.bot)
+        router.remove_route("sticky")
+        router.remove_route("sticky_distance")
+        logging.info(f"📨 Message-Router: {router.stats()}")
+        for task in (self._watch_task, self._maintenance_task):
+            if task and not task.done():
+                task.cancel()
+        await self.scheduler.stop()
+        await asyncio.to_thread(self.store.flush)
+        await self.pokemon_pool.stop()
+        logging.info(f"🖼️ Thumbnail-Prefetch: {self.pokemon_pool.stats()}")
+        logging.info(f"📌 Sticky Reposts: {self.repost_counters}")
+        await self.repost_pipeline.close()
+        logging.info(f"⏱️ Repost-Pipeline: {self.repost_pipeline.stats()}")
+        logging.info(f"🚦 Discord-Anfragen: {self.requests.stats()}")
+        await self.pokemon_images.close()
 
-    def save_sticky_messages(self):
-        """Speichert Sticky Messages verschlüsselt"""
+    @property
+    def sticky_messages(self):
+        """Aktive Sticky Messages aus dem In-Memory Store"""
+        return self.store.data
+
+    def save_sticky_messages(self, *channel_ids):
+        """Merkt Sticky Messages zum verschlüsselten Speichern im Hintergrund vor (mit Channel IDs nur diese als Journal-Einträge)"""
         try:
-            save_sticky_messages_secure(self.sticky_messages, self.bot_token)
-            logging.info("🔐 Sticky Messages sicher gespeichert")
+            # Geänderte Channels brauchen ein neu gerendertes Embed
+            self.embed_cache.invalidate(*channel_ids)
+            self.store.save(*channel_ids)
+            logging.info("🔐 Sticky Messages zum sicheren Speichern vorgemerkt")
         except Exception as e:
             logging.error(f"❌ Fehler beim sicheren Speichern: {e}")
             # Fallback auf alte Methode
             from src.utils.db_manager import save_json_file
-            save_json_file(STICKY_FILE, self.sticky_messages)
+            save_json_file(STICKY_FILE, self.sticky_messages.to_dict())
         
-    def reload_sticky_messages(self):
-        """Lädt Sticky Messages neu - für GUI-Kompatibilität"""
+    async def reload_sticky_messages(self):
+        """Lädt Sticky Messages nur neu wenn die Datei geändert wurde - für GUI-Kompatibilität"""
         try:
-            self.sticky_messages = load_sticky_messages_secure(self.bot_token)
-            logging.debug("🔐 Sticky Messages sicher geladen")
+            # Prüfung im Event Loop blockiert nicht - Journal-Lock und Entschlüsselung im Thread
+            if not self.store.needs_refresh():
+                return
+            loaded = await asyncio.to_thread(self.store.load_changes)
+            if self.store.apply_changes(loaded):
+                logging.debug("🔐 Sticky Messages sicher geladen")
         except Exception as e:
             logging.error(f"❌ Fehler beim sicheren Laden: {e}")
             # Fallback auf alte Methode
             from src.utils.db_manager import load_json_file
-            self.sticky_messages = load_json_file(STICKY_FILE, {})
+            self.sticky_messages.clear()
+            self.sticky_messages.update(load_json_file(STICKY_FILE, {}))
+            self.store.rebuild_index()
+
+    async def _watch_store(self):
+        """Übernimmt GUI-Änderungen im Prüfintervall des Stores (statt bei jeder Nachricht)"""
+        while True:
+            await asyncio.sleep(self.store.check_interval)
+            await self.reload_sticky_messages()
+
+    async def _maintenance_loop(self):
+        """Gleicht beim Start alle Sticky-Channels ab und entfernt danach regelmäßig doppelte Stickies"""
+        await self.bot.wait_until_ready()
+        try:
+            await self.reconcile_sticky_channels()
+        except Exception as e:
+            logging.error(f"❌ Fehler beim Sticky-Abgleich: {e}")
+        while True:
+            await self.cleanup_duplicate_stickies()
+            await asyncio.sleep(CLEANUP_INTERVAL)
+
+    def status_log(self, message):
+        """Meldung ins Log und - falls die GUI läuft - in den Status-Tab"""
+        logging.info(message)
+        hook = getattr(self.bot, 'status_log', None)
+        if hook:
+            hook(message)
+
+    async def reconcile_sticky_channels(self):
+        """
+        Prüft beim Start alle Sticky-Channels (begrenzte Parallelität, zeitlich gestreut)
+        und sendet die Sticky nur dort neu, wo sie fehlt oder verdeckt ist
+
+        Returns:
+            dict: Anzahl Channels je Ergebnis ('ok', 'reposted', 'count_only', 'busy', 'missing_channel', 'failed')
+        """
+        channel_ids = list(self.sticky_messages)
+        total = len(channel_ids)
+        if not total:
+            return {}
+
+        self.status_log(f"🔄 Sticky-Abgleich gestartet: {total} Channels")
+        start = time.monotonic()
+        results = {'ok': 0, 'reposted': 0, 'count_only': 0, 'busy': 0, 'missing_channel': 0, 'failed': 0}
+        progress_step = max(1, total // 10)
+        done = 0
+
+        async def reconcile(channel_id):
+            nonlocal done
+            try:
+                outcome = await self._reconcile_channel(channel_id)
+            except Exception as e:
+                logging.error(f"❌ Abgleich für Channel {channel_id} fehlgeschlagen: {e}")
+                outcome = 'failed'
+            results[outcome] += 1
+            done += 1
+            if done % progress_step == 0 and done < total:
+                self.status_log(f"🔄 Sticky-Abgleich: {done}/{total} Channels geprüft")
+
+        await run_bounded(channel_ids, with_jitter(reconcile), RECONCILE_CONCURRENCY)
+
+        self.status_log(
+            f"✅ Sticky-Abgleich abgeschlossen in {time.monotonic() - start:.1f}s: "
+            f"{results['ok']} aktuell, {results['reposted']} neu gesendet, "
+            f"{results['count_only']} warten auf Nachrichtenanzahl, {results['busy']} bereits in Bearbeitung, "
+            f"{results['missing_channel']} nicht gefunden, {results['failed']} Fehler"
+        )
+        return results
+
+    async def _reconcile_channel(self, channel_id):
+        """Prüft die gespeicherte Sticky-ID eines Channels und sendet bei Bedarf neu"""
+        sticky_config = self.sticky_messages.get(channel_id)
+        channel = self.bot.get_channel(int(channel_id))
+        if not sticky_config or not channel:
+            return 'missing_channel'
+
+        # last_message_id des Channels kommt vom Gateway - kein API-Aufruf nötig
+        if self.is_sticky_latest(channel, channel_id, self.store.message_id(channel_id)):
+            self.below_sticky[channel_id] = set()
+            return 'ok'
+
+        if not sticky_config.get("delay") and sticky_config.get("message_count"):
+            # Nur Nachrichtenanzahl: Repost erst nach N neuen Nachrichten, nicht beim Start
+            return 'count_only'
+
+        # Fehlt oder verdeckt: ein evtl. geplanter Repost wird hiermit vorgezogen
+        self.scheduler.cancel(channel_id)
+        outcome = await self.repost_sticky(channel_id)
+        if outcome in ('sent', 'edited'):
+            return 'reposted'
+        if outcome == 'latest':
+            return 'ok'
+        if outcome == 'missing':
+            return 'missing_channel'
+        return outcome
+
+    async def cleanup_duplicate_stickies(self):
+        """
+        Sucht in allen Sticky-Channels nach veralteten Stickies und löscht sie per Bulk Delete
+
+        Returns:
+            int: Anzahl gelöschter Nachrichten
+        """
+        start = time.monotonic()
+        results = await run_bounded(list(self.sticky_messages), self._cleanup_channel_duplicates)
+        deleted = sum(result for result in results if isinstance(result, int))
+        for result in results:
+            if isinstance(result, Exception):
+                logging.error(f"❌ Fehler beim Aufräumen doppelter Stickies: {result}")
+        if deleted:
+            logging.info(f"🧹 {deleted} doppelte Sticky Messages gelöscht ({time.monotonic() - start:.1f}s)")
+        return deleted
+
+    async def _cleanup_channel_duplicates(self, channel_id):
+        """Löscht alle Stickies eines Channels außer der aktuellen"""
+        channel = self.bot.get_channel(int(channel_id))
+        sticky_config = self.sticky_messages.get(channel_id)
+        if not channel or not sticky_config or channel_id in self.processing_channels:
+            return 0
+
+        sticky_ids = await find_sticky_messages(channel, self.bot.user, self.requests)
+        if not sticky_ids:
+            return 0
+
+        # Aktuellen Stand erst jetzt lesen - ein Repost kann während der Suche gelaufen sein
+        current_id = self.store.message_id(channel_id)
+        if not current_id:
+            # Keine ID gespeichert: neueste Sticky behalten und merken
+            current_id = sticky_ids[0]
+            self.remember_sticky_message(channel_id, current_id)
+        current_id = int(current_id)
+
+        # Nur ältere Stickies löschen - neuere stammen von einem laufenden Repost
+        stale_ids = [message_id for message_id in sticky_ids if message_id < current_id]
+        if not stale_ids or channel_id in self.processing_channels:
+            return 0
+        return await bulk_delete(channel, stale_ids, self.requests)
 
     async def load_sticky_messages(self):
-        """Lädt Sticky Messages beim Bot-Start - Async Wrapper"""
+        """Lädt Sticky Messages beim Bot-Start - Laden und Entschlüsseln im Thread"""
         try:
-            self.sticky_messages = load_sticky_messages_secure(self.bot_token)
+            loaded = await asyncio.to_thread(self.store.load_changes, True)
+            self.store.apply_changes(loaded)
             logging.info(f"✅ {len(self.sticky_messages)} Sticky Messages geladen")
         except Exception as e:
             logging.error(f"❌ Fehler beim Laden der Sticky Messages: {e}")
             # Fallback auf alte Methode
             from src.utils.db_manager import load_json_file
-            self.sticky_messages = load_json_file(STICKY_FILE, {})
+            self.sticky_messages.clear()
+            self.sticky_messages.update(load_json_file(STICKY_FILE, {}))
+            self.store.rebuild_index()
             logging.info(f"✅ {len(self.sticky_messages)} Sticky Messages über Fallback geladen")
 
-    async def get_random_pokemon_image(self):
-        try:
-            async with aiohttp.ClientSession() as session:
-                pokemon_id = random.randint(1, 898)
-                headers = {
-                    'User-Agent': 'StickyBot/1.0'
-                }
-                
-                async with session.get(f'https://pokeapi.co/api/v2/pokemon/{pokemon_id}', headers=headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        
-                        shiny_image = (
-                            data['sprites']['other']['official-artwork'].get('front_shiny') or
-                            data['sprites']['other']['official-artwork'].get('front_default') or
-                            data['sprites'].get('front_shiny') or
-                            data['sprites'].get('front_default')
-                        )
-                        
-                        if not shiny_image:
-                            raise ValueError('Kein Artwork gefunden')
-
-                        pokemon_name = data['name'].capitalize()
-                        return {
-                            'url': shiny_image,
-                            'name': pokemon_name
-                        }
-
-        except Exception as e:
-            logging.error(f"Fehler beim Abrufen des Pokémon-Bildes: {e}")
-            return None
+    async def respond(self, interaction, *args, **kwargs):
+        """Interaction-Antwort über den Request-Scheduler (höchste Priorität)"""
+        return await self.requests.submit(
+            lambda: interaction.response.send_message(*args, **kwargs), PRIORITY_INTERACTION
+        )
 
+    def get_random_pokemon_image(self):
+        """Zufälliges Pokémon-Artwork aus dem Prefetch-Pool (keine Netzwerkanfrage beim Senden)"""
+        return self.pokemon_pool.take()
 
     @app_commands.command(name="set_sticky", description="Erstellt eine Sticky-Nachricht")
     async def set_sticky(self, interaction: discord.Interaction):
         if not (is_bot_admin(interaction.user.id, interaction.guild.id) or 
                 is_bot_editor(interaction.user.id, interaction.guild.id)):
-            await interaction.response.send_message(
+            await self.respond(interaction,
                 "Du hast keine Berechtigung für diesen Befehl!",
                 ephemeral=True
             )
             return
 
-        modal = StickyModal(self.sticky_messages)
-        await interaction.response.send_modal(modal)
+        modal = StickyModal(self.sticky_messages, on_save=self.save_sticky_messages)
+        await self.requests.submit(lambda: interaction.response.send_modal(modal), PRIORITY_INTERACTION)
 
     @app_commands.command(name="edit_sticky", description="Bearbeitet die Sticky-Nachricht des aktuellen Kanals")
     async def edit_sticky(self, interaction: discord.Interaction):
         if not (is_bot_admin(interaction.user.id, interaction.guild.id) or 
                 is_bot_editor(interaction.user.id, interaction.guild.id)):
-            await interaction.response.send_message(
+            await self.respond(interaction,
                 "Du hast keine Berechtigung für diesen Befehl!",
                 ephemeral=True
             )
@@ -118,7 +327,7 @@ class StickyCog(commands.Cog):
 
         channel_id = str(interaction.channel.id)
         if channel_id not in self.sticky_messages:
-            await interaction.response.send_message(
+            await self.respond(interaction,
                 "In diesem Kanal gibt es keine Sticky-Nachricht zum Bearbeiten.",
                 ephemeral=True
             )
@@ -127,27 +336,30 @@ class StickyCog(commands.Cog):
         current_sticky = self.sticky_messages[channel_id]
         modal = StickyModal(
             self.sticky_messages,
+            on_save=self.save_sticky_messages,
             title="Sticky Nachricht bearbeiten",
             default_title=current_sticky["title"],
             default_message=current_sticky["message"],
-            default_time=current_sticky["delay"],
+            default_time=format_trigger(current_sticky),
             default_example=current_sticky.get("example", ""), 
             default_footer=current_sticky.get("footer", "")     
         )
-        await interaction.response.send_modal(modal)
+        await self.requests.submit(lambda: interaction.response.send_modal(modal), PRIORITY_INTERACTION)
 
     @app_commands.command(name="sticky_list", description="Zeigt alle aktiven Sticky-Nachrichten")
     async def sticky_list(self, interaction: discord.Interaction):
         if not (is_bot_admin(interaction.user.id, interaction.guild.id) or 
                 is_bot_editor(interaction.user.id, interaction.guild.id)):
-            await interaction.response.send_message(
+            await self.respond(interaction,
                 "Du hast keine Berechtigung für diesen Befehl!",
                 ephemeral=True
             )
             return
 
-        if not self.sticky_messages:
-            await interaction.response.send_message("Es gibt derzeit keine aktiven Sticky-Nachrichten.")
+        # Nur die Sticky-Nachrichten dieses Servers (Guild-Index)
+        channel_ids = self.store.channels_for_guild(interaction.guild.id)
+        if not channel_ids:
+            await self.respond(interaction, "Es gibt derzeit keine aktiven Sticky-Nachrichten.")
             return
 
         embed = discord.Embed(
@@ -156,26 +368,34 @@ class StickyCog(commands.Cog):
             color=discord.Color.green()
         )
 
-        for channel_id, data in self.sticky_messages.items():
-            channel_name = data.get("channel_name", "Unbekannter Kanal")
-            delay = data.get("delay", 20)
-            title = data.get("title", "Kein Titel")
+        for channel_id in sorted(channel_ids):
+            # Kurzinfo aus dem Index - der Eintrag selbst bleibt verschlüsselt
+            data = self.store.summary(channel_id)
+            channel_name = data.get("channel_name") or "Unbekannter Kanal"
+            title = data.get("title") or "Kein Titel"
             
-            value = f"Titel: {title}\nVerzögerung: {delay} Sekunden"
+            value = f"Titel: {title}\nVerzögerung: {describe_trigger(data)}"
+            adaptive = data.get("adaptive_delay")
+            if adaptive:
+                value += f" (adaptiv {adaptive['min_delay']}-{adaptive['max_delay']} Sekunden)"
             embed.add_field(
                 name=f"#{channel_name}",
                 value=value,
                 inline=False
             )
 
-        await interaction.response.send_message(embed=embed)
+        await self.respond(interaction, embed=embed)
 
     @app_commands.command(name="update_sticky_time", description="Ändert die Verzögerung einer Sticky-Nachricht")
-    @app_commands.describe(seconds="Neue Verzögerung in Sekunden")
-    async def update_sticky_time(self, interaction: discord.Interaction, seconds: int):
+    @app_commands.describe(
+        seconds="Neue Verzögerung in Sekunden (0 = nur Nachrichtenanzahl)",
+        messages="Repost nach so vielen neuen Nachrichten (was zuerst eintritt, 0 = aus)"
+    )
+    async def update_sticky_time(self, interaction: discord.Interaction, seconds: int,
+                                 messages: Optional[int] = None):
         if not (is_bot_admin(interaction.user.id, interaction.guild.id) or 
                 is_bot_editor(interaction.user.id, interaction.guild.id)):
-            await interaction.response.send_message(
+            await self.respond(interaction,
                 "Du hast keine Berechtigung für diesen Befehl!",
                 ephemeral=True
             )
@@ -183,25 +403,169 @@ class StickyCog(commands.Cog):
 
         channel_id = str(interaction.channel.id)
         if channel_id not in self.sticky_messages:
-            await interaction.response.send_message("Es gibt keine Sticky-Nachricht in diesem Kanal.")
+            await self.respond(interaction, "Es gibt keine Sticky-Nachricht in diesem Kanal.")
             return
 
-        if seconds < 5:
-            await interaction.response.send_message("Die minimale Verzögerung beträgt 5 Sekunden.")
+        if messages is None:
+            # Ohne Angabe bleibt die bisherige Nachrichtenanzahl bestehen
+            messages = self.sticky_messages[channel_id].get("message_count")
+
+        if messages and messages < MIN_MESSAGE_COUNT:
+            await self.respond(interaction, f"Die minimale Nachrichtenanzahl beträgt {MIN_MESSAGE_COUNT}.")
+            return
+
+        if seconds < MIN_DELAY and not (seconds == 0 and messages):
+            await self.respond(interaction, f"Die minimale Verzögerung beträgt {MIN_DELAY} Sekunden.")
             return
 
         try:
-            self.sticky_messages[channel_id]["delay"] = seconds
-            self.save_sticky_messages()
-            await interaction.response.send_message(f"Die Sticky-Zeit wurde auf {seconds} Sekunden aktualisiert!")
+            apply_trigger(self.sticky_messages[channel_id], seconds, messages)
+            self.message_counts.pop(channel_id, None)
+            self.save_sticky_messages(channel_id)
+            await self.respond(interaction,
+                f"Die Sticky-Zeit wurde auf {describe_trigger(self.sticky_messages[channel_id])} aktualisiert!"
+            )
         except Exception as e:
-            await interaction.response.send_message(f"Fehler beim Aktualisieren der Zeit: {str(e)}")
+            await self.respond(interaction, f"Fehler beim Aktualisieren der Zeit: {str(e)}")
+
+    @app_commands.command(name="sticky_adaptive", description="Passt die Verzögerung automatisch an die Aktivität im Kanal an")
+    @app_commands.describe(
+        enabled="Adaptive Verzögerung aktivieren",
+        min_seconds="Kürzeste Verzögerung in ruhigen Phasen",
+        max_seconds="Längste Verzögerung bei vielen Nachrichten"
+    )
+    async def sticky_adaptive(self, interaction: discord.Interaction, enabled: bool,
+                              min_seconds: int = 10, max_seconds: int = 300):
+        if not (is_bot_admin(interaction.user.id, interaction.guild.id) or 
+                is_bot_editor(interaction.user.id, interaction.guild.id)):
+            await self.respond(interaction,
+                "Du hast keine Berechtigung für diesen Befehl!",
+                ephemeral=True
+            )
+            return
+
+        channel_id = str(interaction.channel.id)
+        if channel_id not in self.sticky_messages:
+            await self.respond(interaction, "Es gibt keine Sticky-Nachricht in diesem Kanal.")
+            return
+
+        if enabled and (min_seconds < 5 or max_seconds < min_seconds):
+            await self.respond(interaction,
+                "Die minimale Verzögerung beträgt 5 Sekunden und das Maximum muss größer als das Minimum sein.",
+                ephemeral=True
+            )
+            return
+
+        try:
+            if enabled:
+                self.sticky_messages[channel_id]["adaptive_delay"] = {
+                    "min_delay": min_seconds,
+                    "max_delay": max_seconds
+                }
+                text = f"Adaptive Verzögerung aktiviert ({min_seconds}-{max_seconds} Sekunden)!"
+            else:
+                self.sticky_messages[channel_id].pop("adaptive_delay", None)
+                text = "Adaptive Verzögerung deaktiviert - es gilt wieder die feste Verzögerung."
+            self.save_sticky_messages(channel_id)
+            await self.respond(interaction, text)
+        except Exception as e:
+            await self.respond(interaction, f"Fehler beim Aktualisieren der Verzögerung: {str(e)}")
+
+    @app_commands.command(name="sticky_mode", description="Wählt, ob die Sticky neu gesendet oder bearbeitet wird")
+    @app_commands.describe(
+        mode="Neu senden (Löschen + Senden) oder bearbeiten, solange sie nah am Ende steht",
+        distance="Bearbeiten: maximale Anzahl Nachrichten unter der Sticky"
+    )
+    @app_commands.choices(mode=[
+        app_commands.Choice(name="Neu senden", value="repost"),
+        app_commands.Choice(name="Bearbeiten", value="edit")
+    ])
+    async def sticky_mode(self, interaction: discord.Interaction, mode: app_commands.Choice[str],
+                          distance: int = DEFAULT_EDIT_DISTANCE):
+        if not (is_bot_admin(interaction.user.id, interaction.guild.id) or 
+                is_bot_editor(interaction.user.id, interaction.guild.id)):
+            await self.respond(interaction,
+                "Du hast keine Berechtigung für diesen Befehl!",
+                ephemeral=True
+            )
+            return
+
+        channel_id = str(interaction.channel.id)
+        if channel_id not in self.sticky_messages:
+            await self.respond(interaction, "Es gibt keine Sticky-Nachricht in diesem Kanal.")
+            return
+
+        if distance < 0:
+            await self.respond(interaction, "Der Abstand darf nicht negativ sein.", ephemeral=True)
+            return
+
+        try:
+            if mode.value == "edit":
+                self.sticky_messages[channel_id]["repost_mode"] = "edit"
+                self.sticky_messages[channel_id]["edit_distance"] = distance
+                text = f"Die Sticky wird bearbeitet, solange höchstens {distance} Nachrichten darunter stehen."
+            else:
+                self.sticky_messages[channel_id].pop("repost_mode", None)
+                self.sticky_messages[channel_id].pop("edit_distance", None)
+                text = "Die Sticky wird wieder gelöscht und neu gesendet."
+            self.save_sticky_messages(channel_id)
+            await self.respond(interaction, text)
+        except Exception as e:
+            await self.respond(interaction, f"Fehler beim Ändern des Modus: {str(e)}")
+
+    @app_commands.command(name="sticky_stats", description="Zeigt API-Aufrufe und Reposts der Sticky in diesem Kanal")
+    async def sticky_stats(self, interaction: discord.Interaction):
+        if not (is_bot_admin(interaction.user.id, interaction.guild.id) or 
+                is_bot_editor(interaction.user.id, interaction.guild.id)):
+            await self.respond(interaction,
+                "Du hast keine Berechtigung für diesen Befehl!",
+                ephemeral=True
+            )
+            return
+
+        channel_id = str(interaction.channel.id)
+        if channel_id not in self.sticky_messages:
+            await self.respond(interaction, "Es gibt keine Sticky-Nachricht in diesem Kanal.")
+            return
+
+        sticky_config = self.sticky_messages[channel_id]
+        mode = "Bearbeiten" if sticky_config.get("repost_mode") == "edit" else "Neu senden"
+        embed = discord.Embed(title="Sticky-Statistik", color=discord.Color.green())
+        embed.add_field(name="Modus", value=mode, inline=True)
+        embed.add_field(name="Verzögerung", value=describe_trigger(sticky_config), inline=True)
+        embed.add_field(
+            name="API-Aufrufe (letzte Stunde)",
+            value=str(self.requests.calls_per_hour(channel_id)),
+            inline=True
+        )
+        below = self.below_sticky.get(channel_id)
+        embed.add_field(
+            name="Nachrichten unter der Sticky",
+            value=str(len(below)) if below is not None else "unbekannt (seit Neustart nicht gesendet)",
+            inline=True
+        )
+        channel_stats = self.repost_stats.get(channel_id, {})
+        embed.add_field(
+            name="Reposts in diesem Kanal (seit Start)",
+            value=(f"Gesendet: {channel_stats.get('sent', 0)}\n"
+                   f"Bearbeitet: {channel_stats.get('edited', 0)}\n"
+                   f"Übersprungen: {channel_stats.get('skipped', 0)}"),
+            inline=False
+        )
+        embed.add_field(
+            name="Reposts gesamt (alle Kanäle)",
+            value=(f"Gesendet: {self.repost_counters['sent']}\n"
+                   f"Bearbeitet: {self.repost_counters['edited']}\n"
+                   f"Übersprungen: {self.repost_counters['skipped']}"),
+            inline=False
+        )
+        await self.respond(interaction, embed=embed, ephemeral=True)
 
     @app_commands.command(name="remove_sticky", description="Entfernt die Sticky-Nachricht aus dem aktuellen Kanal")
     async def remove_sticky(self, interaction: discord.Interaction):
         if not (is_bot_admin(interaction.user.id, interaction.guild.id) or 
                 is_bot_editor(interaction.user.id, interaction.guild.id)):
-            await interaction.response.send_message(
+            await self.respond(interaction,
                 "Du hast keine Berechtigung für diesen Befehl!",
                 ephemeral=True
             )
@@ -210,226 +574,288 @@ class StickyCog(commands.Cog):
         channel_id = str(interaction.channel.id)
         if channel_id in self.sticky_messages:
             try:
+                last_message_id = self.store.message_id(channel_id)
                 del self.sticky_messages[channel_id]
-                del self.last_sent_time[channel_id]
-                if channel_id in self.last_message and self.last_message[channel_id]:
-                    await self.last_message[channel_id].delete()
-                del self.last_message[channel_id]
-                self.save_sticky_messages()
-                await interaction.response.send_message('Sticky-Nachricht erfolgreich entfernt!')
+                self.store.set_message_id(channel_id, None)
+                self.scheduler.cancel(channel_id)
+                self.activity.forget(channel_id)
+                self.below_sticky.pop(channel_id, None)
+                self.repost_stats.pop(channel_id, None)
+                self.message_counts.pop(channel_id, None)
+                self.last_sent_time.pop(channel_id, None)  # Nur im Speicher - fehlt nach einem Neustart
+                self._triggered_at.pop(channel_id, None)
+                self._repost_again.discard(channel_id)
+                self.save_sticky_messages(channel_id)
+                if last_message_id:
+                    await self.delete_sticky_message(interaction.channel, last_message_id)
+                await self.respond(interaction, 'Sticky-Nachricht erfolgreich entfernt!')
             except Exception as e:
-                await interaction.response.send_message(f"Fehler beim Entfernen der Sticky-Nachricht: {str(e)}")
+                await self.respond(interaction, f"Fehler beim Entfernen der Sticky-Nachricht: {str(e)}")
         else:
-            await interaction.response.send_message('Keine Sticky-Nachricht für diesen Kanal gefunden.')
+            await self.respond(interaction, 'Keine Sticky-Nachricht für diesen Kanal gefunden.')
+
+    async def handle_message_for_sticky(self, message, channel_id):
+        """Behandelt neue Nachrichten in Sticky-Channels (vom Message-Router aufgerufen)"""
+        logging.info(f"🔄 Sticky Message Trigger für Channel: {channel_id}")
+
+        # Alte Einträge ohne Guild-Zuordnung einmalig nachtragen (für Guild-Shards) - als
+        # Journal-Eintrag über den entprellten Writer, das Embed bleibt gültig
+        if not self.sticky_messages[channel_id].get("guild_id"):
+            self.sticky_messages[channel_id]["guild_id"] = str(message.guild.id)
+            self.store.save(channel_id)
+
+        # Repost planen - weitere Nachrichten während der Wartezeit behalten den Termin
+        self.schedule_sticky(channel_id)
+
+    async def track_message_below(self, message, channel_id):
+        """Merkt jede neue Nachricht unter der Sticky, auch von Bots (vom Message-Router aufgerufen)"""
+        below = self.below_sticky.get(channel_id)
+        if below is None:
+            return
+        current_id = self.store.message_id(channel_id)
+        if current_id and message.id == int(current_id):
+            return
+        below.add(message.id)
 
     @commands.Cog.listener()
-    async def on_message(self, message):
-        if message.author == self.bot.user:
+    async def on_raw_message_delete(self, payload):
+        self.forget_messages_below(str(payload.channel_id), (payload.message_id,))
+
+    @commands.Cog.listener()
+    async def on_raw_bulk_message_delete(self, payload):
+        self.forget_messages_below(str(payload.channel_id), payload.message_ids)
+
+    def forget_messages_below(self, channel_id, message_ids):
+        """
+        Entfernt gelöschte Nachrichten unter der Sticky - ist danach keine mehr übrig,
+        ist die Sticky wieder die letzte Nachricht und der geplante Repost entfällt
+        """
+        below = self.below_sticky.get(channel_id)
+        if not below:
             return
+        below.difference_update(message_ids)
+        if not below and self.scheduler.cancel(channel_id):
+            self.message_counts.pop(channel_id, None)
+            self.count_repost(channel_id, "skipped")
+            logging.debug(f"⏭️ Nachrichten unter der Sticky gelöscht - Repost in Channel {channel_id} entfällt")
 
-        # WICHTIG: Daten neu laden für GUI-Kompatibilität
-        self.reload_sticky_messages()
-        
-        channel_id = str(message.channel.id)
-        
-        if channel_id in self.sticky_messages:
-            logging.info(f"🔄 Sticky Message Trigger für Channel: {channel_id}")
-            
-            if channel_id in self.processing_channels:
-                return  # Verhindert mehrfaches Ausführen
+    def schedule_sticky(self, channel_id, reset=False):
+        """
+        Plant den Repost einer Sticky Message im zentralen Scheduler
 
-            self.processing_channels.add(channel_id)
-            try:
-                # Überprüfen, ob die letzte Nachricht mindestens 30 Sekunden alt ist
-                last_sent_time = self.last_sent_time.get(channel_id)
-                if last_sent_time and (datetime.datetime.now() - last_sent_time).total_seconds() < 30:
-                    return
-
-                # ERST das Delay warten (alte Sticky bleibt sichtbar)
-                delay = self.sticky_messages[channel_id].get("delay", 30)
-                logging.info(f"⏱️ Warte {delay} Sekunden bevor neue Sticky gesendet wird...")
-                await asyncio.sleep(delay)
-
-                # DANN alte Sticky-Nachricht löschen
-                old_message = None
-                if channel_id in self.last_message and self.last_message[channel_id]:
-                    old_message = self.last_message[channel_id]
-                    logging.info(f"🔍 Alte Sticky aus Speicher: {old_message.id}")
-                else:
-                    logging.info(f"🔍 Keine alte Sticky im Speicher - suche in Channel...")
-                    old_message = await self.find_last_sticky_message(channel_id)
-                
-                if old_message:
-                    try:
-                        logging.info(f"🔍 Versuche alte Sticky zu löschen: {old_message.id}")
-                        await old_message.delete()
-                        logging.info(f"🗑️ Alte Sticky Message gelöscht: {old_message.id}")
-                    except discord.NotFound:
-                        logging.info(f"⚠️ Alte Sticky Message bereits gelöscht oder nicht gefunden")
-                    except Exception as e:
-                        logging.error(f"❌ Fehler beim Löschen der alten Nachricht: {e}")
-                        logging.error(f"Fehler beim Löschen der alten Nachricht: {e}")
-                else:
-                    logging.info(f"🔍 Keine alte Sticky Message zum Löschen gefunden")
-
-                # Erstelle das neue Embed
-                sticky_data = self.sticky_messages[channel_id]
-                embed = discord.Embed(
-                    title=sticky_data["title"],
-                    description=sticky_data["message"],
-                    color=discord.Color.blue()
-                )
+        Args:
+            channel_id: Channel der Sticky Message
+            reset: True verschiebt einen bereits geplanten Repost (Timer neu starten)
+        """
+        sticky_config = self.sticky_messages[channel_id]
+        delay = sticky_config.get("delay", 30)
+        cooldown_seconds = 30
+        rate = self.activity.record(channel_id)
 
-                if sticky_data.get("example"):
-                    embed.add_field(
-                        name="Weitere Infos",
-                        value=sticky_data["example"],
-                        inline=False
-                    )
+        # Nachrichtenanzahl: nach N neuen Nachrichten sofort reposten (O(1) pro Nachricht)
+        message_count = sticky_config.get("message_count")
+        if message_count:
+            count = self.message_counts.get(channel_id, 0) + 1
+            self.message_counts[channel_id] = count
+            if count >= message_count:
+                logging.info(f"🔢 {count} neue Nachrichten - Sticky wird sofort gesendet (Channel {channel_id})")
+                self.scheduler.schedule(channel_id, 0, reset=True)
+                return
+            if not delay:
+                # Nur Nachrichtenanzahl, kein Timer
+                return
 
-                if sticky_data.get("footer"):
-                    embed.set_footer(text=sticky_data['footer'])
+        adaptive = sticky_config.get("adaptive_delay")
+        if adaptive:
+            # Verzögerung folgt der Aktivität (Burst: länger, ruhig: kürzer)
+            delay = adaptive_delay(delay, rate, adaptive["min_delay"], adaptive["max_delay"])
+            cooldown_seconds = adaptive["min_delay"]
 
-                # Pokemon Image abrufen und hinzufügen
-                pokemon_data = await self.get_random_pokemon_image()
-                if pokemon_data:
-                    embed.set_thumbnail(url=pokemon_data['url'])
+        now = time.monotonic()
+        if self.scheduler.is_scheduled(channel_id) and not reset:
+            if adaptive:
+                # Während eines Bursts den Termin ab der auslösenden Nachricht nach hinten schieben
+                due = self._triggered_at.get(channel_id, now) + delay
+                if due > self.scheduler.deadline(channel_id):
+                    self.scheduler.schedule(channel_id, due - now, reset=True)
+            return
 
-                # SOFORT neue Sticky-Nachricht senden
-                self.last_message[channel_id] = await message.channel.send(embed=embed)
-                self.last_sent_time[channel_id] = datetime.datetime.now()
-                logging.info(f"✅ Neue Sticky Message gesendet")
+        # Mindestabstand zwischen zwei Sticky Messages - Nachrichten in
+        # dieser Zeit verschieben den Repost statt ihn zu verwerfen
+        last_sent_time = self.last_sent_time.get(channel_id)
+        if last_sent_time:
+            cooldown = cooldown_seconds - (datetime.datetime.now() - last_sent_time).total_seconds()
+            delay = max(delay, cooldown)
 
-            except Exception as e:
-                logging.error(f"Fehler beim Senden der Sticky-Nachricht: {e}")
-            finally:
-                self.processing_channels.remove(channel_id)
+        self._triggered_at[channel_id] = now
+        logging.info(f"⏱️ Neue Sticky in {delay:.0f} Sekunden geplant (Channel {channel_id}, {rate:.1f} Nachrichten/min)")
+        self.scheduler.schedule(channel_id, delay, reset=reset)
 
-    async def find_last_sticky_message(self, channel_id):
-        """Findet die letzte Sticky Message des Bots in einem Channel"""
-        try:
-            channel = self.bot.get_channel(int(channel_id))
-            if not channel:
-                return None
-            
-            # Suche die letzten 50 Nachrichten nach Bot-Messages mit Embeds
-            async for message in channel.history(limit=50):
-                if (message.author == self.bot.user and 
-                    message.embeds and 
-                    len(message.embeds) > 0):
-                    
-                    # Prüfe ob es eine Sticky Message ist (hat den richtigen Titel)
-                    embed = message.embeds[0]
-                    sticky_data = self.sticky_messages.get(channel_id)
-                    if sticky_data and embed.title == sticky_data.get("title"):
-                        logging.info(f"🔍 Letzte Sticky Message gefunden: {message.id}")
-                        return message
-            
-            logging.info(f"🔍 Keine passende Sticky Message gefunden")
-            return None
-            
-        except Exception as e:
-            logging.error(f"❌ Fehler beim Suchen der letzten Sticky Message: {e}")
-            return None
+    async def repost_sticky(self, channel_id):
+        """
+        Löscht die alte Sticky Message und sendet sie neu (vom Scheduler aufgerufen)
 
-    async def handle_message_for_sticky(self, message):
-        """Behandelt neue Nachrichten für Sticky Message Trigger"""
-        if message.author.bot:
-            return
-        
-        channel_id = str(message.channel.id)
+        Returns:
+            str: 'sent' oder 'edited' bei Erfolg, 'latest' wenn die Sticky noch die letzte
+                 Nachricht ist, 'busy' wenn der Channel gerade bearbeitet wird (Repost folgt
+                 danach), 'missing' ohne Sticky oder Channel, 'failed' bei Fehlern
+        """
         if channel_id not in self.sticky_messages:
-            return
-        
+            return 'missing'
+        if channel_id in self.processing_channels:
+            # Fälligkeit nicht verlieren - nach dem laufenden Repost erneut planen
+            self._repost_again.add(channel_id)
+            return 'busy'
+
+        channel = self.bot.get_channel(int(channel_id))
+        if not channel:
+            logging.warning(f"⚠️ Channel {channel_id} nicht gefunden - Sticky übersprungen")
+            return 'missing'
+
         sticky_config = self.sticky_messages[channel_id]
-        delay = sticky_config.get('delay', 30)
-        
-        # Trigger für Sticky Message
-        logging.info(f"🔄 Sticky Message Trigger für Channel: {channel_id}")
-        
-        # Alte Aufgabe abbrechen falls vorhanden
-        if channel_id in self.sticky_tasks:
-            self.sticky_tasks[channel_id].cancel()
-        
-        # Neue Aufgabe erstellen
-        self.sticky_tasks[channel_id] = asyncio.create_task(
-            self._send_sticky_after_delay(message.channel, delay)
-        )
+        last_message_id = self.store.message_id(channel_id)
+        if self.is_sticky_latest(channel, channel_id, last_message_id):
+            # Seit der letzten Sticky wurde nichts gepostet - Löschen und Senden sparen
+            self.count_repost(channel_id, "skipped")
+            self.message_counts.pop(channel_id, None)
+            logging.debug(f"⏭️ Sticky ist noch die letzte Nachricht in Channel {channel_id} - Repost übersprungen")
+            return 'latest'
 
-    async def _send_sticky_after_delay(self, channel, delay):
-        """Sendet Sticky Message nach Verzögerung"""
+        self.processing_channels.add(channel_id)
         try:
-            await asyncio.sleep(delay)
-            
-            channel_id = str(channel.id)
-            if channel_id not in self.sticky_messages:
-                return
-            
-            sticky_config = self.sticky_messages[channel_id]
-            
-            # Lösche alte Sticky Message falls vorhanden
-            old_message_id = self.last_sent_time.get(channel_id)
-            if old_message_id:
-                try:
-                    old_message = await channel.fetch_message(int(old_message_id))
-                    await old_message.delete()
-                    logging.info(f"🗑️ Alte Sticky Message gelöscht: {old_message.id}")
-                except (discord.NotFound, discord.Forbidden):
-                    logging.info(f"⚠️ Alte Sticky Message bereits gelöscht oder nicht gefunden")
-                except Exception as e:
-                    logging.error(f"❌ Fehler beim Löschen der alten Nachricht: {e}")
-            else:
-                # Suche nach der letzten Sticky Message im Channel
-                old_message = await self._find_last_sticky_message(channel)
-                if old_message:
-                    try:
-                        await old_message.delete()
-                        logging.info(f"🗑️ Alte Sticky Message gelöscht")
-                    except Exception as e:
-                        logging.error(f"❌ Fehler beim Löschen: {e}")
-            
-            # Erstelle neue Sticky Message
-            embed = discord.Embed(
-                title=sticky_config.get('title', 'Sticky Message'),
-                description=sticky_config.get('message', ''),
-                color=0x5865F2
-            )
-            
-            # Zusätzliche Informationen
-            if sticky_config.get('additional_info'):
-                embed.add_field(
-                    name="ℹ️ Zusätzliche Informationen",
-                    value=sticky_config['additional_info'],
-                    inline=False
+            def build_embed():
+                # Vorgerendertes Embed holen, nur das Pokemon Image wird ergänzt
+                pokemon_data = self.get_random_pokemon_image()
+                return self.embed_cache.get_embed(
+                    channel_id,
+                    sticky_config,
+                    pokemon_data['url'] if pokemon_data else None
                 )
-            
-            # Footer
-            if sticky_config.get('footer'):
-                embed.set_footer(text=sticky_config['footer'])
-            else:
-                embed.set_footer(text="📌 Sticky Message")
-            
-            # Sende neue Sticky Message
-            new_message = await channel.send(embed=embed)
-            
-            # Speichere neue Message ID
+
+            if await self._edit_in_place(channel, channel_id, sticky_config, last_message_id, build_embed):
+                return 'edited'
+
+            if not last_message_id:
+                # Einträge von vor der ID-Speicherung: einmalig im Verlauf suchen (vor dem Senden,
+                # damit die Suche nicht die neue Sticky findet)
+                logging.info(f"🔍 Keine Sticky-ID gespeichert - suche in Channel...")
+                old_message = await self.find_last_sticky_message(channel_id)
+                last_message_id = old_message.id if old_message else None
+
+            # Alte Sticky wird parallel gelöscht, die neue SOFORT gesendet
+            new_message = await self.repost_pipeline.repost(channel, build_embed, last_message_id)
             self.last_sent_time[channel_id] = datetime.datetime.now()
-            await self.save_sticky_messages()
-            
+            self.count_repost(channel_id, "sent")
+            self.message_counts.pop(channel_id, None)
+            # Während des Sendens eingetroffene Nachrichten stehen bereits unter der neuen Sticky
+            self.below_sticky[channel_id] = {
+                message_id for message_id in self.below_sticky.get(channel_id, ()) if message_id > new_message.id
+            }
             logging.info(f"✅ Neue Sticky Message gesendet")
-            
-        except asyncio.CancelledError:
-            logging.info("⏹️ Sticky Message Aufgabe abgebrochen")
+
+            # ID der aktuellen Sticky merken (eigener Datensatz, übersteht Neustarts)
+            self.remember_sticky_message(channel_id, new_message.id)
+            return 'sent'
+
+        except Exception as e:
+            logging.error(f"Fehler beim Senden der Sticky-Nachricht: {e}")
+            return 'failed'
+        finally:
+            self.processing_channels.discard(channel_id)
+            if channel_id in self._repost_again:
+                self._repost_again.discard(channel_id)
+                self.scheduler.schedule(channel_id, BUSY_RETRY_DELAY)
+
+    async def _edit_in_place(self, channel, channel_id, sticky_config, last_message_id, build_embed):
+        """
+        Bearbeitungs-Modus: bestehende Sticky aktualisieren, solange sie nah genug am Ende steht
+
+        Returns:
+            bool: True wenn bearbeitet wurde (sonst Löschen + Senden)
+        """
+        if sticky_config.get("repost_mode") != "edit" or not last_message_id:
+            return False
+
+        below = self.below_sticky.get(channel_id)
+        distance = len(below) if below is not None else None
+        if distance is None or distance > sticky_config.get("edit_distance", DEFAULT_EDIT_DISTANCE):
+            # Unbekannt (Neustart) oder zu weit nach oben gerutscht
+            return False
+
+        try:
+            await self.repost_pipeline.edit(channel, last_message_id, build_embed)
+        except discord.NotFound:
+            logging.info(f"⚠️ Sticky zum Bearbeiten nicht gefunden - sende neu")
+            return False
         except Exception as e:
-            logging.error(f"❌ Fehler beim Senden der Sticky Message: {e}")
+            logging.error(f"❌ Fehler beim Bearbeiten der Sticky Message: {e} - sende neu")
+            return False
+
+        self.last_sent_time[channel_id] = datetime.datetime.now()
+        self.count_repost(channel_id, "edited")
+        self.message_counts.pop(channel_id, None)
+        logging.info(f"✏️ Sticky Message bearbeitet ({distance} Nachrichten darunter)")
+        return True
+
+    def count_repost(self, channel_id, outcome):
+        """Zählt einen Repost ("sent", "edited" oder "skipped") gesamt und pro Channel"""
+        self.repost_counters[outcome] += 1
+        channel_stats = self.repost_stats.setdefault(channel_id, {"sent": 0, "edited": 0, "skipped": 0})
+        channel_stats[outcome] += 1
+
+    def is_sticky_latest(self, channel, channel_id, last_message_id):
+        """
+        True wenn die gespeicherte Sticky noch die neueste Nachricht im Channel ist
+
+        Nachrichten unter der Sticky werden verfolgt, sobald sie in diesem Prozess gesendet
+        oder beim Start geprüft wurde (Löschungen kommen über on_raw_message_delete).
+        Sonst zählt channel.last_message_id vom Gateway - discord.py setzt es nach dem
+        Löschen einer Nachricht nicht zurück.
+        """
+        if not last_message_id:
+            return False
+        below = self.below_sticky.get(channel_id)
+        if below is not None:
+            return not below
+        return channel.last_message_id == int(last_message_id)
+
+    async def delete_sticky_message(self, channel, message_id):
+        """Löscht eine Sticky Message über ihre ID (ohne sie vorher abzurufen)"""
+        try:
+            await self.requests.submit(
+                lambda: channel.get_partial_message(int(message_id)).delete(), PRIORITY_CLEANUP, channel.id
+            )
+            logging.info(f"🗑️ Alte Sticky Message gelöscht: {message_id}")
+            return True
+        except discord.NotFound:
+            logging.info(f"⚠️ Alte Sticky Message bereits gelöscht oder nicht gefunden")
+            return True
+        except Exception as e:
+            logging.error(f"❌ Fehler beim Löschen der alten Nachricht: {e}")
+            return False
+
+    def remember_sticky_message(self, channel_id, message_id):
+        """Merkt die ID der aktuell geposteten Sticky Message (kein Schreiben der Konfiguration)"""
+        if channel_id not in self.sticky_messages:
+            return
+        # Embed-Cache bleibt gültig - die ID ist kein Teil des Embeds
+        self.store.set_message_id(channel_id, message_id)
 
-    async def _find_last_sticky_message(self, channel):
-        """Findet die letzte Sticky Message im Channel"""
+    async def find_last_sticky_message(self, channel_id):
+        """Findet die letzte Sticky Message des Bots in einem Channel"""
         try:
-            async for message in channel.history(limit=50):
-                if (message.author == self.bot.user and 
-                    message.embeds and 
-                    "Sticky Message" in str(message.embeds[0].footer.text)):
+            channel = self.bot.get_channel(int(channel_id))
+            if not channel:
+                return None
+            
+            async def fetch_history():
+                return [message async for message in channel.history(limit=50)]
+
+            # Suche die letzten 50 Nachrichten nach Bot-Messages mit Embeds
+            history = await self.requests.submit(fetch_history, PRIORITY_REPOST, channel.id)
+            for message in history:
+                # Eigene Embed-Nachricht (unabhängig vom Titel - er kann seitdem geändert worden sein)
+                if is_sticky_message(message, self.bot.user):
                     logging.info(f"🔍 Letzte Sticky Message gefunden: {message.id}")
                     return message
             
@@ -443,21 +869,16 @@ class StickyCog(commands.Cog):
     async def cleanup_server_data(self, guild_id):
         """Archiviert Sticky Message Daten für einen Server (24h Grace Period bei Bot-Kick)"""
         try:
-            archived_count = 0
-            channels_to_archive = []
+            # Channels des Servers direkt aus dem Guild-Index (unabhängig vom Channel-Cache)
+            channels_to_archive = list(self.store.channels_for_guild(guild_id))
+            
+            # Alte Einträge ohne Guild-Zuordnung nur über den Channel-Cache zuordnen
+            for channel_id in self.store.channels_for_guild(UNASSIGNED_GUILD):
+                channel = self.bot.get_channel(int(channel_id))
+                if channel and channel.guild.id == guild_id:
+                    channels_to_archive.append(channel_id)
             
-            # Finde alle Channels des Servers in den Sticky Messages
-            for channel_id in self.sticky_messages.keys():
-                try:
-                    # Versuche Channel zu finden um Guild ID zu ermitteln
-                    channel = self.bot.get_channel(int(channel_id))
-                    if channel and channel.guild.id == guild_id:
-                        channels_to_archive.append(channel_id)
-                        archived_count += 1
-                except:
-                    # Falls Channel nicht mehr existiert, archiviere trotzdem
-                    # (kann bei Bot-Kick passieren)
-                    pass
+            archived_count = len(channels_to_archive)
             
             if archived_count == 0:
                 return 0
@@ -466,8 +887,8 @@ class StickyCog(commands.Cog):
             import datetime
             archive_timestamp = datetime.datetime.now().isoformat()
             
-            # Archivierte Sticky Messages laden/erstellen
-            archived_messages = self.load_archived_sticky_messages()
+            # Nur die neu archivierten Einträge sammeln
+            archived_messages = {}
             
             # Sticky Messages archivieren (nicht löschen!)
             for channel_id in channels_to_archive:
@@ -486,19 +907,19 @@ class StickyCog(commands.Cog):
                 # Lokale Caches bereinigen
                 if channel_id in self.last_sent_time:
                     del self.last_sent_time[channel_id]
-                if channel_id in self.last_message:
-                    del self.last_message[channel_id]
                 if channel_id in self.processing_channels:
                     self.processing_channels.remove(channel_id)
-                if channel_id in self.sticky_tasks:
-                    task = self.sticky_tasks[channel_id]
-                    if not task.done():
-                        task.cancel()
-                    del self.sticky_tasks[channel_id]
+                self._repost_again.discard(channel_id)
+                self._triggered_at.pop(channel_id, None)
+                self.scheduler.cancel(channel_id)
+                self.activity.forget(channel_id)
+                self.below_sticky.pop(channel_id, None)
+                self.repost_stats.pop(channel_id, None)
+                self.message_counts.pop(channel_id, None)
             
             # Änderungen speichern
-            self.save_sticky_messages()  # Aktive Messages
-            self.save_archived_sticky_messages(archived_messages)  # Archivierte Messages
+            self.save_sticky_messages(*channels_to_archive)  # Aktive Messages
+            await asyncio.to_thread(add_archived_sticky_messages_secure, archived_messages, self.bot_token)
             
             logging.info(f"📦 {archived_count} Sticky Messages für Server {guild_id} archiviert (24h Grace Period)")
             logging.info(f"💡 Bot kann wieder eingeladen werden - Daten bleiben 24h erhalten!")
@@ -509,43 +930,33 @@ class StickyCog(commands.Cog):
             logging.error(f"❌ Fehler beim Archivieren der Server-Daten: {e}")
             return 0
 
-    def load_archived_sticky_messages(self):
-        """Lädt archivierte Sticky Messages sicher verschlüsselt"""
+    def load_archived_sticky_messages(self, guild_id=None):
+        """Lädt archivierte Sticky Messages sicher verschlüsselt (optional nur einer Guild)"""
         try:
-            from src.utils.secure_storage import SecureStorage
-            storage = SecureStorage(self.bot_token)
-            return storage.load_encrypted_json("data/archived_sticky_messages.json")
-        except Exception as e:
-            logging.error(f"❌ Fehler beim sicheren Laden der archivierten Messages: {e}")
-            # Fallback auf unverschlüsselte Datei (Migration)
-            try:
-                from src.utils.path_manager import get_application_path
-                app_path = get_application_path()
-                archive_file = os.path.join(app_path, 'data', 'archived_sticky_messages.json')
+            # Unverschlüsselte Archiv-Datei migrieren (falls noch vorhanden)
+            from src.utils.path_manager import get_application_path
+            archive_file = os.path.join(get_application_path(), 'data', 'archived_sticky_messages.json')
+            
+            if os.path.exists(archive_file):
+                with open(archive_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
                 
-                if os.path.exists(archive_file):
-                    with open(archive_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                    
-                    logging.info("🔄 Migriere unverschlüsselte Archiv-Datei zu AES-256...")
-                    # Sofort verschlüsselt speichern
-                    self.save_archived_sticky_messages(data)
+                logging.info("🔄 Migriere unverschlüsselte Archiv-Datei zu AES-256...")
+                if add_archived_sticky_messages_secure(data, self.bot_token):
                     # Alte Datei löschen
                     os.remove(archive_file)
                     logging.info("✅ Archiv-Migration abgeschlossen")
-                    return data
-                
-                return {}
-            except Exception as fallback_error:
-                logging.error(f"❌ Auch Fallback-Laden fehlgeschlagen: {fallback_error}")
-                return {}
+            
+            return load_archived_sticky_messages_secure(self.bot_token, guild_id)
+            
+        except Exception as e:
+            logging.error(f"❌ Fehler beim sicheren Laden der archivierten Messages: {e}")
+            return {}
 
     def save_archived_sticky_messages(self, archived_messages):
         """Speichert archivierte Sticky Messages sicher verschlüsselt"""
         try:
-            from src.utils.secure_storage import SecureStorage
-            storage = SecureStorage(self.bot_token)
-            success = storage.save_encrypted_json(archived_messages, "data/archived_sticky_messages.json")
+            success = save_archived_sticky_messages_secure(archived_messages, self.bot_token)
             
             if success:
                 logging.debug("🔐 Archivierte Sticky Messages sicher verschlüsselt gespeichert")
@@ -576,17 +987,16 @@ class StickyCog(commands.Cog):
     async def restore_archived_messages_for_guild(self, guild_id):
         """Stellt archivierte Sticky Messages für einen Server wieder her"""
         try:
-            archived_messages = self.load_archived_sticky_messages()
+            # Nur die Archive dieser Guild laden (SQLite: indizierte Abfrage) - außerhalb des Event Loops
+            archived_messages = await asyncio.to_thread(self.load_archived_sticky_messages, guild_id)
             restored_count = 0
             channels_to_restore = []
             
-            # Finde alle archivierten Messages für diese Guild
-            for channel_id, data in archived_messages.items():
-                if data.get('guild_id') == guild_id:
-                    # Prüfe ob Channel noch existiert
-                    channel = self.bot.get_channel(int(channel_id))
-                    if channel:
-                        channels_to_restore.append(channel_id)
+            # Prüfe ob die archivierten Channels im Server noch existieren
+            guild = self.bot.get_guild(int(guild_id))
+            for channel_id in archived_messages:
+                if guild is None or guild.get_channel(int(channel_id)):
+                    channels_to_restore.append(channel_id)
             
             # Messages wiederherstellen
             for channel_id in channels_to_restore:
@@ -595,20 +1005,18 @@ class StickyCog(commands.Cog):
                 # Archiv-spezifische Daten entfernen
                 restored_data = {k: v for k, v in archive_data.items() 
                               if k not in ['archived_at', 'guild_id', 'auto_delete_at']}
+                restored_data['guild_id'] = str(guild_id)  # Guild-Zuordnung für die Speicherung
                 
                 # Zu aktiven Messages hinzufügen
                 self.sticky_messages[channel_id] = restored_data
-                
-                # Aus Archiv entfernen
-                del archived_messages[channel_id]
                 restored_count += 1
                 
                 logging.info(f"🔄 Sticky Message für Channel #{restored_data.get('channel_name', channel_id)} wiederhergestellt")
             
             if restored_count > 0:
-                # Änderungen speichern
-                self.save_sticky_messages()
-                self.save_archived_sticky_messages(archived_messages)
+                # Änderungen speichern und aus Archiv entfernen
+                self.save_sticky_messages(*channels_to_restore)
+                await asyncio.to_thread(delete_archived_sticky_messages_secure, channels_to_restore, self.bot_token)
                 
                 logging.info(f"✅ {restored_count} Sticky Messages für Server {guild_id} wiederhergestellt!")
             
@@ -621,43 +1029,19 @@ class StickyCog(commands.Cog):
     async def cleanup_expired_archives(self):
         """Löscht abgelaufene archivierte Messages (nach 24h)"""
         try:
-            import datetime
-            archived_messages = self.load_archived_sticky_messages()
-            current_time = datetime.datetime.now()
-            expired_channels = []
-            
-            for channel_id, data in archived_messages.items():
-                try:
-                    auto_delete_str = data.get('auto_delete_at')
-                    if auto_delete_str:
-                        auto_delete_time = datetime.datetime.fromisoformat(auto_delete_str)
-                        if current_time >= auto_delete_time:
-                            expired_channels.append(channel_id)
-                except Exception as e:
-                    logging.error(f"❌ Fehler beim Parsen des Löschdatums für Channel {channel_id}: {e}")
-                    # Bei Parsing-Fehlern nach 48h löschen (sicher)
-                    archived_str = data.get('archived_at')
-                    if archived_str:
-                        try:
-                            archived_time = datetime.datetime.fromisoformat(archived_str)
-                            if (current_time - archived_time).total_seconds() > (48 * 3600):  # 48h
-                                expired_channels.append(channel_id)
-                        except:
-                            pass
+            # SQLite: indizierte Abfrage über auto_delete_at - außerhalb des Event Loops
+            expired = await asyncio.to_thread(
+                delete_expired_archives_secure, datetime.datetime.now(), self.bot_token
+            )
             
-            # Abgelaufene Archive löschen
-            deleted_count = 0
-            for channel_id in expired_channels:
-                channel_name = archived_messages[channel_id].get('channel_name', 'Unbekannt')
-                del archived_messages[channel_id]
-                deleted_count += 1
+            for channel_id, data in expired.items():
+                channel_name = data.get('channel_name', 'Unbekannt')
                 logging.info(f"🗑️ Abgelaufenes Archiv gelöscht: #{channel_name} (Channel {channel_id})")
             
-            if deleted_count > 0:
-                self.save_archived_sticky_messages(archived_messages)
-                logging.info(f"🧹 {deleted_count} abgelaufene Archive bereinigt")
+            if expired:
+                logging.info(f"🧹 {len(expired)} abgelaufene Archive bereinigt")
             
-            return deleted_count
+            return len(expired)
             
         except Exception as e:
             logging.error(f"❌ Fehler beim Bereinigen der Archive: {e}")
@@ -37,11 +37,15 @@ if isinstance(BASE_DIR, pathlib.Path):
     DATA_DIR = BASE_DIR / 'data'
     STICKY_FILE = DATA_DIR / 'sticky_messages.json'
     BOT_ROLES_FILE = DATA_DIR / 'bot_roles.json'
+    SQLITE_DB_FILE = DATA_DIR / 'sticky_bot.db'
+    POKEMON_INDEX_FILE = DATA_DIR / 'pokemon_index.json'
 else:
     load_dotenv(os.path.join(BASE_DIR, '.env'))
     DATA_DIR = os.path.join(BASE_DIR, 'data')
     STICKY_FILE = os.path.join(DATA_DIR, 'sticky_messages.json')
     BOT_ROLES_FILE = os.path.join(DATA_DIR, 'bot_roles.json')
+    SQLITE_DB_FILE = os.path.join(DATA_DIR, 'sticky_bot.db')
+    POKEMON_INDEX_FILE = os.path.join(DATA_DIR, 'pokemon_index.json')
 
 # Erstelle data Verzeichnis falls es nicht existiert
 if isinstance(DATA_DIR, pathlib.Path):
@@ -58,6 +62,9 @@ TOKEN = os.getenv('DISCORD_TOKEN')
 # Bot Einstellungen
 DEFAULT_PREFIX = '/'
 
+# Speicher-Backend: 'files' (verschlüsselte Guild-Dateien) oder 'sqlite'
+STORAGE_BACKEND = os.getenv('STICKY_STORAGE_BACKEND', 'files').strip().lower()
+
 # Farben
 COLORS = {
     'blue': 0x3498db,
@@ -36,6 +36,8 @@ class BotManager:
             intents = discord.Intents.default()
             intents.message_content = True
             self.bot = commands.Bot(command_prefix='/', intents=intents)
+            # Fortschrittsmeldungen der Cogs im Status-Tab anzeigen
+            self.bot.status_log = self._status_log
             
             # Event Handlers registrieren
             self.register_event_handlers()
@@ -48,6 +50,11 @@ class BotManager:
             safe_print(f"❌ Bot Initialisierung fehlgeschlagen: {e}")
             return False
     
+    def _status_log(self, message):
+        """Leitet eine Meldung an den Log des Status-Tabs weiter (falls vorhanden)"""
+        if self.status_window:
+            self.status_window.add_log(message)
+
     def register_event_handlers(self):
         """Registriert Bot Event Handlers"""
         @self.bot.event
@@ -258,6 +265,8 @@ class BotManager:
         
         finally:
             self.bot_running = False
+            await self._stop_request_scheduler()
+            self._flush_persistence()
             if self.status_window:
                 self.status_window.update_status(
                     "⭕ Bot gestoppt",
@@ -266,6 +275,28 @@ class BotManager:
                 )
                 self._reset_buttons()
     
+    async def _stop_request_scheduler(self):
+        """Beendet den gemeinsamen Request-Scheduler des Bots (erst nach dem Entladen der Cogs)"""
+        scheduler = getattr(self.bot, 'request_scheduler', None)
+        if scheduler is None:
+            return
+        try:
+            await scheduler.stop()
+        except Exception as e:
+            logging.error(f"Fehler beim Beenden des Request-Schedulers: {e}")
+    
+    def _flush_persistence(self):
+        """Schreibt alle im Hintergrund ausstehenden Änderungen (Sticky Messages, Berechtigungen)"""
+        try:
+            from src.utils.persistence_worker import flush_all, get_persistence_stats
+            flush_all()
+            for stats in get_persistence_stats():
+                logging.info(f"💾 {stats['name']}: {stats['writes']} Schreibvorgänge, "
+                             f"Ø {stats['avg_latency_ms']}ms, max {stats['max_latency_ms']}ms, "
+                             f"{stats['queue_depth']} ausstehend")
+        except Exception as e:
+            logging.error(f"Fehler beim Speichern ausstehender Änderungen: {e}")
+    
     def _reset_buttons(self):
         """Setzt die Buttons zurück nach einem Fehler"""
         if (self.status_window and hasattr(self.status_window, 'status_tab') 
@@ -413,4 +444,7 @@ class BotManager:
                                        "Der Bot wird danach neu gestartet.",
                                        parent=self.status_window.root)
             if result:
+                # Gecachten Token und Schlüssel verwerfen
+                from src.utils.permissions import invalidate_key_cache
+                invalidate_key_cache()
                 self._restart_application() 
\ No newline at end of file
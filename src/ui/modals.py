@@ -2,13 +2,16 @@ import discord
 from discord import ui
 from src.utils.db_manager import save_json_file
 from src.config.config import STICKY_FILE
+from src.utils.sticky_embeds import build_sticky_embed
+from src.utils.sticky_trigger import parse_trigger, apply_trigger
 
 class StickyModal(ui.Modal):
     def __init__(self, sticky_messages, title="Sticky Nachricht erstellen", 
                 default_title="", default_message="", default_time=20, 
-                default_example="", default_footer=""):  # Neue Parameter
+                default_example="", default_footer="", on_save=None):  # Neue Parameter
         super().__init__(title=title)
         self.sticky_messages = sticky_messages
+        self.on_save = on_save  # Speichert über den Sticky Store des Bots
         
         self.title_input = ui.TextInput(
             label='Titel',
@@ -40,8 +43,8 @@ class StickyModal(ui.Modal):
             default=default_footer  # Hinzugefügt
         )
         self.time_input = ui.TextInput(
-            label='Verzögerung (in Sekunden)',
-            placeholder='Standard: 20',
+            label='Verzögerung (Sekunden/Nachrichten)',
+            placeholder='z.B. 20, 20/10 (was zuerst eintritt) oder /10',
             required=False,
             default=str(default_time)
         )
@@ -54,43 +57,37 @@ class StickyModal(ui.Modal):
 
     async def on_submit(self, interaction: discord.Interaction):
         try:
-            time = int(self.time_input.value or 20)
-            if time < 5:
-                await interaction.response.send_message(
-                    "Die minimale Verzögerung beträgt 5 Sekunden.",
-                    ephemeral=True
-                )
+            try:
+                time, message_count = parse_trigger(self.time_input.value)
+            except ValueError as e:
+                await interaction.response.send_message(str(e), ephemeral=True)
                 return
                 
             channel_id = str(interaction.channel.id)
             channel_name = interaction.channel.name
             
+            previous = self.sticky_messages.get(channel_id) or {}
             self.sticky_messages[channel_id] = {
                 "title": self.title_input.value,
                 "message": self.message_input.value,
                 "delay": time,
                 "channel_name": channel_name,
+                "guild_id": str(interaction.guild.id),
                 "example": self.example_input.value if self.example_input.value else None,
                 "footer": self.footer_input.value if self.footer_input.value else None
             }
+            apply_trigger(self.sticky_messages[channel_id], time, message_count)
+            # Bereits gepostete Sticky, adaptive Verzögerung und Repost-Modus bleiben beim Bearbeiten erhalten
+            for key in ("last_message_id", "adaptive_delay", "repost_mode", "edit_distance"):
+                if previous.get(key):
+                    self.sticky_messages[channel_id][key] = previous[key]
             
-            save_json_file(STICKY_FILE, self.sticky_messages)
+            if self.on_save:
+                self.on_save(channel_id)
+            else:
+                save_json_file(STICKY_FILE, self.sticky_messages)
             
-            embed = discord.Embed(
-                title=self.title_input.value,
-                description=self.message_input.value,
-                color=discord.Color.blue()
-            )
-
-            if self.example_input.value:
-                embed.add_field(
-                    name="Weitere Infos",
-                    value=self.example_input.value,
-                    inline=False
-                )
-
-            if self.footer_input.value:
-                embed.set_footer(text=self.footer_input.value)
+            embed = build_sticky_embed(self.sticky_messages[channel_id])
 
             await interaction.response.send_message(embed=embed)
             
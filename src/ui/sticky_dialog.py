@@ -8,6 +8,7 @@ import os
 import json
 import logging
 from src.utils.permissions import is_bot_editor, is_bot_admin
+from src.utils.sticky_trigger import parse_trigger, apply_trigger
 
 
 class StickyManagerDialog:
@@ -92,7 +93,7 @@ class StickyManagerDialog:
         self.message_text.pack(fill='x', pady=(0, 15))
         
         # Verzögerung
-        delay_label = tk.Label(main_frame, text="Verzögerung (Sekunden):", 
+        delay_label = tk.Label(main_frame, text="Verzögerung (Sekunden/Nachrichten, z.B. 20, 20/10 oder /10):", 
                               font=('Segoe UI', 11, 'bold'), fg='#FFFFFF', bg='#2C2F33')
         delay_label.pack(anchor='w', pady=(0, 5))
         
@@ -210,12 +211,9 @@ class StickyManagerDialog:
                 return
                 
             try:
-                delay = int(self.delay_entry.get())
-                if delay < 5:
-                    messagebox.showerror("Fehler", "Verzögerung muss mindestens 5 Sekunden sein!")
-                    return
-            except ValueError:
-                messagebox.showerror("Fehler", "Bitte gib eine gültige Zahl für die Verzögerung ein!")
+                delay, message_count = parse_trigger(self.delay_entry.get())
+            except ValueError as e:
+                messagebox.showerror("Fehler", str(e))
                 return
                 
             # Channel ID extrahieren
@@ -231,9 +229,11 @@ class StickyManagerDialog:
                 "message": self.message_text.get("1.0", tk.END).strip(),
                 "delay": delay,
                 "channel_name": channel_name,
+                "guild_id": str(server_id),
                 "example": None,
                 "footer": None
             }
+            apply_trigger(sticky_data, delay, message_count)
             
             # In Datei speichern
             self.save_sticky_message(channel_id, sticky_data)
@@ -13,6 +13,7 @@ from src.ui.sticky_dialog import StickyManagerDialog
 from src.utils.path_manager import get_application_path
 from src.utils.permissions import is_bot_editor, is_bot_admin
 from src.utils.secure_storage import load_sticky_messages_secure, save_sticky_messages_secure
+from src.utils.sticky_trigger import parse_trigger, apply_trigger, format_trigger, describe_trigger
 
 
 class StickyTab(BaseTab):
@@ -213,7 +214,7 @@ class StickyTab(BaseTab):
             ("🆔 Channel ID:", channel_id),
             ("📺 Channel:", f"#{data.get('channel_name', 'Unbekannt')}"),
             ("📝 Titel:", data.get('title', 'Kein Titel')),
-            ("⏱️ Verzögerung:", f"{data.get('delay', 0)} Sekunden"),
+            ("⏱️ Verzögerung:", describe_trigger(data)),
             ("📅 Erstellt:", data.get('created', 'Unbekannt')),
             ("📊 Status:", "🟢 Aktiv" if data.get('active', True) else "🔴 Inaktiv")
         ]
@@ -367,13 +368,13 @@ class StickyTab(BaseTab):
         message_text.insert('1.0', data.get('message', ''))
         
         # Verzögerung
-        tk.Label(main_frame, text="⏱️ Verzögerung (Sekunden):", font=('Segoe UI', 11, 'bold'),
+        tk.Label(main_frame, text="⏱️ Verzögerung (Sekunden/Nachrichten, z.B. 20, 20/10 oder /10):", font=('Segoe UI', 11, 'bold'),
                 fg=self.colors['text_primary'], bg=self.colors['background']).pack(anchor='w', pady=(0, 5))
         
         delay_entry = tk.Entry(main_frame, font=('Segoe UI', 10), 
                               bg='#40444B', fg='#DCDDDE', insertbackground='#FFFFFF')
         delay_entry.pack(fill='x', ipady=5, pady=(0, 20))
-        delay_entry.insert(0, str(data.get('delay', 20)))
+        delay_entry.insert(0, format_trigger(data))
         
         # Buttons
         button_frame = tk.Frame(main_frame, bg=self.colors['background'])
@@ -391,12 +392,9 @@ class StickyTab(BaseTab):
                     return
                 
                 try:
-                    delay = int(delay_entry.get())
-                    if delay < 5:
-                        messagebox.showerror("Fehler", "Verzögerung muss mindestens 5 Sekunden sein!")
-                        return
-                except ValueError:
-                    messagebox.showerror("Fehler", "Bitte gib eine gültige Zahl für die Verzögerung ein!")
+                    delay, message_count = parse_trigger(delay_entry.get())
+                except ValueError as e:
+                    messagebox.showerror("Fehler", str(e))
                     return
                 
                 # Daten aktualisieren
@@ -405,9 +403,9 @@ class StickyTab(BaseTab):
                 sticky_messages[channel_id].update({
                     'title': title_entry.get().strip(),
                     'message': message_text.get("1.0", tk.END).strip(),
-                    'delay': delay,
                     'last_modified': datetime.now().isoformat()
                 })
+                apply_trigger(sticky_messages[channel_id], delay, message_count)
                 
                 # Sicher speichern
                 save_sticky_messages_secure(sticky_messages, None)
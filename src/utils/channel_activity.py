@@ -0,0 +1,50 @@
+"""
+Channel-Aktivität für adaptive Sticky-Verzögerungen
+Pro Channel ein exponentiell abklingender Nachrichtenzähler (O(1) pro
+Nachricht). Daraus ergibt sich eine geschätzte Rate in Nachrichten pro Minute,
+mit der die Repost-Verzögerung bei Bursts verlängert und in ruhigen Channels
+verkürzt wird.
+"""
+import math
+import time
+
+ACTIVITY_TIME_CONSTANT = 120.0  # Sekunden - ältere Nachrichten zählen entsprechend weniger
+REFERENCE_RATE = 2.0            # Nachrichten pro Minute, bei denen die Basis-Verzögerung gilt
+
+
+class ChannelActivity:
+    """Exponentiell abklingende Nachrichtenrate pro Channel"""
+
+    def __init__(self, time_constant=ACTIVITY_TIME_CONSTANT):
+        self.time_constant = time_constant
+        self._counters = {}  # channel_id -> (Zählerstand, Zeitpunkt)
+
+    def _decayed(self, channel_id, now):
+        value, updated = self._counters.get(channel_id, (0.0, now))
+        return value * math.exp(-(now - updated) / self.time_constant)
+
+    def record(self, channel_id, now=None):
+        """Zählt eine Nachricht und gibt die aktuelle Rate (Nachrichten/Minute) zurück"""
+        now = time.monotonic() if now is None else now
+        value = self._decayed(channel_id, now) + 1.0
+        self._counters[channel_id] = (value, now)
+        return value / self.time_constant * 60
+
+    def rate(self, channel_id, now=None):
+        """Aktuelle Rate in Nachrichten pro Minute"""
+        now = time.monotonic() if now is None else now
+        return self._decayed(channel_id, now) / self.time_constant * 60
+
+    def forget(self, channel_id):
+        self._counters.pop(channel_id, None)
+
+
+def adaptive_delay(base_delay, rate, min_delay, max_delay):
+    """
+    Effektive Verzögerung für eine Nachrichtenrate
+
+    Bei REFERENCE_RATE gilt die Basis-Verzögerung; sie wächst mit der Wurzel
+    der Rate (Burst) bzw. sinkt in ruhigen Channels - begrenzt auf min/max.
+    """
+    factor = math.sqrt(rate / REFERENCE_RATE)
+    return max(min_delay, min(max_delay, base_delay * factor))
@@ -0,0 +1,102 @@
+"""
+Zentraler Message-Router für Sticky-Bot
+Ein einziger on_message Listener pro Bot. DMs, Bot-Nachrichten (außer für Routen,
+die sie ausdrücklich anfordern) und Nachrichten in Channels ohne registrierten
+Handler werden mit einem Set-Lookup verworfen,
+bevor irgendeine weitere Arbeit passiert. Die Laufzeit jedes Handlers wird
+gemessen, damit sichtbar ist, was eine Nachricht kostet.
+"""
+import time
+import logging
+
+
+class _Route:
+    __slots__ = ('name', 'handler', 'channels', 'include_bots', 'calls', 'errors', 'total_time', 'max_time')
+
+    def __init__(self, name, handler, channels, include_bots=False):
+        self.name = name
+        self.handler = handler
+        self.channels = channels
+        self.include_bots = include_bots
+        self.calls = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+
+class MessageRouter:
+    """Verteilt Nachrichten an registrierte Handler (nur für deren Channels)"""
+
+    def __init__(self):
+        self._routes = {}  # name -> _Route
+        self.received = 0
+        self.dropped = 0
+
+    def add_route(self, name, handler, channels, include_bots=False):
+        """
+        Registriert einen Handler
+
+        Args:
+            name: Eindeutiger Name (für Statistiken, ersetzt gleichnamige Routen)
+            handler: Coroutine-Funktion(message, channel_id)
+            channels: Live-Container der Channel IDs (str) mit O(1) `in`, z.B. set oder dict
+            include_bots: True liefert auch Nachrichten von Bots (inkl. des eigenen)
+        """
+        self._routes[name] = _Route(name, handler, channels, include_bots)
+
+    def remove_route(self, name):
+        self._routes.pop(name, None)
+
+    async def on_message(self, message):
+        self.received += 1
+
+        # Vorfilter: DMs, danach Bots und ein Set-Lookup pro Route
+        if message.guild is None:
+            self.dropped += 1
+            return
+
+        is_bot = message.author.bot
+        channel_id = str(message.channel.id)
+        routes = [route for route in self._routes.values()
+                  if (route.include_bots or not is_bot) and channel_id in route.channels]
+        if not routes:
+            self.dropped += 1
+            return
+
+        for route in routes:
+            start = time.perf_counter()
+            try:
+                await route.handler(message, channel_id)
+            except Exception as e:
+                route.errors += 1
+                logging.error(f"❌ Fehler im Message-Handler '{route.name}': {e}")
+            elapsed = time.perf_counter() - start
+            route.calls += 1
+            route.total_time += elapsed
+            route.max_time = max(route.max_time, elapsed)
+
+    def stats(self):
+        """Statistiken: verworfene Nachrichten und Laufzeit pro Handler (ms)"""
+        return {
+            'received': self.received,
+            'dropped': self.dropped,
+            'routes': {
+                route.name: {
+                    'calls': route.calls,
+                    'errors': route.errors,
+                    'avg_ms': round(route.total_time / route.calls * 1000, 3) if route.calls else 0.0,
+                    'max_ms': round(route.max_time * 1000, 3)
+                }
+                for route in self._routes.values()
+            }
+        }
+
+
+def get_message_router(bot):
+    """Gibt den Router des Bots zurück (wird beim ersten Aufruf als einziger on_message Listener registriert)"""
+    router = getattr(bot, 'message_router', None)
+    if router is None:
+        router = MessageRouter()
+        bot.message_router = router
+        bot.add_listener(router.on_message, 'on_message')
+    return router
@@ -6,13 +6,31 @@ Kompatibel mit bestehender bot_roles.json Struktur
 """
 import os
 import json
+import time
 import logging
+import threading
 from src.utils.path_manager import get_application_path
-from src.utils.secure_storage import SecureStorage
+from src.utils.persistence_worker import PersistenceWorker
+from src.utils.secure_storage import (
+    key_provider,
+    list_shard_guilds,
+    load_bot_roles_secure,
+    save_bot_roles_secure,
+    save_guild_bot_roles_secure,
+    load_guild_bot_roles_secure,
+    get_bot_roles_file_signature,
+    get_bot_roles_guild_stamps,
+    changed_shard_guilds
+)
 
 
 def get_bot_token():
-    """Holt den Bot Token für die Verschlüsselung"""
+    """Holt den Bot Token für die Verschlüsselung (einmal aufgelöst, danach gecached)"""
+    return key_provider.get_token(_resolve_bot_token)
+
+
+def _resolve_bot_token():
+    """Ermittelt den Bot Token aus .env, Umgebung, Bot-Instanz oder Hardware-Fallback"""
     try:
         # 1. HÖCHSTE PRIORITÄT: Direkt aus .env Datei laden
         app_path = get_application_path()
@@ -89,6 +107,12 @@ def get_bot_token():
         return "critical_fallback_sticky_bot_emergency_key_2024"
 
 
+def invalidate_key_cache():
+    """Verwirft gecachten Token, Schlüssel und Berechtigungs-Index (z.B. nach Token-Änderung)"""
+    key_provider.invalidate()
+    _permission_index.invalidate()
+
+
 def get_permissions_file():
     """Gibt den Pfad zur Berechtigungsdatei zurück"""
     app_path = get_application_path()
@@ -100,13 +124,187 @@ def get_permissions_file():
     return os.path.join(data_dir, 'bot_roles.json')
 
 
+class PermissionIndex:
+    """In-Memory Index der Berechtigungen mit (guild_id, user_id) -> Rolle Lookups"""
+
+    def __init__(self, check_interval=1.0):
+        """
+        Args:
+            check_interval: Mindestabstand in Sekunden zwischen zwei Datei-Prüfungen
+        """
+        self.check_interval = check_interval
+        self.guilds = {}  # guild_id -> {'masters': [...], 'editors': [...]}
+        self.roles = {}   # (guild_id, user_id) -> 'master' | 'editor'
+        self._signature = None
+        self._guild_stamps = None  # guild_id -> Signatur der Rollen-Shards beim letzten Laden
+        self._last_check = 0.0
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _current_signature():
+        return get_bot_roles_file_signature(get_bot_token())
+
+    def is_stale(self):
+        """Prüft (gedrosselt per stat) ob die Datei extern geändert wurde"""
+        if self._signature is None:
+            return True
+
+        # Eigene Änderungen noch nicht geschrieben - Neuladen würde sie verwerfen
+        if _roles_writer.pending():
+            return False
+
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return False
+        self._last_check = now
+
+        return self._current_signature() != self._signature
+
+    def ensure_loaded(self):
+        """Lädt die Berechtigungen nur neu wenn sich die Datei geändert hat"""
+        if not self.is_stale():
+            return
+        with self._lock:
+            signature = self._current_signature()
+            guild_stamps = get_bot_roles_guild_stamps()
+            changed = self._changed_guilds(signature, guild_stamps)
+            if changed is None:
+                self.replace(_load_permissions_from_disk())
+            else:
+                # Nur die Guilds neu laden, deren Shard sich geändert hat
+                for guild_id in changed:
+                    self.restore_guild(guild_id, _load_guild_permissions(guild_id))
+            self._signature = signature
+            self._guild_stamps = guild_stamps
+
+    def _changed_guilds(self, signature, guild_stamps):
+        """Geänderte Guilds oder None wenn komplett neu geladen werden muss"""
+        if self._signature is None or self._guild_stamps is None or guild_stamps is None:
+            return None
+        if signature[1:] != self._signature[1:]:
+            # bot_roles.json(.enc) - Migration nur beim kompletten Laden
+            return None
+        return changed_shard_guilds(self._guild_stamps, guild_stamps)
+
+    def replace(self, permissions):
+        """Ersetzt den kompletten Index (z.B. nach Laden oder Speichern)"""
+        with self._lock:
+            self.guilds = {}
+            self.roles = {}
+            for guild_str, perms in permissions.items():
+                self.guilds[guild_str] = {
+                    'masters': list(perms.get('masters', [])),
+                    'editors': list(perms.get('editors', []))
+                }
+                for user_str in self.guilds[guild_str]['editors']:
+                    self.roles[(guild_str, user_str)] = 'editor'
+                for user_str in self.guilds[guild_str]['masters']:
+                    self.roles[(guild_str, user_str)] = 'master'
+
+    def invalidate(self):
+        """Erzwingt ein Neuladen beim nächsten Zugriff"""
+        self._signature = None
+
+    def mark_saved(self):
+        """Merkt sich die Signatur nach einem eigenen Schreibvorgang"""
+        self._signature = self._current_signature()
+        self._guild_stamps = get_bot_roles_guild_stamps()
+        self._last_check = time.monotonic()
+
+    def role_of(self, guild_id, user_id):
+        """Gibt die Rolle eines Users zurück ('master', 'editor' oder None)"""
+        return self.roles.get((str(guild_id), str(user_id)))
+
+    def set_role(self, guild_id, user_id, role):
+        """Setzt die Rolle eines Users in-place"""
+        guild_str = str(guild_id)
+        user_str = str(user_id)
+        with self._lock:
+            perms = self.guilds.setdefault(guild_str, {'masters': [], 'editors': []})
+            for key in ('masters', 'editors'):
+                if user_str in perms[key]:
+                    perms[key].remove(user_str)
+            perms['masters' if role == 'master' else 'editors'].append(user_str)
+            self.roles[(guild_str, user_str)] = role
+
+    def remove_user(self, guild_id, user_id):
+        """Entfernt alle Rollen eines Users in-place"""
+        guild_str = str(guild_id)
+        user_str = str(user_id)
+        with self._lock:
+            if self.roles.pop((guild_str, user_str), None) is None:
+                return False
+            perms = self.guilds.get(guild_str, {})
+            for key in ('masters', 'editors'):
+                if user_str in perms.get(key, []):
+                    perms[key].remove(user_str)
+            return True
+
+    def is_listed(self, guild_id, user_id, key):
+        """Prüft ob ein User in der Liste 'masters' bzw. 'editors' einer Guild steht"""
+        perms = self.guilds.get(str(guild_id))
+        return bool(perms) and str(user_id) in perms.get(key, [])
+
+    def guild_state(self, guild_id):
+        """Kopie des Stands einer Guild (für ein Zurücksetzen) oder None"""
+        with self._lock:
+            perms = self.guilds.get(str(guild_id))
+            if perms is None:
+                return None
+            return {'masters': list(perms['masters']), 'editors': list(perms['editors'])}
+
+    def restore_guild(self, guild_id, state):
+        """Setzt eine Guild auf einen mit guild_state gemerkten Stand zurück"""
+        guild_str = str(guild_id)
+        with self._lock:
+            for key in [key for key in self.roles if key[0] == guild_str]:
+                del self.roles[key]
+            if state is None:
+                self.guilds.pop(guild_str, None)
+                return
+            self.guilds[guild_str] = {'masters': list(state['masters']), 'editors': list(state['editors'])}
+            for user_str in state['editors']:
+                self.roles[(guild_str, user_str)] = 'editor'
+            for user_str in state['masters']:
+                self.roles[(guild_str, user_str)] = 'master'
+
+    def to_permissions(self):
+        """Gibt eine Kopie im internen Berechtigungsformat zurück"""
+        with self._lock:
+            return {
+                guild_str: {
+                    'masters': list(perms['masters']),
+                    'editors': list(perms['editors'])
+                }
+                for guild_str, perms in self.guilds.items()
+            }
+
+
+# Prozessweiter Berechtigungs-Index
+_permission_index = PermissionIndex()
+
+
+def get_permission_index():
+    """Gibt den aktuellen Berechtigungs-Index zurück (lädt nur bei Dateiänderung neu)"""
+    _permission_index.ensure_loaded()
+    return _permission_index
+
+
 def load_permissions():
-    """Lädt die Berechtigungen aus der verschlüsselten bot_roles.json"""
+    """Lädt die Berechtigungen aus dem In-Memory Index (Kopie, darf verändert werden)"""
+    try:
+        return get_permission_index().to_permissions()
+    except Exception as e:
+        logging.error(f"Fehler beim Laden der Berechtigungen: {e}")
+        return {}
+
+
+def _load_permissions_from_disk():
+    """Lädt die Berechtigungen aus den verschlüsselten Guild-Shards (data/guilds/<guild_id>/roles.enc)"""
     try:
         bot_token = get_bot_token()
-        storage = SecureStorage(bot_token)
         
-        bot_roles = storage.load_encrypted_json("data/bot_roles.json")
+        bot_roles = load_bot_roles_secure(bot_token)
         
         if not bot_roles:
             # Migration von unverschlüsselter Datei
@@ -137,6 +335,18 @@ def load_permissions():
         return {}
 
 
+def _load_guild_permissions(guild_id):
+    """Lädt die Berechtigungen einer einzelnen Guild (None wenn keine vorhanden)"""
+    try:
+        roles = load_guild_bot_roles_secure(guild_id, get_bot_token())
+    except Exception as e:
+        logging.error(f"Fehler beim Laden der Berechtigungen für Server {guild_id}: {e}")
+        return None
+    if not roles:
+        return None
+    return {'masters': roles.get('admin', []), 'editors': roles.get('editor', [])}
+
+
 def save_permissions(permissions):
     """Speichert die Berechtigungen verschlüsselt"""
     try:
@@ -159,11 +369,12 @@ def save_permissions_from_bot_roles(bot_roles):
     """Speichert bot_roles Format verschlüsselt"""
     try:
         bot_token = get_bot_token()
-        storage = SecureStorage(bot_token)
         
-        success = storage.save_encrypted_json(bot_roles, "data/bot_roles.json")
+        # Nur Guilds mit geänderten Rollen werden neu verschlüsselt
+        success = save_bot_roles_secure(bot_roles, bot_token)
         
         if success:
+            _update_index_from_bot_roles(bot_roles)
             return True
         else:
             raise Exception("Verschlüsseltes Speichern fehlgeschlagen")
@@ -184,6 +395,7 @@ def save_permissions_from_bot_roles(bot_roles):
                 json.dump(bot_roles, f, indent=2, ensure_ascii=False)
                 
             logging.warning("Berechtigungen unverschlüsselt gespeichert (Fallback)")
+            _update_index_from_bot_roles(bot_roles)
             return True
             
         except Exception as fallback_error:
@@ -191,18 +403,103 @@ def save_permissions_from_bot_roles(bot_roles):
             return False
 
 
+def _update_index_from_bot_roles(bot_roles):
+    """Übernimmt gespeicherte bot_roles in den In-Memory Index"""
+    _permission_index.replace({
+        guild_id: {
+            'masters': roles.get('admin', []),
+            'editors': roles.get('editor', [])
+        }
+        for guild_id, roles in bot_roles.items()
+    })
+    _permission_index.mark_saved()
+
+
+def _write_guild_roles(changes):
+    """Schreibt geänderte Guilds {guild_id: bot_roles} verschlüsselt (im Persistenz-Thread)"""
+    bot_token = get_bot_token()
+    for guild_id, roles in changes.items():
+        if not save_guild_bot_roles_secure(guild_id, roles, bot_token):
+            raise Exception(f"Verschlüsseltes Speichern für Server {guild_id} fehlgeschlagen")
+    _permission_index.mark_saved()
+
+
+# Schreibt Berechtigungen gebündelt außerhalb des Event Loops
+_roles_writer = PersistenceWorker("Berechtigungen", _write_guild_roles)
+
+
+def _guild_bot_roles(guild_id):
+    """Stand einer Guild aus dem Index im bot_roles Format (leer = Guild entfernen)"""
+    perms = _permission_index.to_permissions().get(str(guild_id))
+    if not perms or not (perms['masters'] or perms['editors']):
+        return {}
+    return {'admin': perms['masters'], 'editor': perms['editors'], 'viewer': []}
+
+
+def _persist_index(*guild_ids):
+    """Merkt die geänderten Guilds zum verschlüsselten Speichern im Hintergrund vor"""
+    try:
+        _roles_writer.mark_dirty(changes={str(guild_id): _guild_bot_roles(guild_id) for guild_id in guild_ids})
+        return True
+    except Exception as e:
+        logging.error(f"Fehler beim Vormerken der Berechtigungen: {e}")
+        return False
+
+
+def _update_guild(guild_id, change):
+    """
+    Ändert eine Guild im Index und merkt sie zum Speichern vor - schlägt das fehl,
+    wird der vorherige Stand wiederhergestellt
+
+    Args:
+        change: Funktion(index) - ändert den Index in-place
+    """
+    index = get_permission_index()
+    before = index.guild_state(guild_id)
+    change(index)
+    if _persist_index(guild_id):
+        return True
+    index.restore_guild(guild_id, before)
+    return False
+
+
+def queue_bot_roles_save(bot_roles):
+    """
+    Übernimmt bot_roles sofort in den Index und speichert nur geänderte Guilds im Hintergrund
+    (für Aufrufe aus dem Event Loop - blockiert nicht)
+    """
+    try:
+        before = _permission_index.to_permissions()
+        _permission_index.replace({
+            guild_id: {
+                'masters': roles.get('admin', []),
+                'editors': roles.get('editor', [])
+            }
+            for guild_id, roles in bot_roles.items()
+        })
+        after = _permission_index.to_permissions()
+
+        changed = [guild_id for guild_id in set(before) | set(after)
+                   if before.get(guild_id) != after.get(guild_id)]
+        if _persist_index(*changed):
+            return True
+        _permission_index.replace(before)
+        return False
+
+    except Exception as e:
+        logging.error(f"Fehler beim Vormerken der Berechtigungen: {e}")
+        return False
+
+
+def flush_permissions(timeout=10.0):
+    """Schreibt ausstehende Berechtigungsänderungen sofort"""
+    return _roles_writer.flush(timeout)
+
+
 def is_bot_admin(user_id, guild_id):
     """Prüft ob ein User Bot Master ist"""
     try:
-        permissions = load_permissions()
-        guild_str = str(guild_id)
-        user_str = str(user_id)
-        
-        if guild_str not in permissions:
-            return False
-        
-        masters = permissions[guild_str].get('masters', [])
-        return user_str in masters
+        return get_permission_index().role_of(guild_id, user_id) == 'master'
         
     except Exception as e:
         logging.error(f"Fehler bei Bot Admin Prüfung: {e}")
@@ -212,15 +509,8 @@ def is_bot_admin(user_id, guild_id):
 def is_bot_editor(user_id, guild_id):
     """Prüft ob ein User Bot Editor ist"""
     try:
-        permissions = load_permissions()
-        guild_str = str(guild_id)
-        user_str = str(user_id)
-        
-        if guild_str not in permissions:
-            return False
-        
-        editors = permissions[guild_str].get('editors', [])
-        return user_str in editors
+        # Listen-Zugehörigkeit statt höchster Rolle - wer auch Master ist, bleibt Editor
+        return get_permission_index().is_listed(guild_id, user_id, 'editors')
         
     except Exception as e:
         logging.error(f"Fehler bei Bot Editor Prüfung: {e}")
@@ -235,22 +525,14 @@ def has_bot_permissions(user_id, guild_id):
 def add_bot_master(user_id, guild_id):
     """Fügt einen Bot Master hinzu"""
     try:
-        permissions = load_permissions()
-        guild_str = str(guild_id)
-        user_str = str(user_id)
-        
-        if guild_str not in permissions:
-            permissions[guild_str] = {'masters': [], 'editors': []}
-        
-        # User von Editors entfernen falls vorhanden
-        if user_str in permissions[guild_str].get('editors', []):
-            permissions[guild_str]['editors'].remove(user_str)
+        index = get_permission_index()
         
-        # Als Master hinzufügen falls noch nicht vorhanden
-        if user_str not in permissions[guild_str].get('masters', []):
-            permissions[guild_str]['masters'].append(user_str)
+        # Bereits Master und nicht mehr als Editor gelistet - nichts zu tun
+        if index.role_of(guild_id, user_id) == 'master' and not index.is_listed(guild_id, user_id, 'editors'):
+            return True
         
-        return save_permissions(permissions)
+        # Als Master setzen (entfernt den User automatisch von den Editors)
+        return _update_guild(guild_id, lambda index: index.set_role(guild_id, user_id, 'master'))
         
     except Exception as e:
         logging.error(f"Fehler beim Hinzufügen des Bot Masters: {e}")
@@ -260,22 +542,14 @@ def add_bot_master(user_id, guild_id):
 def add_bot_editor(user_id, guild_id):
     """Fügt einen Bot Editor hinzu"""
     try:
-        permissions = load_permissions()
-        guild_str = str(guild_id)
-        user_str = str(user_id)
-        
-        if guild_str not in permissions:
-            permissions[guild_str] = {'masters': [], 'editors': []}
+        index = get_permission_index()
         
-        # Prüfen ob bereits Master
-        if user_str in permissions[guild_str].get('masters', []):
+        # Prüfen ob bereits Master oder Editor
+        if index.role_of(guild_id, user_id) is not None:
             return True
         
-        # Als Editor hinzufügen falls noch nicht vorhanden
-        if user_str not in permissions[guild_str].get('editors', []):
-            permissions[guild_str]['editors'].append(user_str)
-        
-        return save_permissions(permissions)
+        # Als Editor hinzufügen
+        return _update_guild(guild_id, lambda index: index.set_role(guild_id, user_id, 'editor'))
         
     except Exception as e:
         logging.error(f"Fehler beim Hinzufügen des Bot Editors: {e}")
@@ -285,27 +559,9 @@ def add_bot_editor(user_id, guild_id):
 def remove_bot_permissions(user_id, guild_id):
     """Entfernt alle Bot-Berechtigungen eines Users"""
     try:
-        permissions = load_permissions()
-        guild_str = str(guild_id)
-        user_str = str(user_id)
-        
-        if guild_str not in permissions:
-            return True
-        
-        removed = False
-        
-        if user_str in permissions[guild_str].get('masters', []):
-            permissions[guild_str]['masters'].remove(user_str)
-            removed = True
-        
-        if user_str in permissions[guild_str].get('editors', []):
-            permissions[guild_str]['editors'].remove(user_str)
-            removed = True
-        
-        if removed:
-            return save_permissions(permissions)
-        else:
+        if get_permission_index().role_of(guild_id, user_id) is None:
             return True
+        return _update_guild(guild_id, lambda index: index.remove_user(guild_id, user_id))
         
     except Exception as e:
         logging.error(f"Fehler beim Entfernen der Bot-Berechtigungen: {e}")
@@ -315,10 +571,11 @@ def remove_bot_permissions(user_id, guild_id):
 def get_server_permissions(guild_id):
     """Gibt alle Berechtigungen für einen Server zurück"""
     try:
-        permissions = load_permissions()
-        guild_str = str(guild_id)
+        permissions = get_permission_index().guilds.get(str(guild_id))
+        if not permissions:
+            return {'masters': [], 'editors': []}
         
-        return permissions.get(guild_str, {'masters': [], 'editors': []})
+        return {'masters': list(permissions['masters']), 'editors': list(permissions['editors'])}
         
     except Exception as e:
         logging.error(f"Fehler beim Abrufen der Server-Berechtigungen: {e}")
@@ -413,8 +670,8 @@ def initialize_permissions():
         permissions_file = os.path.join(app_path, 'data', 'bot_roles.json')
         encrypted_permissions_file = os.path.join(app_path, 'data', 'bot_roles.json.enc')
         
-        # Prüfe auf verschlüsselte Datei
-        if os.path.exists(encrypted_permissions_file):
+        # Prüfe auf verschlüsselte Datei (monolithisch oder bereits auf Guild-Shards verteilt)
+        if os.path.exists(encrypted_permissions_file) or list_shard_guilds('roles'):
             perms = load_permissions()
             return
         
@@ -0,0 +1,217 @@
+"""
+Hintergrund-Persistenz für Sticky-Bot
+Schreibvorgänge (Verschlüsselung + Datei-I/O) laufen in einem eigenen Thread
+statt im Discord Event Loop. Mehrere Änderungen innerhalb eines kurzen
+Zeitfensters werden zu einem Schreibvorgang zusammengefasst.
+"""
+import time
+import atexit
+import logging
+import threading
+
+# Alle erstellten Worker (für flush beim Beenden und Statistiken)
+_workers = []
+_workers_lock = threading.Lock()
+
+
+class PersistenceWorker:
+    """Entprellter Schreib-Thread: nimmt Dirty-Marks entgegen und schreibt gebündelt"""
+
+    def __init__(self, name, write_changes, write_full=None, delay=0.5):
+        """
+        Args:
+            name: Anzeigename für Logs und Statistiken
+            write_changes: Funktion(changes) - schreibt einzelne Änderungen {key: wert}
+            write_full: Funktion(snapshot) - schreibt einen kompletten Stand (optional, snapshot ist
+                        ein Mapping {key: wert}; Änderungen mit Wert None entfernen den Key)
+            delay: Zeitfenster in Sekunden, in dem Änderungen zusammengefasst werden
+        """
+        self.name = name
+        self.write_changes = write_changes
+        self.write_full = write_full
+        self.delay = delay
+
+        self._condition = threading.Condition()
+        self._changes = {}
+        self._snapshot = None
+        self._writing = False
+        self._flush_requested = False
+        self._thread = None
+
+        # Statistiken
+        self.writes = 0
+        self.marks = 0
+        self.errors = 0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self.total_latency = 0.0
+
+        with _workers_lock:
+            _workers.append(self)
+
+    def mark_dirty(self, changes=None, snapshot=None):
+        """
+        Merkt Änderungen zum Schreiben vor (kehrt sofort zurück)
+
+        Args:
+            changes: {key: wert} - neuere Werte überschreiben ältere Marks
+            snapshot: Kompletter Stand (ersetzt alle bisherigen Einzeländerungen)
+        """
+        with self._condition:
+            if snapshot is not None:
+                self._snapshot = snapshot
+                self._changes = {}
+            if changes:
+                self._changes.update(changes)
+            self.marks += 1
+            self._ensure_thread()
+            self._condition.notify_all()
+
+    def queue_depth(self):
+        """Anzahl der noch nicht geschriebenen Einträge"""
+        with self._condition:
+            return len(self._changes) + (1 if self._snapshot is not None else 0)
+
+    def pending(self):
+        """True solange Änderungen ausstehen oder gerade geschrieben werden"""
+        with self._condition:
+            return self._writing or bool(self._changes) or self._snapshot is not None
+
+    def flush(self, timeout=10.0):
+        """
+        Schreibt alle ausstehenden Änderungen sofort und wartet darauf
+
+        Returns:
+            bool: True wenn beim Rückkehren nichts mehr aussteht
+        """
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            if not self.pending():
+                return True
+            self._flush_requested = True
+            self._ensure_thread()
+            self._condition.notify_all()
+            while self.pending():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logging.warning(f"⚠️ {self.name}: Flush-Timeout, {self.queue_depth()} Einträge ausstehend")
+                    return False
+                self._condition.wait(remaining)
+            return True
+
+    def stats(self):
+        """Statistiken: Warteschlangen-Tiefe und Schreib-Latenz (ms)"""
+        with self._condition:
+            return {
+                'name': self.name,
+                'queue_depth': self.queue_depth(),
+                'marks': self.marks,
+                'writes': self.writes,
+                'errors': self.errors,
+                'last_latency_ms': round(self.last_latency * 1000, 1),
+                'avg_latency_ms': round(self.total_latency / self.writes * 1000, 1) if self.writes else 0.0,
+                'max_latency_ms': round(self.max_latency * 1000, 1)
+            }
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name=f"PersistenceWorker-{self.name}", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._changes and self._snapshot is None:
+                    self._condition.wait()
+
+                # Zeitfenster abwarten, um weitere Änderungen zu bündeln (flush bricht ab)
+                deadline = time.monotonic() + self.delay
+                while not self._flush_requested:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+
+                changes, self._changes = self._changes, {}
+                snapshot, self._snapshot = self._snapshot, None
+                self._flush_requested = False
+                self._writing = True
+
+            failed = False
+            start = time.perf_counter()
+            try:
+                if snapshot is not None:
+                    self.write_full(snapshot)
+                if changes:
+                    self.write_changes(changes)
+            except Exception as e:
+                failed = True
+                logging.error(f"❌ {self.name}: Hintergrund-Speichern fehlgeschlagen: {e}")
+            latency = time.perf_counter() - start
+
+            with self._condition:
+                if failed:
+                    self.errors += 1
+                    self._requeue(snapshot, changes)
+                else:
+                    self.writes += 1
+                    self.last_latency = latency
+                    self.max_latency = max(self.max_latency, latency)
+                    self.total_latency += latency
+                    logging.debug(f"💾 {self.name}: geschrieben in {latency * 1000:.1f}ms "
+                                  f"(Warteschlange: {self.queue_depth()})")
+                self._writing = False
+                self._condition.notify_all()
+
+            if failed:
+                time.sleep(max(self.delay, 1.0))
+
+    def _requeue(self, snapshot, changes):
+        """
+        Stellt einen fehlgeschlagenen Schreibvorgang erneut ein - neuere Marks haben Vorrang
+        (Aufruf unter self._condition)
+        """
+        if self._snapshot is not None:
+            # Während des Schreibens wurde ein neuerer Gesamtstand vorgemerkt - er enthält
+            # alles aus dem fehlgeschlagenen Durchlauf, ein erneutes Schreiben der alten
+            # Änderungen würde ihn mit veralteten Daten überschreiben
+            return
+
+        if snapshot is not None:
+            # Änderungen sind neuer als der Snapshot - in ihn übernehmen statt sie einzeln
+            # nach einem späteren Snapshot erneut zu schreiben
+            for key, value in changes.items():
+                if value is None:
+                    snapshot.pop(key, None)
+                else:
+                    snapshot[key] = value
+            self._snapshot = snapshot
+            return
+
+        for key, value in changes.items():
+            self._changes.setdefault(key, value)
+
+
+def flush_all(timeout=10.0):
+    """Schreibt die ausstehenden Änderungen aller Worker (z.B. beim Beenden)"""
+    with _workers_lock:
+        workers = list(_workers)
+
+    success = True
+    for worker in workers:
+        if worker.pending():
+            logging.info(f"💾 {worker.name}: {worker.queue_depth()} ausstehende Änderungen werden gespeichert...")
+        success = worker.flush(timeout) and success
+    return success
+
+
+def get_persistence_stats():
+    """Statistiken aller Persistenz-Worker"""
+    with _workers_lock:
+        return [worker.stats() for worker in _workers]
+
+
+# Daemon-Threads werden beim Beenden abgebrochen - vorher alles schreiben
+atexit.register(flush_all)
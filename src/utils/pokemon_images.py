@@ -0,0 +1,268 @@
+"""
+Pokémon-Thumbnails für Sticky Messages
+Ein mitgelieferter Index (src/assets/pokemon_index.json) deckt alle IDs ab und
+wird einmal beim Start geladen - die Auswahl eines Thumbnails ist ein reiner
+Speicherzugriff ohne Netzwerkanfrage. Ein Hintergrund-Job aktualisiert und
+erweitert den Index (data/pokemon_index.json), sobald die PokeAPI erreichbar ist.
+
+Index-Format:
+    {"version", "count", "artwork": URL-Vorlage mit {id}}
+Die Artwork-URLs sind deterministisch - der Index enthält nur Umfang und Vorlage.
+Namen werden nicht gespeichert, da sie in den Sticky Messages nicht angezeigt werden.
+"""
+import os
+import time
+import random
+import asyncio
+import logging
+import aiohttp
+from collections import deque
+from src.config.config import POKEMON_INDEX_FILE
+from src.utils.db_manager import load_json_file, save_json_file
+
+POKEMON_COUNT = 898  # IDs 1-898 (bis einschließlich Generation 8) - Umfang des mitgelieferten Index
+POKEAPI_URL = 'https://pokeapi.co/api/v2'
+BUNDLED_INDEX_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'assets', 'pokemon_index.json')
+REFRESH_INTERVAL = 24 * 60 * 60  # Sekunden zwischen zwei Aktualisierungen
+REFRESH_START_DELAY = 30  # Bot-Start nicht mit der Aktualisierung belasten
+PREFETCH_POOL_SIZE = 8  # Anzahl geprüfter Einträge, die zum Senden bereitliegen
+PREFETCH_RETRY_DELAY = 60  # Wartezeit nach fehlgeschlagener Prüfung (z.B. offline)
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=5, connect=2)
+HEADERS = {'User-Agent': 'StickyBot/1.0'}
+
+
+def load_pokemon_index(index_file=POKEMON_INDEX_FILE):
+    """
+    Lädt den aktuellsten Index: aktualisierte Kopie in data/, sonst den mitgelieferten
+
+    Returns:
+        dict: Index oder None wenn keiner lesbar ist
+    """
+    bundled = load_json_file(BUNDLED_INDEX_FILE, None)
+    refreshed = load_json_file(str(index_file), None)
+
+    candidates = [index for index in (refreshed, bundled) if _is_valid_index(index)]
+    if not candidates:
+        logging.error("❌ Kein gültiger Pokémon-Index gefunden")
+        return None
+    # Die aktualisierte Kopie hat Vorrang, solange sie nicht kleiner ist als der mitgelieferte Index
+    return max(candidates, key=lambda index: index['count'])
+
+
+def _is_valid_index(index):
+    return (
+        isinstance(index, dict) and
+        isinstance(index.get('count'), int) and index['count'] > 0 and
+        '{id}' in str(index.get('artwork', ''))
+    )
+
+
+class PokemonImageProvider:
+    """Liefert zufällige Pokémon-Artworks aus dem Index im Speicher"""
+
+    def __init__(self, index_file=POKEMON_INDEX_FILE):
+        self.index_file = str(index_file)
+        self.index = None
+        self.entries = []  # [url] - Auswahl per random.choice in O(1)
+        self._session = None
+        self._refresh_task = None
+        self._apply_index(load_pokemon_index(self.index_file))
+
+    def _apply_index(self, index):
+        """Baut die Auswahlliste aus einem Index auf"""
+        if index is None:
+            return
+        self.entries = [index['artwork'].format(id=pokemon_id) for pokemon_id in range(1, index['count'] + 1)]
+        self.index = index
+        logging.debug(f"🖼️ Pokémon-Index geladen: {len(self.entries)} Einträge")
+
+    def _get_session(self):
+        """Gemeinsame Session (wird beim ersten Zugriff im laufenden Event Loop erstellt)"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=REQUEST_TIMEOUT,
+                headers=HEADERS,
+                connector=aiohttp.TCPConnector(limit=10, keepalive_timeout=60)
+            )
+        return self._session
+
+    async def close(self):
+        """Beendet den Aktualisierungs-Job und schließt die Session"""
+        if self._refresh_task and not self._refresh_task.done():
+            self._refresh_task.cancel()
+        if self._session and not self._session.closed:
+            await self._session.close()
+
+    def start_refresh(self):
+        """Startet den Hintergrund-Job, der den Index regelmäßig aktualisiert"""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def _refresh_loop(self):
+        await asyncio.sleep(REFRESH_START_DELAY)
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.warning(f"⚠️ Pokémon-Index konnte nicht aktualisiert werden: {e}")
+            await asyncio.sleep(REFRESH_INTERVAL)
+
+    async def refresh(self):
+        """
+        Erweitert den Umfang des Index über die PokeAPI (eine Listen-Anfrage)
+        Neue IDs werden nur übernommen, wenn für sie ein Artwork erreichbar ist.
+
+        Returns:
+            bool: True wenn sich der Index geändert hat
+        """
+        if self.index is None:
+            return False
+
+        async with self._get_session().get(f'{POKEAPI_URL}/pokemon-species?limit=10000') as response:
+            if response.status != 200:
+                logging.warning(f"⚠️ Pokémon-Liste nicht verfügbar (HTTP {response.status})")
+                return False
+            data = await response.json()
+
+        known_ids = set()
+        for entry in data.get('results', []):
+            pokemon_id = entry['url'].rstrip('/').rsplit('/', 1)[-1]
+            if pokemon_id.isdigit():
+                known_ids.add(int(pokemon_id))
+
+        # Nur lückenlos anschließende IDs mit erreichbarem Artwork aufnehmen
+        index = dict(self.index)
+        count = index['count']
+        while count + 1 in known_ids and await self._is_reachable(index['artwork'].format(id=count + 1)):
+            count += 1
+
+        if count == index['count']:
+            return False
+
+        index['count'] = count
+        await asyncio.to_thread(save_json_file, self.index_file, index)
+        self._apply_index(index)
+        logging.info(f"🖼️ Pokémon-Index aktualisiert: {count} Einträge")
+        return True
+
+    async def _is_reachable(self, url):
+        async with self._get_session().head(url) as response:
+            return response.status == 200
+
+    async def resolve_random(self):
+        """
+        Zufälliges Pokémon, dessen Artwork erreichbar ist
+
+        Returns:
+            dict: {'url': ...} oder None wenn das Artwork nicht erreichbar ist
+        """
+        if not self.entries:
+            return None
+        url = random.choice(self.entries)
+        if not await self._is_reachable(url):
+            return None
+        return {'url': url}
+
+    def get_random(self):
+        """
+        Zufälliges Pokémon-Artwork (reiner Speicherzugriff)
+
+        Returns:
+            dict: {'url': ...} oder None
+        """
+        if not self.entries:
+            return None
+        return {'url': random.choice(self.entries)}
+
+
+class PokemonPrefetchPool:
+    """
+    Hält die nächsten zufälligen Thumbnails geprüft bereit, damit beim Senden
+    keine Abfrage mehr nötig ist. Wird im Hintergrund nachgefüllt.
+    """
+
+    def __init__(self, provider, size=PREFETCH_POOL_SIZE):
+        self.provider = provider
+        self.size = size
+        self._ready = deque()
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+        # Statistiken
+        self.hits = 0
+        self.misses = 0
+        self.refills = 0
+        self.refill_failures = 0
+        self.last_refill_latency = 0.0
+        self.total_refill_latency = 0.0
+
+    def start(self):
+        """Startet das Nachfüllen im Hintergrund"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._refill_loop())
+
+    async def stop(self):
+        """Beendet das Nachfüllen"""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def take(self):
+        """
+        Nächstes bereitliegendes Thumbnail (ungeprüfter Index-Eintrag, falls der Pool leer ist)
+
+        Returns:
+            dict: {'url': ...} oder None
+        """
+        self._wakeup.set()
+        if self._ready:
+            self.hits += 1
+            return self._ready.popleft()
+        self.misses += 1
+        return self.provider.get_random()
+
+    async def _refill_loop(self):
+        while True:
+            while len(self._ready) < self.size:
+                start = time.perf_counter()
+                try:
+                    entry = await self.provider.resolve_random()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logging.debug(f"Pokémon-Prefetch fehlgeschlagen: {e}")
+                    entry = None
+
+                if entry is None:
+                    # Offline oder kein Artwork - später erneut versuchen, Sendepfad nutzt den Index direkt
+                    self.refill_failures += 1
+                    await asyncio.sleep(PREFETCH_RETRY_DELAY)
+                    continue
+
+                latency = time.perf_counter() - start
+                self.refills += 1
+                self.last_refill_latency = latency
+                self.total_refill_latency += latency
+                self._ready.append(entry)
+
+            self._wakeup.clear()
+            await self._wakeup.wait()
+
+    def stats(self):
+        """Statistiken: Trefferquote und Nachfüll-Latenz (ms)"""
+        requests = self.hits + self.misses
+        return {
+            'ready': len(self._ready),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / requests, 3) if requests else 0.0,
+            'refills': self.refills,
+            'refill_failures': self.refill_failures,
+            'last_refill_latency_ms': round(self.last_refill_latency * 1000, 1),
+            'avg_refill_latency_ms': round(self.total_refill_latency / self.refills * 1000, 1) if self.refills else 0.0
+        }
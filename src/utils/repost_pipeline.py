@@ -0,0 +1,158 @@
+"""
+Repost-Pipeline für Sticky Messages
+Das Löschen der alten Sticky läuft parallel zum Bauen und Senden der neuen.
+Fehlgeschlagene Löschvorgänge werden im Hintergrund wiederholt, ohne den neuen
+Post zu verzögern. Die Latenz jeder Stufe wird gemessen.
+
+Reihenfolge: Die zu löschende ID steht vor dem Senden fest - die Pipeline
+löscht daher nie die gerade gesendete Sticky.
+"""
+import time
+import asyncio
+import logging
+import discord
+from src.utils.request_scheduler import PRIORITY_REPOST, PRIORITY_CLEANUP
+
+DELETE_RETRIES = 3       # Wiederholungen für fehlgeschlagene Löschvorgänge
+DELETE_RETRY_DELAY = 2.0  # Sekunden, verdoppelt sich pro Versuch
+
+
+class _StageTimer:
+    __slots__ = ('count', 'total', 'max', 'last')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.last = seconds
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'avg_ms': round(self.total / self.count * 1000, 1) if self.count else 0.0,
+            'max_ms': round(self.max * 1000, 1),
+            'last_ms': round(self.last * 1000, 1)
+        }
+
+
+class RepostPipeline:
+    """Löscht die alte und sendet die neue Sticky gleichzeitig"""
+
+    def __init__(self, requests, delete_retries=DELETE_RETRIES, retry_delay=DELETE_RETRY_DELAY):
+        """
+        Args:
+            requests: RequestScheduler für alle API-Aufrufe
+        """
+        self.requests = requests
+        self.delete_retries = delete_retries
+        self.retry_delay = retry_delay
+        self._deletes = set()  # Laufende Lösch-Tasks (Referenzen halten)
+        self.stages = {name: _StageTimer() for name in ('build', 'send', 'edit', 'delete', 'total')}
+        self.delete_retried = 0
+        self.delete_failed = 0
+
+    async def repost(self, channel, build_embed, old_message_id=None):
+        """
+        Sendet die neue Sticky, während die alte im Hintergrund gelöscht wird
+
+        Args:
+            channel: Ziel-Channel
+            build_embed: Funktion() -> discord.Embed (Embed inkl. Thumbnail)
+            old_message_id: ID der zu löschenden alten Sticky (optional)
+
+        Returns:
+            discord.Message: Die neue Sticky (Fehler beim Senden werden weitergereicht)
+        """
+        start = time.perf_counter()
+        if old_message_id:
+            self.delete_in_background(channel, old_message_id)
+
+        embed = build_embed()
+        built = time.perf_counter()
+        self.stages['build'].add(built - start)
+
+        message = await self.requests.submit(lambda: channel.send(embed=embed), PRIORITY_REPOST, channel.id)
+        sent = time.perf_counter()
+        self.stages['send'].add(sent - built)
+        self.stages['total'].add(sent - start)
+        return message
+
+    async def edit(self, channel, message_id, build_embed):
+        """
+        Aktualisiert die bestehende Sticky statt sie neu zu senden (ein API-Aufruf)
+
+        Returns:
+            discord.Message: Die bearbeitete Sticky (discord.NotFound wenn sie gelöscht wurde)
+        """
+        start = time.perf_counter()
+        embed = build_embed()
+        built = time.perf_counter()
+        self.stages['build'].add(built - start)
+
+        message = await self.requests.submit(
+            lambda: channel.get_partial_message(int(message_id)).edit(embed=embed), PRIORITY_REPOST, channel.id
+        )
+        done = time.perf_counter()
+        self.stages['edit'].add(done - built)
+        self.stages['total'].add(done - start)
+        return message
+
+    def delete_in_background(self, channel, message_id):
+        """Löscht eine Nachricht über ihre ID im Hintergrund (mit Wiederholungen)"""
+        task = asyncio.create_task(self._delete(channel, int(message_id)))
+        self._deletes.add(task)
+        task.add_done_callback(self._deletes.discard)
+        return task
+
+    async def _delete(self, channel, message_id):
+        start = time.perf_counter()
+        for attempt in range(self.delete_retries + 1):
+            try:
+                await self.requests.submit(
+                    lambda: channel.get_partial_message(message_id).delete(), PRIORITY_CLEANUP, channel.id
+                )
+                logging.info(f"🗑️ Alte Sticky Message gelöscht: {message_id}")
+                break
+            except discord.NotFound:
+                logging.info(f"⚠️ Alte Sticky Message bereits gelöscht oder nicht gefunden")
+                break
+            except discord.Forbidden as e:
+                # Fehlende Rechte - erneuter Versuch bringt nichts
+                self.delete_failed += 1
+                logging.error(f"❌ Keine Berechtigung zum Löschen der alten Nachricht: {e}")
+                break
+            except Exception as e:
+                if attempt >= self.delete_retries:
+                    self.delete_failed += 1
+                    logging.error(f"❌ Alte Sticky Message {message_id} konnte nicht gelöscht werden: {e}")
+                    break
+                self.delete_retried += 1
+                logging.warning(f"⚠️ Löschen fehlgeschlagen, neuer Versuch {attempt + 1}/{self.delete_retries}: {e}")
+                await asyncio.sleep(self.retry_delay * 2 ** attempt)
+        self.stages['delete'].add(time.perf_counter() - start)
+
+    def pending_deletes(self):
+        return len(self._deletes)
+
+    async def close(self, timeout=5.0):
+        """Wartet kurz auf laufende Löschvorgänge und bricht den Rest ab"""
+        if not self._deletes:
+            return
+        done, pending = await asyncio.wait(set(self._deletes), timeout=timeout)
+        for task in pending:
+            task.cancel()
+
+    def stats(self):
+        """Latenz pro Stufe (ms) und Lösch-Wiederholungen"""
+        return {
+            'stages': {name: timer.to_dict() for name, timer in self.stages.items()},
+            'pending_deletes': len(self._deletes),
+            'delete_retried': self.delete_retried,
+            'delete_failed': self.delete_failed
+        }
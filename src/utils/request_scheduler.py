@@ -0,0 +1,288 @@
+"""
+Ausgehende Discord-Anfragen für Sticky-Bot
+Alle API-Aufrufe der Cogs laufen über eine Prioritäts-Warteschlange mit
+globalem und channelweisem Budget (Token Buckets). Interaction-Antworten haben
+Vorrang vor Sticky-Reposts, Aufräum-Löschvorgänge kommen zuletzt. Bei vielen
+gleichzeitigen Reposts (z.B. nach einem Neustart) wird so gleichmäßig verteilt,
+statt dass jede Coroutine einzeln in 429-Wartezeiten läuft.
+"""
+import time
+import asyncio
+import logging
+import itertools
+import discord
+from collections import deque
+
+PRIORITY_INTERACTION = 0
+PRIORITY_REPOST = 1
+PRIORITY_CLEANUP = 2
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTION: 'interaction',
+    PRIORITY_REPOST: 'repost',
+    PRIORITY_CLEANUP: 'cleanup'
+}
+
+GLOBAL_RATE = (45, 1.0)   # Anfragen pro Sekunde (Discord-Limit: 50)
+CHANNEL_RATE = (5, 5.0)   # Anfragen pro 5 Sekunden und Channel
+MAX_CONCURRENCY = 8       # Gleichzeitig laufende Anfragen
+MAX_CHANNEL_BUCKETS = 1000
+CALL_WINDOW = 3600.0      # Sekunden für die API-Aufrufe pro Channel und Stunde
+
+
+class _TokenBucket:
+    __slots__ = ('capacity', 'refill_rate', 'tokens', 'updated')
+
+    def __init__(self, capacity, per):
+        self.capacity = capacity
+        self.refill_rate = capacity / per
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_rate)
+        self.updated = now
+
+    def wait_time(self):
+        """Sekunden bis ein Token verfügbar ist (0 = sofort)"""
+        self._refill(time.monotonic())
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.refill_rate
+
+    def take(self):
+        self.tokens -= 1
+
+    def penalize(self, seconds):
+        """Leert den Bucket für `seconds` (nach einem 429)"""
+        self._refill(time.monotonic())
+        self.tokens = min(self.tokens, 0.0) - seconds * self.refill_rate
+
+    def is_full(self):
+        self._refill(time.monotonic())
+        return self.tokens >= self.capacity
+
+
+class _Request:
+    __slots__ = ('call', 'priority', 'channel_id', 'future', 'enqueued')
+
+    def __init__(self, call, priority, channel_id, future):
+        self.call = call
+        self.priority = priority
+        self.channel_id = channel_id
+        self.future = future
+        self.enqueued = time.monotonic()
+
+
+# Vorlage der Warnung, die discord.py für jede 429-Antwort genau einmal loggt (wiederholt oder
+# als Fehler weitergereicht) - die zusätzliche "Global rate limit"-Meldung wird nicht mitgezählt
+_RATE_LIMIT_LOG_PREFIX = 'We are being rate limited.'
+
+
+class _RateLimitLogCounter(logging.Handler):
+    """
+    Zählt die 429-Antworten anhand der Log-Meldungen von discord.py
+
+    discord.py bietet dafür keinen Hook - die Zahl ist daher ein Näherungswert: sie hängt
+    vom Wortlaut der Meldung ab und bleibt 0, wenn der Logger 'discord.http' Warnungen filtert.
+    """
+
+    def __init__(self, scheduler):
+        super().__init__(level=logging.WARNING)
+        self.scheduler = scheduler
+
+    def emit(self, record):
+        if isinstance(record.msg, str) and record.msg.startswith(_RATE_LIMIT_LOG_PREFIX):
+            self.scheduler.rate_limited += 1
+
+
+class RequestScheduler:
+    """Prioritäts-Warteschlange mit globalem und channelweisem Budget"""
+
+    def __init__(self, global_rate=GLOBAL_RATE, channel_rate=CHANNEL_RATE, max_concurrency=MAX_CONCURRENCY):
+        self.global_bucket = _TokenBucket(*global_rate)
+        self.channel_rate = channel_rate
+        self.max_concurrency = max_concurrency
+        self._channel_buckets = {}  # channel_id -> _TokenBucket
+        self._queue = None
+        self._semaphore = None
+        self._counter = itertools.count()
+        self._task = None
+        self._running = set()  # Laufende Anfragen (Referenzen halten)
+        self._log_counter = None
+
+        # Statistiken
+        self.rate_limited = 0  # 429-Antworten laut discord.py Log (Näherungswert, siehe _RateLimitLogCounter)
+        self.deferred = 0      # Wegen Channel-Budget zurückgestellt
+        self.in_flight = 0
+        self._channel_calls = {}  # channel_id -> deque(Zeitpunkte) der letzten Stunde
+        self._waits = {name: [0, 0.0, 0.0] for name in PRIORITY_NAMES.values()}  # Anzahl, Summe, Max
+
+    def _ensure_started(self):
+        if self._task is None or self._task.done():
+            if self._queue is None:
+                self._queue = asyncio.PriorityQueue()
+                self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._task = asyncio.create_task(self._dispatch_loop())
+        if self._log_counter is None:
+            self._log_counter = _RateLimitLogCounter(self)
+            logging.getLogger('discord.http').addHandler(self._log_counter)
+
+    async def submit(self, call, priority=PRIORITY_REPOST, channel_id=None):
+        """
+        Führt einen API-Aufruf aus, sobald Priorität und Budget es erlauben
+
+        Args:
+            call: Funktion() -> Awaitable (z.B. lambda: channel.send(embed=embed))
+            priority: PRIORITY_INTERACTION, PRIORITY_REPOST oder PRIORITY_CLEANUP
+            channel_id: Channel für das Channel-Budget (None = nur globales Budget)
+
+        Returns:
+            Ergebnis des Aufrufs (Fehler werden weitergereicht)
+        """
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        request = _Request(call, priority, str(channel_id) if channel_id is not None else None, future)
+        self._queue.put_nowait((priority, next(self._counter), request))
+        return await future
+
+    async def stop(self):
+        """Beendet die Verteilung (wartende und laufende Anfragen werden abgebrochen)"""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        running = list(self._running)
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, _, request = self._queue.get_nowait()
+                request.future.cancel()
+        # Queue und Semaphore gehören zum Event Loop - ein Neustart des Bots erstellt neue
+        self._queue = None
+        self._semaphore = None
+        if self._log_counter is not None:
+            logging.getLogger('discord.http').removeHandler(self._log_counter)
+            self._log_counter = None
+
+    def _channel_bucket(self, channel_id):
+        bucket = self._channel_buckets.get(channel_id)
+        if bucket is None:
+            if len(self._channel_buckets) >= MAX_CHANNEL_BUCKETS:
+                # Volle (= länger ungenutzte) Buckets verwerfen
+                self._channel_buckets = {
+                    key: value for key, value in self._channel_buckets.items() if not value.is_full()
+                }
+            bucket = _TokenBucket(*self.channel_rate)
+            self._channel_buckets[channel_id] = bucket
+        return bucket
+
+    async def _dispatch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self._queue.get()
+            request = item[2]
+            if request.future.cancelled():
+                continue
+
+            # Channel ohne Budget: zurückstellen, andere Channels laufen weiter
+            channel_bucket = self._channel_bucket(request.channel_id) if request.channel_id else None
+            if channel_bucket is not None:
+                wait = channel_bucket.wait_time()
+                if wait > 0:
+                    self.deferred += 1
+                    loop.call_later(wait, self._queue.put_nowait, item)
+                    continue
+
+            # Globales Budget erschöpft: warten und danach die wichtigste Anfrage nehmen
+            wait = self.global_bucket.wait_time()
+            if wait > 0:
+                self._queue.put_nowait(item)
+                await asyncio.sleep(wait)
+                continue
+
+            await self._semaphore.acquire()
+            self.global_bucket.take()
+            if channel_bucket is not None:
+                channel_bucket.take()
+            task = asyncio.create_task(self._execute(request, channel_bucket))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _execute(self, request, channel_bucket):
+        waited = time.monotonic() - request.enqueued
+        stats = self._waits[PRIORITY_NAMES.get(request.priority, 'cleanup')]
+        stats[0] += 1
+        stats[1] += waited
+        stats[2] = max(stats[2], waited)
+
+        if request.channel_id is not None:
+            self._record_call(request.channel_id)
+
+        self.in_flight += 1
+        try:
+            result = await request.call()
+            if not request.future.done():
+                request.future.set_result(result)
+        except Exception as e:
+            # Gezählt wird über das Log von discord.py - hier nur das Budget drosseln
+            if isinstance(e, discord.RateLimited) or (isinstance(e, discord.HTTPException) and e.status == 429):
+                retry_after = getattr(e, 'retry_after', None) or 1.0
+                (channel_bucket or self.global_bucket).penalize(retry_after)
+            if not request.future.done():
+                request.future.set_exception(e)
+        finally:
+            # Abbruch (CancelledError) oder andere BaseException: Aufrufer nicht ewig warten lassen
+            if not request.future.done():
+                request.future.cancel()
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    def _record_call(self, channel_id):
+        now = time.monotonic()
+        calls = self._channel_calls.setdefault(channel_id, deque())
+        calls.append(now)
+        while calls and calls[0] < now - CALL_WINDOW:
+            calls.popleft()
+
+    def calls_per_hour(self, channel_id):
+        """API-Aufrufe eines Channels in der letzten Stunde"""
+        calls = self._channel_calls.get(str(channel_id))
+        if not calls:
+            return 0
+        cutoff = time.monotonic() - CALL_WINDOW
+        while calls and calls[0] < cutoff:
+            calls.popleft()
+        return len(calls)
+
+    def queue_depth(self):
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def stats(self):
+        """Warteschlange, Wartezeit pro Priorität (ms) und 429-Anzahl"""
+        return {
+            'queue_depth': self.queue_depth(),
+            'in_flight': self.in_flight,
+            'deferred': self.deferred,
+            'rate_limited': self.rate_limited,
+            'wait': {
+                name: {
+                    'count': count,
+                    'avg_ms': round(total / count * 1000, 1) if count else 0.0,
+                    'max_ms': round(maximum * 1000, 1)
+                }
+                for name, (count, total, maximum) in self._waits.items()
+            }
+        }
+
+
+def get_request_scheduler(bot):
+    """Gibt den gemeinsamen Request-Scheduler des Bots zurück (wird beim ersten Aufruf erstellt)"""
+    scheduler = getattr(bot, 'request_scheduler', None)
+    if scheduler is None:
+        scheduler = RequestScheduler()
+        bot.request_scheduler = scheduler
+    return scheduler
@@ -4,28 +4,73 @@ Sichere Speicherung mit AES-256 Verschlüsselung
 import os
 import json
 import base64
+import time
+import zlib
+import struct
 import hashlib
 import logging
+import threading
 from cryptography.fernet import Fernet
 from src.utils.path_manager import get_application_path
+from src.utils.sticky_journal import StickyJournal
+from src.utils.sticky_records import (
+    LazyRecords,
+    record_digest,
+    make_summary,
+    read_record_file,
+    build_record_file
+)
 
 
-class SecureStorage:
-    """AES-256 verschlüsselte Speicherung für sensible Daten"""
-    
-    def __init__(self, master_key):
+# Wird bei jedem Schreiben der Sticky-Datei in diesem Prozess erhöht (Change Detection)
+_sticky_write_version = 0
+
+
+class KeyProvider:
+    """Prozessweiter Schlüssel-Provider: löst den Token einmal auf und cached Key + Fernet pro Token"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._token = None
+        self._token_resolved = False
+        self._ciphers = {}  # master_key -> (encryption_key, Fernet)
+
+    def get_token(self, resolver):
         """
+        Gibt den gecachten Bot Token zurück und löst ihn beim ersten Aufruf auf
+
         Args:
-            master_key: Master-Schlüssel für die Verschlüsselung (z.B. Bot Token)
+            resolver: Funktion die den Token ermittelt (z.B. .env, Umgebung, Fallback)
         """
-        self.master_key = master_key
-        self.encryption_key = self._generate_key()
-        
-    def _generate_key(self):
+        if self._token_resolved:
+            return self._token
+
+        with self._lock:
+            if not self._token_resolved:
+                self._token = resolver()
+                self._token_resolved = True
+            return self._token
+
+    def get_cipher(self, master_key):
+        """Gibt (encryption_key, Fernet) für einen Master-Schlüssel zurück"""
+        cipher = self._ciphers.get(master_key)
+        if cipher is not None:
+            return cipher
+
+        with self._lock:
+            cipher = self._ciphers.get(master_key)
+            if cipher is None:
+                encryption_key = self._derive_key(master_key)
+                cipher = (encryption_key, Fernet(encryption_key))
+                self._ciphers[master_key] = cipher
+            return cipher
+
+    @staticmethod
+    def _derive_key(master_key):
         """Generiert einen konsistenten Verschlüsselungsschlüssel"""
         try:
             # Hardware-unabhängiger, aber Bot-spezifischer Key
-            key_material = f"StickyBot_AES256_{self.master_key}_2024".encode()
+            key_material = f"StickyBot_AES256_{master_key}_2024".encode()
             key_hash = hashlib.sha256(key_material).digest()
             return base64.urlsafe_b64encode(key_hash[:32])
         except Exception as e:
@@ -33,29 +78,107 @@ class SecureStorage:
             # Fallback
             fallback = hashlib.sha256(b"StickyBot_Fallback_2024").digest()
             return base64.urlsafe_b64encode(fallback[:32])
+
+    def invalidate(self):
+        """Verwirft Token und abgeleitete Schlüssel (z.B. nach Token-Änderung)"""
+        with self._lock:
+            self._token = None
+            self._token_resolved = False
+            self._ciphers.clear()
+        logging.info("🔑 Schlüssel-Cache zurückgesetzt")
+
+
+# Prozessweiter Schlüssel-Provider
+key_provider = KeyProvider()
+
+# Binäres Dateiformat v2: Header (Magic, Version, Key-ID, Flags) + rohe Fernet-Bytes
+FORMAT_MAGIC = b'STBE'
+FORMAT_VERSION = 2
+FLAG_ZLIB = 0x01
+COMPRESS_MIN_SIZE = 256  # Kleinere JSON-Payloads werden nicht komprimiert
+_FORMAT_HEADER = struct.Struct('>4sB8sB')
+
+# Fernet-Tokens beginnen immer mit Version 0x80 (base64: "gAAAA")
+_FERNET_TOKEN_PREFIX = b'gAAAA'
+
+
+class SecureStorage:
+    """AES-256 verschlüsselte Speicherung für sensible Daten"""
+    
+    def __init__(self, master_key):
+        """
+        Args:
+            master_key: Master-Schlüssel für die Verschlüsselung (z.B. Bot Token)
+        """
+        self.master_key = master_key
+        self.encryption_key, self._fernet = key_provider.get_cipher(master_key)
+        self.key_id = hashlib.sha256(self.encryption_key).digest()[:8]
+        self.last_load_legacy = False  # True wenn zuletzt eine Datei im alten Textformat gelesen wurde
     
     def encrypt_data(self, data):
-        """Verschlüsselt Daten"""
+        """Verschlüsselt Daten als Text (einfaches Fernet-Token, z.B. für Journal-Zeilen)"""
         try:
-            fernet = Fernet(self.encryption_key)
             json_str = json.dumps(data, ensure_ascii=False)
-            encrypted_data = fernet.encrypt(json_str.encode('utf-8'))
-            return base64.b64encode(encrypted_data).decode('utf-8')
+            return self._fernet.encrypt(json_str.encode('utf-8')).decode('ascii')
         except Exception as e:
             logging.error(f"Verschlüsselung fehlgeschlagen: {e}")
             return None
     
     def decrypt_data(self, encrypted_data):
-        """Entschlüsselt Daten"""
+        """Entschlüsselt Text-Daten (einfaches Fernet-Token oder altes doppelt base64-kodiertes Format)"""
         try:
-            fernet = Fernet(self.encryption_key)
-            decoded_data = base64.b64decode(encrypted_data.encode('utf-8'))
-            decrypted_data = fernet.decrypt(decoded_data)
+            token = encrypted_data.encode('utf-8')
+            if not token.startswith(_FERNET_TOKEN_PREFIX):
+                # Altes Format: Fernet-Token zusätzlich base64-kodiert
+                token = base64.b64decode(token)
+            decrypted_data = self._fernet.decrypt(token)
             return json.loads(decrypted_data.decode('utf-8'))
         except Exception as e:
             logging.error(f"Entschlüsselung fehlgeschlagen: {e}")
             return None
     
+    def encrypt_bytes(self, data):
+        """Verschlüsselt Daten im binären v2 Format (optional zlib-komprimiert)"""
+        try:
+            payload = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            flags = 0
+            if len(payload) >= COMPRESS_MIN_SIZE:
+                compressed = zlib.compress(payload, 6)
+                if len(compressed) < len(payload):
+                    payload = compressed
+                    flags |= FLAG_ZLIB
+            
+            # Fernet liefert base64 - auf der Platte werden die rohen Bytes gespeichert
+            ciphertext = base64.urlsafe_b64decode(self._fernet.encrypt(payload))
+            return _FORMAT_HEADER.pack(FORMAT_MAGIC, FORMAT_VERSION, self.key_id, flags) + ciphertext
+        except Exception as e:
+            logging.error(f"Verschlüsselung fehlgeschlagen: {e}")
+            return None
+    
+    def decrypt_bytes(self, blob):
+        """Entschlüsselt das binäre v2 Format (altes Textformat wird weiterhin gelesen)"""
+        if not blob.startswith(FORMAT_MAGIC):
+            self.last_load_legacy = True
+            return self.decrypt_data(blob.decode('utf-8').strip())
+        
+        self.last_load_legacy = False
+        try:
+            _, version, key_id, flags = _FORMAT_HEADER.unpack_from(blob)
+            if version != FORMAT_VERSION:
+                logging.error(f"Entschlüsselung fehlgeschlagen: unbekannte Formatversion {version}")
+                return None
+            if key_id != self.key_id:
+                logging.error("Entschlüsselung fehlgeschlagen: Datei wurde mit einem anderen Schlüssel verschlüsselt")
+                return None
+            
+            payload = self._fernet.decrypt(base64.urlsafe_b64encode(blob[_FORMAT_HEADER.size:]))
+            if flags & FLAG_ZLIB:
+                payload = zlib.decompress(payload)
+            return json.loads(payload.decode('utf-8'))
+        except Exception as e:
+            logging.error(f"Entschlüsselung fehlgeschlagen: {e}")
+            return None
+    
     def save_encrypted_json(self, data, filename):
         """Speichert JSON-Daten verschlüsselt"""
         try:
@@ -76,12 +199,12 @@ class SecureStorage:
             # Verzeichnis erstellen
             os.makedirs(os.path.dirname(full_path), exist_ok=True)
             
-            # Verschlüsseln und speichern
-            encrypted_data = self.encrypt_data(data)
+            # Verschlüsseln und im binären v2 Format speichern (altes Textformat wird dabei ersetzt)
+            encrypted_data = self.encrypt_bytes(data)
             if not encrypted_data:
                 return False
             
-            with open(full_path, 'w', encoding='utf-8') as f:
+            with open(full_path, 'wb') as f:
                 f.write(encrypted_data)
             
             return True
@@ -111,14 +234,14 @@ class SecureStorage:
             if not os.path.exists(full_path):
                 return {}
             
-            # Laden und entschlüsseln
-            with open(full_path, 'r', encoding='utf-8') as f:
-                encrypted_data = f.read().strip()
+            # Laden und entschlüsseln (v2 binär oder altes Textformat)
+            with open(full_path, 'rb') as f:
+                encrypted_data = f.read()
             
-            if not encrypted_data:
+            if not encrypted_data.strip():
                 return {}
             
-            decrypted_data = self.decrypt_data(encrypted_data)
+            decrypted_data = self.decrypt_bytes(encrypted_data)
             return decrypted_data if decrypted_data is not None else {}
             
         except Exception as e:
@@ -154,23 +277,635 @@ def get_secure_storage(bot_token=None):
     """Erstellt SecureStorage Instanz mit Bot-Token"""
     return SecureStorage(bot_token)
 
-def save_bot_roles_secure(bot_roles_data, bot_token=None):
-    """Speichert Bot-Rollen verschlüsselt"""
+# SQLite-Backend Instanzen pro Token (nur bei STORAGE_BACKEND = 'sqlite')
+_sqlite_storages = {}
+_sqlite_lock = threading.Lock()
+
+def use_sqlite_backend():
+    """Prüft ob das SQLite-Backend konfiguriert ist"""
+    from src.config.config import STORAGE_BACKEND
+    return STORAGE_BACKEND == 'sqlite'
+
+def get_sqlite_storage(bot_token=None):
+    """Gibt die SQLite-Instanz für einen Token zurück (migriert beim ersten Öffnen die .enc Dateien)"""
+    sqlite_storage = _sqlite_storages.get(bot_token)
+    if sqlite_storage is not None:
+        return sqlite_storage
+
+    with _sqlite_lock:
+        sqlite_storage = _sqlite_storages.get(bot_token)
+        if sqlite_storage is None:
+            from src.config.config import SQLITE_DB_FILE
+            from src.utils.sqlite_storage import SQLiteStorage
+
+            sqlite_storage = SQLiteStorage(SQLITE_DB_FILE, SecureStorage(bot_token))
+            if not sqlite_storage.get_meta('migrated_from_files'):
+                sqlite_storage.migrate_from_files(
+                    _as_dict(get_sticky_journal(bot_token).replay(_load_sticky_messages_files(bot_token))),
+                    _load_bot_roles_files(bot_token),
+                    _load_archived_files(bot_token),
+                    get_sticky_guild_id
+                )
+            _sqlite_storages[bot_token] = sqlite_storage
+        return sqlite_storage
+
+def get_sqlite_data_version(bot_token=None):
+    """Datenversion der SQLite-Datenbank dieses Tokens (erkennt Schreibvorgänge anderer Prozesse)"""
+    return get_sqlite_storage(bot_token).data_version()
+
+# Pro-Guild Aufteilung: data/guilds/<guild_id>/<name>.enc
+UNASSIGNED_GUILD = '_unassigned'
+
+# Digest des zuletzt geladenen/geschriebenen Inhalts pro Shard: name -> {guild_id: digest}
+# (Speicher-Pfad, Persistenz-Thread und Kompaktierung greifen gleichzeitig darauf zu)
+_shard_digests = {}
+_shard_lock = threading.RLock()
+
+# Dateien je Guild-Ordner, deren Änderung ein Neuladen der Guild auslöst
+_SHARD_FILES = {
+    'roles': ('roles.enc',),
+    'sticky': ('sticky.rec', 'sticky.enc')
+}
+
+def _shard_filename(guild_id, name):
+    """Relativer Pfad einer Guild-Shard-Datei"""
+    return f"data/guilds/{guild_id}/{name}.enc"
+
+def _shard_digest(data):
+    """Stabiler Digest eines Shard-Inhalts (erkennt unveränderte Guilds ohne Verschlüsselung)"""
+    json_str = json.dumps(data, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(json_str.encode('utf-8')).hexdigest()
+
+def _touch_shard_stamp(name):
+    """Aktualisiert die Stempel-Datei eines Shard-Typs (für günstige Change Detection)"""
+    try:
+        stamp_file = os.path.join(get_application_path(), 'data', 'guilds', f'{name}.stamp')
+        os.makedirs(os.path.dirname(stamp_file), exist_ok=True)
+        with open(stamp_file, 'w', encoding='utf-8') as f:
+            f.write(str(time.time_ns()))
+    except Exception as e:
+        logging.warning(f"Shard-Stempel konnte nicht geschrieben werden ({name}): {e}")
+
+def get_shard_stamps(name):
+    """
+    Signatur der Shard-Dateien je Guild (Inode, mtime_ns, Größe - ohne Entschlüsselung)
+    Der gemeinsame Stempel zeigt nur, DASS sich etwas geändert hat - hiermit wird
+    ermittelt, welche Guilds neu geladen werden müssen
+
+    Returns:
+        dict: {guild_id: Signatur}
+    """
+    guilds_dir = os.path.join(get_application_path(), 'data', 'guilds')
+    stamps = {}
+    try:
+        with os.scandir(guilds_dir) as entries:
+            for entry in entries:
+                if not entry.is_dir():
+                    continue
+                signature = []
+                for filename in _SHARD_FILES[name]:
+                    try:
+                        stat = os.stat(os.path.join(entry.path, filename))
+                        signature.append((stat.st_ino, stat.st_mtime_ns, stat.st_size))
+                    except OSError:
+                        signature.append(None)
+                if any(signature):
+                    stamps[entry.name] = tuple(signature)
+    except OSError:
+        pass
+    return stamps
+
+def changed_shard_guilds(old_stamps, new_stamps):
+    """Guilds, deren Shard-Dateien neu, geändert oder entfernt sind"""
+    return {guild_id for guild_id in set(old_stamps) | set(new_stamps)
+            if old_stamps.get(guild_id) != new_stamps.get(guild_id)}
+
+def list_shard_guilds(name):
+    """Gibt alle Guild IDs zurück, für die eine Shard-Datei existiert"""
+    guilds_dir = os.path.join(get_application_path(), 'data', 'guilds')
+    try:
+        entries = sorted(os.listdir(guilds_dir))
+    except OSError:
+        return []
+    return [guild_id for guild_id in entries
+            if os.path.isfile(os.path.join(guilds_dir, guild_id, f'{name}.enc'))]
+
+def load_guild_shard(name, guild_id, bot_token=None):
+    """Lädt die Shard-Datei einer einzelnen Guild"""
     storage = SecureStorage(bot_token)
-    return storage.save_encrypted_json(bot_roles_data, "data/bot_roles.json")
+    with _shard_lock:
+        data = storage.load_encrypted_json(_shard_filename(guild_id, name))
+        if storage.last_load_legacy:
+            # Kein Digest merken - der nächste Schreibvorgang migriert die Datei ins v2 Format
+            _shard_digests.setdefault(name, {}).pop(str(guild_id), None)
+        else:
+            _shard_digests.setdefault(name, {})[str(guild_id)] = _shard_digest(data)
+    return data
+
+def load_guild_shards(name, bot_token=None):
+    """Lädt alle Shards eines Typs: {guild_id: daten}"""
+    shards = {}
+    with _shard_lock:
+        _shard_digests[name] = {}
+        for guild_id in list_shard_guilds(name):
+            shards[guild_id] = load_guild_shard(name, guild_id, bot_token)
+    return shards
+
+def save_guild_shard(name, guild_id, data, bot_token=None):
+    """Speichert (oder entfernt bei leeren Daten) die Shard-Datei einer einzelnen Guild"""
+    guild_id = str(guild_id)
+
+    with _shard_lock:
+        digests = _shard_digests.setdefault(name, {})
+
+        if not data:
+            try:
+                full_path = os.path.join(get_application_path(), _shard_filename(guild_id, name))
+                if os.path.exists(full_path):
+                    os.remove(full_path)
+                    # Leeren Guild-Ordner aufräumen
+                    guild_dir = os.path.dirname(full_path)
+                    if not os.listdir(guild_dir):
+                        os.rmdir(guild_dir)
+                digests.pop(guild_id, None)
+                _touch_shard_stamp(name)
+                return True
+            except Exception as e:
+                logging.error(f"Entfernen fehlgeschlagen ({name}, Guild {guild_id}): {e}")
+                return False
+
+        storage = SecureStorage(bot_token)
+        success = storage.save_encrypted_json(data, _shard_filename(guild_id, name))
+        if success:
+            digests[guild_id] = _shard_digest(data)
+            _touch_shard_stamp(name)
+        return success
+
+def save_guild_shards(name, shards, bot_token=None):
+    """Speichert nur die Shards, deren Inhalt sich seit dem letzten Laden/Speichern geändert hat"""
+    with _shard_lock:
+        if name not in _shard_digests:
+            # Bestehende Shards kennen, um entfernte Guilds löschen zu können
+            load_guild_shards(name, bot_token)
+        digests = _shard_digests[name]
+
+        success = True
+        for guild_id in set(digests) - set(shards):
+            success = save_guild_shard(name, guild_id, {}, bot_token) and success
+
+        for guild_id, data in shards.items():
+            if digests.get(guild_id) != _shard_digest(data):
+                success = save_guild_shard(name, guild_id, data, bot_token) and success
+
+        return success
+
+def _migrate_monolithic_file(filename, name, split_by_guild, bot_token=None):
+    """Teilt eine alte monolithische .enc Datei auf Guild-Shards auf und entfernt sie danach"""
+    full_path = os.path.join(get_application_path(), 'data', f'{filename}.enc')
+    if not os.path.exists(full_path):
+        return
+
+    try:
+        logging.info(f"🔄 Migration: {filename}.enc wird auf Guild-Shards aufgeteilt...")
+        storage = SecureStorage(bot_token)
+
+        with open(full_path, 'rb') as f:
+            encrypted_data = f.read()
+
+        data = storage.decrypt_bytes(encrypted_data) if encrypted_data.strip() else {}
+        if data is None:
+            # Nicht entschlüsselbar (z.B. anderer Token) - Datei nicht anfassen
+            logging.error(f"❌ Migration abgebrochen: {filename}.enc konnte nicht entschlüsselt werden")
+            return
+
+        if save_guild_shards(name, split_by_guild(data), bot_token):
+            os.remove(full_path)
+            logging.info(f"✅ Migration erfolgreich: {len(data)} Einträge aus {filename}.enc auf Guild-Shards verteilt")
+        else:
+            logging.warning(f"⚠️ Migration von {filename}.enc fehlgeschlagen - alte Datei bleibt erhalten")
+
+    except Exception as e:
+        logging.error(f"❌ Migration-Fehler ({filename}.enc): {e}")
+
+def _split_bot_roles_by_guild(bot_roles_data):
+    """bot_roles sind bereits nach Guild gruppiert"""
+    return {str(guild_id): roles for guild_id, roles in bot_roles_data.items()}
+
+def save_bot_roles_secure(bot_roles_data, bot_token=None):
+    """Speichert Bot-Rollen verschlüsselt (nur geänderte Guilds werden neu geschrieben)"""
+    if use_sqlite_backend():
+        return get_sqlite_storage(bot_token).save_bot_roles(_split_bot_roles_by_guild(bot_roles_data))
+    return save_guild_shards('roles', _split_bot_roles_by_guild(bot_roles_data), bot_token)
+
+def save_guild_bot_roles_secure(guild_id, roles, bot_token=None):
+    """Speichert die Bot-Rollen einer einzelnen Guild verschlüsselt"""
+    if use_sqlite_backend():
+        bot_roles = load_bot_roles_secure(bot_token)
+        if roles:
+            bot_roles[str(guild_id)] = roles
+        else:
+            bot_roles.pop(str(guild_id), None)
+        return save_bot_roles_secure(bot_roles, bot_token)
+    return save_guild_shard('roles', guild_id, roles, bot_token)
 
 def load_bot_roles_secure(bot_token=None):
-    """Lädt Bot-Rollen verschlüsselt"""
+    """Lädt Bot-Rollen verschlüsselt mit automatischer Migration der monolithischen Datei"""
+    if use_sqlite_backend():
+        return get_sqlite_storage(bot_token).load_bot_roles()
+    return _load_bot_roles_files(bot_token)
+
+def _load_bot_roles_files(bot_token=None):
+    """Lädt Bot-Rollen aus den Guild-Shard-Dateien"""
+    _migrate_monolithic_file('bot_roles.json', 'roles', _split_bot_roles_by_guild, bot_token)
+    return load_guild_shards('roles', bot_token)
+
+def load_guild_bot_roles_secure(guild_id, bot_token=None):
+    """Lädt die Bot-Rollen einer einzelnen Guild (Datei-Backend: nur deren Shard)"""
+    if use_sqlite_backend():
+        return load_bot_roles_secure(bot_token).get(str(guild_id), {})
+    return load_guild_shard('roles', guild_id, bot_token)
+
+def get_bot_roles_guild_stamps():
+    """Signatur der Rollen-Shards je Guild (None beim SQLite-Backend - dort wird komplett geladen)"""
+    if use_sqlite_backend():
+        return None
+    return get_shard_stamps('roles')
+
+def get_bot_roles_file_signature(bot_token=None):
+    """Ermittelt eine günstige Signatur der Rollen-Dateien (ohne Entschlüsselung)"""
+    if use_sqlite_backend():
+        return ('sqlite', get_sqlite_data_version(bot_token))
+    return get_file_signature('guilds/roles.stamp', 'bot_roles.json.enc', 'bot_roles.json')
+
+def get_sticky_guild_id(sticky_data):
+    """Gibt die Guild ID einer Sticky-Konfiguration als String zurück"""
+    guild_id = sticky_data.get('guild_id')
+    return str(guild_id) if guild_id else UNASSIGNED_GUILD
+
+def _split_sticky_by_guild(sticky_data):
+    """Gruppiert Sticky Messages {channel_id: daten} nach Guild"""
+    shards = {}
+    for channel_id, data in sticky_data.items():
+        shards.setdefault(get_sticky_guild_id(data), {})[channel_id] = data
+    return shards
+
+# Satzweise verschlüsselte Sticky-Shards: data/guilds/<guild_id>/sticky.rec
+_sticky_record_signatures = {}  # guild_id -> Signatur der zuletzt geladenen/geschriebenen Datensätze
+_sticky_blob_cache = {}         # channel_id -> (digest, blob) des zuletzt geschriebenen Datensatzes
+
+def _sticky_record_path(guild_id):
+    return os.path.join(get_application_path(), 'data', 'guilds', str(guild_id), 'sticky.rec')
+
+def list_sticky_record_guilds():
+    """Guild IDs mit Sticky-Daten (Record-Datei oder noch nicht migrierter sticky.enc Shard)"""
+    guilds_dir = os.path.join(get_application_path(), 'data', 'guilds')
+    try:
+        entries = sorted(os.listdir(guilds_dir))
+    except OSError:
+        return []
+    return [guild_id for guild_id in entries
+            if os.path.isfile(os.path.join(guilds_dir, guild_id, 'sticky.rec'))
+            or os.path.isfile(os.path.join(guilds_dir, guild_id, 'sticky.enc'))]
+
+def _records_signature(entries):
+    """Signatur einer Guild aus Channel IDs und verschlüsselten Datensätzen"""
+    sha = hashlib.sha256()
+    for channel_id, blob, _ in entries:
+        sha.update(channel_id.encode('utf-8'))
+        sha.update(blob)
+    return sha.hexdigest()
+
+def _reusable_sticky_blob(sticky_data, channel_id):
+    """Bereits verschlüsselter Datensatz eines unveränderten Eintrags (spart Neuverschlüsselung)"""
+    if isinstance(sticky_data, LazyRecords):
+        blob = sticky_data.reusable_blob(channel_id)
+        if blob is not None or not sticky_data.is_loaded(channel_id):
+            return blob
+    cached = _sticky_blob_cache.get(channel_id)
+    if cached and cached[0] == record_digest(sticky_data[channel_id]):
+        return cached[1]
+    return None
+
+def _load_sticky_guild_records(guild_id, storage, records, bot_token=None):
+    """Lädt die Datensätze einer Guild (verschlüsselt) in records - migriert alte sticky.enc Shards"""
+    entries = read_record_file(_sticky_record_path(guild_id), storage, guild_id, records)
+    if entries is not None:
+        _sticky_record_signatures[guild_id] = _records_signature(entries)
+        return
+
+    legacy = load_guild_shard('sticky', guild_id, bot_token)
+    if not legacy:
+        return
+    for channel_id, data in legacy.items():
+        records[channel_id] = data
+    if _save_sticky_guild_records(guild_id, records, list(legacy), storage):
+        logging.info(f"✅ Migration: {len(legacy)} Sticky Messages von Guild {guild_id} in Einzel-Datensätze überführt")
+
+def _save_sticky_guild_records(guild_id, sticky_data, channel_ids, storage):
+    """Schreibt die Record-Datei einer Guild (nur neue/geänderte Einträge werden verschlüsselt)"""
+    guild_id = str(guild_id)
+    entries = []
+    for channel_id in channel_ids:
+        blob = _reusable_sticky_blob(sticky_data, channel_id)
+        if isinstance(sticky_data, LazyRecords):
+            summary = sticky_data.summary(channel_id)
+        else:
+            summary = make_summary(sticky_data[channel_id])
+        if blob is None:
+            data = sticky_data[channel_id]
+            blob = storage.encrypt_bytes(data)
+            if blob is None:
+                return False
+            _sticky_blob_cache[channel_id] = (record_digest(data), blob)
+        entries.append((channel_id, blob, summary))
+
+    signature = _records_signature(entries)
+    if _sticky_record_signatures.get(guild_id) == signature:
+        return True
+
+    try:
+        path = _sticky_record_path(guild_id)
+        if entries:
+            content = build_record_file(entries, storage)
+            if content is None:
+                return False
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Erst vollständig schreiben, dann ersetzen - ein Absturz hinterlässt keine halbe Datei
+            with open(path + '.tmp', 'wb') as f:
+                f.write(content)
+            os.replace(path + '.tmp', path)
+            _sticky_record_signatures[guild_id] = signature
+        else:
+            if os.path.exists(path):
+                os.remove(path)
+            _sticky_record_signatures.pop(guild_id, None)
+
+        # Alten sticky.enc Shard entfernen und leeren Guild-Ordner aufräumen
+        save_guild_shard('sticky', guild_id, {}, storage.master_key)
+        guild_dir = os.path.dirname(path)
+        if os.path.isdir(guild_dir) and not os.listdir(guild_dir):
+            os.rmdir(guild_dir)
+        _touch_shard_stamp('sticky')
+        return True
+
+    except Exception as e:
+        logging.error(f"Speichern fehlgeschlagen (Sticky-Datensätze, Guild {guild_id}): {e}")
+        return False
+
+def _save_sticky_records(sticky_data, bot_token=None):
+    """Speichert alle Sticky Messages satzweise, nur Guilds mit Änderungen werden neu geschrieben"""
     storage = SecureStorage(bot_token)
-    return storage.load_encrypted_json("data/bot_roles.json")
+    by_guild = {}
+    for channel_id in sticky_data:
+        if isinstance(sticky_data, LazyRecords):
+            guild_id = sticky_data.guild_of(channel_id, get_sticky_guild_id)
+        else:
+            guild_id = get_sticky_guild_id(sticky_data[channel_id])
+        by_guild.setdefault(guild_id, []).append(channel_id)
+
+    # Datensätze entfernter Channels nicht weiter im Cache halten
+    for channel_id in [channel_id for channel_id in _sticky_blob_cache if channel_id not in sticky_data]:
+        del _sticky_blob_cache[channel_id]
+
+    success = True
+    for guild_id in (set(_sticky_record_signatures) | set(list_sticky_record_guilds())) - set(by_guild):
+        success = _save_sticky_guild_records(guild_id, sticky_data, [], storage) and success
+    for guild_id, channel_ids in by_guild.items():
+        success = _save_sticky_guild_records(guild_id, sticky_data, channel_ids, storage) and success
+    return success
+
+def _as_dict(sticky_data):
+    """Vollständig entschlüsselte Kopie (für Aufrufer, die ein normales Dict erwarten)"""
+    return sticky_data.to_dict() if isinstance(sticky_data, LazyRecords) else sticky_data
+
+# Append-Only Journal für einzelne Sticky-Änderungen (nur Datei-Backend)
+STICKY_JOURNAL_FILE = "data/sticky_journal.log"
+STICKY_JOURNAL_COMPACT_THRESHOLD = 200  # Datensätze bis zur Kompaktierung
+
+_sticky_journals = {}
+_sticky_journal_lock = threading.Lock()
+_sticky_compaction_thread = None
+# Stand vor -> nach einer Kompaktierung in diesem Prozess: {Signatur vorher: (Signatur nachher, Guild-Stempel)}
+# Die Kompaktierung ändert den Inhalt nicht - ein aktueller Store übernimmt den neuen Stand ohne Neuladen
+_sticky_compactions = {}
+STICKY_COMPACTIONS_KEPT = 8
+
+def get_sticky_journal(bot_token=None):
+    """Gibt das Sticky-Journal für den Token zurück (eine Instanz pro Token)"""
+    with _sticky_journal_lock:
+        journal = _sticky_journals.get(bot_token)
+        if journal is None:
+            journal = StickyJournal(STICKY_JOURNAL_FILE, SecureStorage(bot_token))
+            _sticky_journals[bot_token] = journal
+        return journal
 
 def save_sticky_messages_secure(sticky_data, bot_token=None):
-    """Speichert Sticky Messages verschlüsselt"""
-    storage = SecureStorage(bot_token)
-    return storage.save_encrypted_json(sticky_data, "data/sticky_messages.json")
+    """Speichert Sticky Messages verschlüsselt (nur geänderte Guilds werden neu geschrieben)"""
+    global _sticky_write_version
+    if use_sqlite_backend():
+        success = get_sqlite_storage(bot_token).save_sticky_messages(sticky_data, get_sticky_guild_id)
+    else:
+        journal = get_sticky_journal(bot_token)
+        with journal.lock:
+            # Vollständiger Stand = neuer Snapshot, das Journal ist damit überholt
+            success = _save_sticky_records(sticky_data, bot_token)
+            if success:
+                journal.truncate()
+    _sticky_write_version += 1
+    return success
+
+def save_guild_sticky_messages_secure(guild_id, guild_sticky_data, bot_token=None):
+    """Speichert die Sticky Messages einer einzelnen Guild verschlüsselt"""
+    global _sticky_write_version
+    if use_sqlite_backend():
+        success = get_sqlite_storage(bot_token).save_guild_sticky_messages(guild_id, guild_sticky_data)
+    else:
+        journal = get_sticky_journal(bot_token)
+        with journal.lock:
+            # Offene Journal-Einträge zuerst übernehmen, sonst überschreiben sie den neuen Shard
+            compact_sticky_journal_secure(bot_token)
+            success = _save_sticky_guild_records(
+                guild_id, guild_sticky_data, list(guild_sticky_data), SecureStorage(bot_token)
+            )
+    _sticky_write_version += 1
+    return success
+
+def append_sticky_mutations_secure(changes, bot_token=None):
+    """
+    Speichert einzelne Sticky-Änderungen, ohne den Gesamtbestand neu zu verschlüsseln
+
+    Args:
+        changes: {channel_id: daten} - None bedeutet "entfernt"
+    """
+    global _sticky_write_version
+    if not changes:
+        return True
+
+    if use_sqlite_backend():
+        success = get_sqlite_storage(bot_token).apply_sticky_mutations(changes, get_sticky_guild_id)
+        _sticky_write_version += 1
+        return success
+
+    journal = get_sticky_journal(bot_token)
+    with journal.lock:
+        # Version noch unter der Sperre erhöhen - die Kompaktierung sieht danach denselben Stand
+        record_count = journal.append(changes)
+        _sticky_write_version += 1
+    if record_count >= STICKY_JOURNAL_COMPACT_THRESHOLD:
+        _start_sticky_compaction(bot_token)
+    return record_count > 0
+
+def compact_sticky_journal_secure(bot_token=None):
+    """Übernimmt das Journal in die Guild-Shards (Snapshot) und leert es"""
+    if use_sqlite_backend():
+        return True
+
+    journal = get_sticky_journal(bot_token)
+    with journal.lock:
+        if journal.record_count() == 0:
+            return True
+
+        before = get_sticky_file_signature(bot_token)
+        sticky_messages = journal.replay(_load_sticky_messages_files(bot_token))
+        # Erst Snapshot schreiben, dann Journal leeren - ein Absturz dazwischen
+        # ist unkritisch, da das erneute Abspielen idempotent ist
+        success = _save_sticky_records(sticky_messages, bot_token)
+        if success:
+            journal.truncate()
+            # Neuer Stand gehört diesem Prozess - Stores mit dem alten Stand laden nicht neu
+            _sticky_compactions[before] = (get_sticky_file_signature(bot_token), get_sticky_guild_stamps())
+            while len(_sticky_compactions) > STICKY_COMPACTIONS_KEPT:
+                del _sticky_compactions[next(iter(_sticky_compactions))]
+            logging.debug(f"🗜️ Sticky-Journal kompaktiert ({len(sticky_messages)} Einträge)")
+        return success
+
+def _start_sticky_compaction(bot_token=None):
+    """Startet die Kompaktierung im Hintergrund (höchstens ein Lauf gleichzeitig)"""
+    global _sticky_compaction_thread
+    with _sticky_journal_lock:
+        if _sticky_compaction_thread and _sticky_compaction_thread.is_alive():
+            return
+        _sticky_compaction_thread = threading.Thread(
+            target=compact_sticky_journal_secure, args=(bot_token,),
+            name="StickyJournalCompaction", daemon=True
+        )
+        _sticky_compaction_thread.start()
+
+def get_sticky_write_version():
+    """Gibt die prozessweite Schreib-Version der Sticky-Datei zurück"""
+    return _sticky_write_version
+
+def follow_sticky_compactions(signature):
+    """
+    Stand nach den Kompaktierungen dieses Prozesses, die auf `signature` aufgesetzt haben
+
+    Returns:
+        tuple: (Signatur, Guild-Stempel) oder None wenn seitdem nicht kompaktiert wurde
+    """
+    result = None
+    while signature in _sticky_compactions:
+        result = _sticky_compactions[signature]
+        signature = result[0]
+    return result
+
+def read_sticky_state(bot_token=None, blocking=True, guild_stamps=True):
+    """
+    Signatur und Guild-Stempel der Sticky-Dateien, unter der Journal-Sperre gelesen
+    (nie mitten in einem Schreibvorgang oder einer Kompaktierung)
+
+    Args:
+        guild_stamps: False überspringt die Guild-Stempel (ein stat() je Guild) - für die
+                      regelmäßige Prüfung reicht die Signatur (wenige Dateien)
+
+    Returns:
+        tuple: (Signatur, Guild-Stempel oder None) oder None wenn die Sperre belegt ist (blocking=False)
+    """
+    journal = get_sticky_journal(bot_token)
+    if not journal.lock.acquire(blocking=blocking):
+        return None
+    try:
+        return get_sticky_file_signature(bot_token), get_sticky_guild_stamps() if guild_stamps else None
+    finally:
+        journal.lock.release()
+
+def get_file_signature(*filenames):
+    """
+    Ermittelt eine günstige Signatur von Dateien im data-Ordner (ohne Entschlüsselung)
+
+    Returns:
+        tuple: (mtime_ns, size) je Datei bzw. None falls die Datei fehlt
+    """
+    app_path = get_application_path()
+    signature = []
+
+    for filename in filenames:
+        try:
+            stat = os.stat(os.path.join(app_path, 'data', filename))
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            signature.append(None)
+
+    return tuple(signature)
+
+def get_sticky_file_signature(bot_token=None):
+    """
+    Ermittelt eine günstige Signatur der Sticky-Dateien (ohne Entschlüsselung)
+
+    Returns:
+        tuple: (Schreib-Version, Shard-Stempel, Journal, alte .enc Datei, Legacy-Datei) - jeweils (mtime_ns, size)
+    """
+    if use_sqlite_backend():
+        return (_sticky_write_version, 'sqlite', get_sqlite_data_version(bot_token))
+    return (_sticky_write_version,) + get_file_signature(
+        'guilds/sticky.stamp', 'sticky_journal.log', 'sticky_messages.json.enc', 'sticky_messages.json'
+    )
+
+def get_sticky_guild_stamps():
+    """Signatur der Sticky-Shards je Guild (None beim SQLite-Backend - dort wird komplett geladen)"""
+    if use_sqlite_backend():
+        return None
+    return get_shard_stamps('sticky')
+
+def load_sticky_guilds_lazy(guild_ids, bot_token=None):
+    """
+    Lädt nur die Datensätze geänderter Guilds - ohne einen bestehenden Stand zu verändern
+
+    Args:
+        guild_ids: Guilds, deren Shard-Dateien sich geändert haben
+
+    Returns:
+        tuple: (LazyRecords dieser Guilds, Journal-Einträge zum Abspielen auf den
+               kompletten Stand - erneutes Abspielen übernommener Einträge ergibt denselben Stand)
+    """
+    journal = get_sticky_journal(bot_token)
+    with journal.lock:
+        storage = SecureStorage(bot_token)
+        sticky_messages = LazyRecords(storage.decrypt_bytes)
+        for guild_id in guild_ids:
+            _load_sticky_guild_records(str(guild_id), storage, sticky_messages, bot_token)
+        return sticky_messages, journal.records()
 
 def load_sticky_messages_secure(bot_token=None):
-    """Lädt Sticky Messages aus verschlüsselter Datei mit automatischer Migration"""
+    """Lädt Sticky Messages aus dem konfigurierten Backend (vollständig entschlüsselt)"""
+    return _as_dict(load_sticky_messages_lazy(bot_token))
+
+def load_sticky_messages_lazy(bot_token=None):
+    """
+    Lädt Sticky Messages, deren Einträge erst beim ersten Zugriff entschlüsselt werden
+
+    Returns:
+        LazyRecords: verhält sich wie {channel_id: daten}
+    """
+    if use_sqlite_backend():
+        return get_sqlite_storage(bot_token).load_sticky_records()
+
+    # Snapshot laden und Journal-Einträge darauf abspielen
+    journal = get_sticky_journal(bot_token)
+    with journal.lock:
+        return journal.replay(_load_sticky_messages_files(bot_token))
+
+def _load_sticky_messages_files(bot_token=None):
+    """Lädt Sticky Messages aus den verschlüsselten Guild-Shards mit automatischer Migration"""
     from src.utils.path_manager import get_application_path
     import os
     import json
@@ -188,8 +923,7 @@ def load_sticky_messages_secure(bot_token=None):
                 old_data = json.load(f)
             
             # Speichere verschlüsselt
-            storage = SecureStorage(bot_token)
-            success = storage.save_encrypted_json(old_data, "data/sticky_messages.json")
+            success = save_sticky_messages_secure(old_data, bot_token)
             
             if success:
                 # Lösche unverschlüsselte Datei nach erfolgreicher Migration
@@ -203,9 +937,138 @@ def load_sticky_messages_secure(bot_token=None):
         except Exception as e:
             logging.error(f"❌ Migration-Fehler: {e} - versuche normale Ladung")
     
-    # Normale verschlüsselte Ladung
+    # Alte monolithische sticky_messages.json.enc auf Guild-Shards verteilen
+    _migrate_monolithic_file('sticky_messages.json', 'sticky', _split_sticky_by_guild, bot_token)
+    
+    # Nur Index und verschlüsselte Datensätze laden - entschlüsselt wird erst beim Zugriff
     storage = SecureStorage(bot_token)
-    return storage.load_encrypted_json("data/sticky_messages.json")
+    sticky_messages = LazyRecords(storage.decrypt_bytes)
+    for guild_id in list_sticky_record_guilds():
+        _load_sticky_guild_records(guild_id, storage, sticky_messages, bot_token)
+    return sticky_messages
+
+def load_guild_sticky_messages_secure(guild_id, bot_token=None):
+    """Lädt nur die Sticky Messages einer einzelnen Guild"""
+    if use_sqlite_backend():
+        return get_sqlite_storage(bot_token).load_sticky_messages(guild_id)
+
+    journal = get_sticky_journal(bot_token)
+    with journal.lock:
+        storage = SecureStorage(bot_token)
+        guild_sticky = LazyRecords(storage.decrypt_bytes)
+        _load_sticky_guild_records(str(guild_id), storage, guild_sticky, bot_token)
+        return journal.replay(guild_sticky, guild_id, get_sticky_guild_id).to_dict()
+
+# IDs der aktuell geposteten Sticky Messages: eigener kleiner Datensatz neben den Konfigurationen,
+# damit ein Repost weder Journal noch Datensätze schreibt (gilt für beide Backends)
+STICKY_MESSAGE_IDS_FILE = "data/sticky_message_ids.json"
+
+def load_sticky_message_ids_secure(bot_token=None):
+    """Lädt {channel_id: message_id} der zuletzt geposteten Sticky Messages"""
+    return SecureStorage(bot_token).load_encrypted_json(STICKY_MESSAGE_IDS_FILE)
+
+def save_sticky_message_ids_secure(message_ids, bot_token=None):
+    """Speichert {channel_id: message_id} der zuletzt geposteten Sticky Messages"""
+    return SecureStorage(bot_token).save_encrypted_json(message_ids, STICKY_MESSAGE_IDS_FILE)
+
+# Archivierte Sticky Messages (24h Grace Period nach Bot-Kick)
+ARCHIVE_FILE = "data/archived_sticky_messages.json"
+
+def _load_archived_files(bot_token=None):
+    """Lädt das komplette Archiv aus der verschlüsselten Datei"""
+    storage = SecureStorage(bot_token)
+    return storage.load_encrypted_json(ARCHIVE_FILE)
+
+def _save_archived_files(archived_messages, bot_token=None):
+    """Speichert das komplette Archiv in die verschlüsselte Datei"""
+    storage = SecureStorage(bot_token)
+    return storage.save_encrypted_json(archived_messages, ARCHIVE_FILE)
+
+def load_archived_sticky_messages_secure(bot_token=None, guild_id=None):
+    """Lädt archivierte Sticky Messages (optional nur einer Guild)"""
+    if use_sqlite_backend():
+        return get_sqlite_storage(bot_token).load_archived(guild_id)
+
+    archived_messages = _load_archived_files(bot_token)
+    if guild_id is None:
+        return archived_messages
+    return {channel_id: data for channel_id, data in archived_messages.items()
+            if str(data.get('guild_id')) == str(guild_id)}
+
+def save_archived_sticky_messages_secure(archived_messages, bot_token=None):
+    """Ersetzt das komplette Archiv"""
+    if use_sqlite_backend():
+        return get_sqlite_storage(bot_token).save_archived(archived_messages)
+    return _save_archived_files(archived_messages, bot_token)
+
+def add_archived_sticky_messages_secure(archived_entries, bot_token=None):
+    """Fügt archivierte Sticky Messages hinzu"""
+    if use_sqlite_backend():
+        return get_sqlite_storage(bot_token).add_archived(archived_entries)
+
+    archived_messages = _load_archived_files(bot_token)
+    archived_messages.update(archived_entries)
+    return _save_archived_files(archived_messages, bot_token)
+
+def delete_archived_sticky_messages_secure(channel_ids, bot_token=None):
+    """Entfernt archivierte Sticky Messages"""
+    if use_sqlite_backend():
+        return get_sqlite_storage(bot_token).delete_archived(channel_ids)
+
+    archived_messages = _load_archived_files(bot_token)
+    for channel_id in channel_ids:
+        archived_messages.pop(channel_id, None)
+    return _save_archived_files(archived_messages, bot_token)
+
+def archive_expiry(data, channel_id=None):
+    """
+    Löschzeitpunkt eines Archivs: auto_delete_at, bei ungültigem Datum 48h nach der Archivierung
+
+    Returns:
+        datetime oder None (Archive ohne Löschdatum werden nicht automatisch gelöscht)
+    """
+    import datetime
+    auto_delete_str = data.get('auto_delete_at')
+    if not auto_delete_str:
+        return None
+    try:
+        return datetime.datetime.fromisoformat(auto_delete_str)
+    except Exception as e:
+        logging.error(f"❌ Fehler beim Parsen des Löschdatums für Channel {channel_id}: {e}")
+
+    # Bei Parsing-Fehlern nach 48h löschen (sicher)
+    try:
+        archived_str = data.get('archived_at')
+        if archived_str:
+            return datetime.datetime.fromisoformat(archived_str) + datetime.timedelta(hours=48)
+    except Exception:
+        pass
+    return None
+
+def delete_expired_archives_secure(now, bot_token=None):
+    """
+    Löscht abgelaufene Archive (auto_delete_at erreicht bzw. 48h nach Archivierung bei ungültigem Datum)
+
+    Returns:
+        dict: Gelöschte Einträge {channel_id: daten}
+    """
+    if use_sqlite_backend():
+        return get_sqlite_storage(bot_token).delete_expired_archives(now.isoformat())
+
+    archived_messages = _load_archived_files(bot_token)
+    expired = {}
+
+    for channel_id, data in archived_messages.items():
+        expiry = archive_expiry(data, channel_id)
+        if expiry is not None and now >= expiry:
+            expired[channel_id] = data
+
+    if expired:
+        for channel_id in expired:
+            del archived_messages[channel_id]
+        _save_archived_files(archived_messages, bot_token)
+
+    return expired
 
 def migrate_all_data_to_encrypted(bot_token=None):
     """Migriert alle Bot-Daten zu verschlüsselter Speicherung"""
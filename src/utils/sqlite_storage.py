@@ -0,0 +1,372 @@
+"""
+SQLite Speicher-Backend für Sticky-Bot
+Sticky Messages, Bot-Rollen und Archive in einer SQLite-Datenbank (WAL-Modus)
+mit feldweiser AES-256 Verschlüsselung der sensiblen Spalten
+"""
+import os
+import json
+import sqlite3
+import hashlib
+import logging
+import threading
+from src.utils.sticky_records import LazyRecords
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+
+CREATE TABLE IF NOT EXISTS sticky_messages (
+    channel_id TEXT PRIMARY KEY,
+    guild_id TEXT NOT NULL,
+    payload BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sticky_guild ON sticky_messages (guild_id);
+
+CREATE TABLE IF NOT EXISTS bot_roles (
+    guild_id TEXT PRIMARY KEY,
+    payload BLOB NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS archived_stickies (
+    channel_id TEXT PRIMARY KEY,
+    guild_id TEXT NOT NULL,
+    archived_at TEXT,
+    auto_delete_at TEXT,
+    payload BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_archive_guild ON archived_stickies (guild_id);
+CREATE INDEX IF NOT EXISTS idx_archive_auto_delete ON archived_stickies (auto_delete_at);
+"""
+
+
+def _digest(data):
+    """Stabiler Digest eines Eintrags (unveränderte Zeilen werden nicht neu geschrieben)"""
+    json_str = json.dumps(data, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(json_str.encode('utf-8')).hexdigest()
+
+
+class SQLiteStorage:
+    """SQLite-Backend mit feldweiser Verschlüsselung (payload-Spalten)"""
+
+    def __init__(self, db_file, storage):
+        """
+        Args:
+            db_file: Pfad zur SQLite-Datei
+            storage: SecureStorage Instanz für die Feldverschlüsselung
+        """
+        self.db_file = str(db_file)
+        self.storage = storage
+        self._lock = threading.RLock()
+        self._sticky_digests = None  # channel_id -> digest
+        self._roles_digests = None   # guild_id -> digest
+
+        os.makedirs(os.path.dirname(self.db_file), exist_ok=True)
+        # Wird aus Event-Loop-Workern und dem GUI-Thread genutzt - Zugriff über Lock
+        self.conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def close(self):
+        """Schließt die Datenbankverbindung"""
+        with self._lock:
+            self.conn.close()
+
+    # --- Hilfsfunktionen -------------------------------------------------
+
+    def _encrypt(self, data):
+        encrypted = self.storage.encrypt_bytes(data)
+        if encrypted is None:
+            raise ValueError("Feldverschlüsselung fehlgeschlagen")
+        return encrypted
+
+    def _decrypt(self, payload):
+        # Ältere Zeilen enthalten Text, neue das binäre v2 Format
+        if isinstance(payload, str):
+            data = self.storage.decrypt_data(payload)
+        else:
+            data = self.storage.decrypt_bytes(payload)
+        return data if data is not None else {}
+
+    def get_meta(self, key, default=None):
+        with self._lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO meta (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, str(value))
+            )
+
+    def data_version(self):
+        """Ändert sich wenn eine andere Verbindung Daten geschrieben hat"""
+        with self._lock:
+            return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    # --- Sticky Messages -------------------------------------------------
+
+    def load_sticky_messages(self, guild_id=None):
+        """Lädt alle (oder nur die Sticky Messages einer Guild)"""
+        with self._lock:
+            if guild_id is None:
+                rows = self.conn.execute(
+                    "SELECT channel_id, payload FROM sticky_messages ORDER BY rowid"
+                ).fetchall()
+            else:
+                rows = self.conn.execute(
+                    "SELECT channel_id, payload FROM sticky_messages WHERE guild_id = ? ORDER BY rowid",
+                    (str(guild_id),)
+                ).fetchall()
+
+            sticky_messages = {channel_id: self._decrypt(payload) for channel_id, payload in rows}
+
+            if guild_id is None:
+                self._sticky_digests = {cid: _digest(data) for cid, data in sticky_messages.items()}
+            elif self._sticky_digests is not None:
+                for cid, data in sticky_messages.items():
+                    self._sticky_digests[cid] = _digest(data)
+
+        return sticky_messages
+
+    def load_sticky_records(self):
+        """Lädt alle Sticky Messages ohne sie zu entschlüsseln (Entschlüsselung beim ersten Zugriff)"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT channel_id, guild_id, payload FROM sticky_messages ORDER BY rowid"
+            ).fetchall()
+
+            records = LazyRecords(self._decrypt)
+            for channel_id, guild_id, payload in rows:
+                records.add_encrypted(channel_id, payload, guild_id)
+
+            # Noch verschlüsselte Einträge gelten beim Speichern als unverändert
+            self._sticky_digests = {channel_id: None for channel_id, _, _ in rows}
+
+        return records
+
+    def save_sticky_messages(self, sticky_data, guild_id_of):
+        """
+        Speichert nur geänderte/entfernte Sticky Messages
+
+        Args:
+            sticky_data: {channel_id: daten}
+            guild_id_of: Funktion die die Guild ID einer Konfiguration liefert
+        """
+        with self._lock:
+            if self._sticky_digests is None:
+                self.load_sticky_messages()
+
+            removed = [cid for cid in self._sticky_digests if cid not in sticky_data]
+            changed = {}
+            for cid in sticky_data:
+                if isinstance(sticky_data, LazyRecords) and sticky_data.reusable_blob(cid) is not None:
+                    continue  # Unverändert seit dem Laden - nicht entschlüsseln
+                data = sticky_data[cid]
+                if self._sticky_digests.get(cid) != _digest(data):
+                    changed[cid] = data
+
+            with self.conn:
+                self.conn.executemany(
+                    "DELETE FROM sticky_messages WHERE channel_id = ?",
+                    [(cid,) for cid in removed]
+                )
+                self.conn.executemany(
+                    "INSERT INTO sticky_messages (channel_id, guild_id, payload) VALUES (?, ?, ?) "
+                    "ON CONFLICT(channel_id) DO UPDATE SET guild_id = excluded.guild_id, payload = excluded.payload",
+                    [(cid, guild_id_of(data), self._encrypt(data)) for cid, data in changed.items()]
+                )
+
+            for cid in removed:
+                del self._sticky_digests[cid]
+            for cid, data in changed.items():
+                self._sticky_digests[cid] = _digest(data)
+
+        return True
+
+    def apply_sticky_mutations(self, changes, guild_id_of):
+        """Schreibt einzelne Änderungen {channel_id: daten oder None} direkt als Zeilen"""
+        removed = [cid for cid, data in changes.items() if data is None]
+        changed = {cid: data for cid, data in changes.items() if data is not None}
+
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "DELETE FROM sticky_messages WHERE channel_id = ?", [(cid,) for cid in removed]
+            )
+            self.conn.executemany(
+                "INSERT INTO sticky_messages (channel_id, guild_id, payload) VALUES (?, ?, ?) "
+                "ON CONFLICT(channel_id) DO UPDATE SET guild_id = excluded.guild_id, payload = excluded.payload",
+                [(cid, guild_id_of(data), self._encrypt(data)) for cid, data in changed.items()]
+            )
+
+            if self._sticky_digests is not None:
+                for cid in removed:
+                    self._sticky_digests.pop(cid, None)
+                for cid, data in changed.items():
+                    self._sticky_digests[cid] = _digest(data)
+
+        return True
+
+    def save_guild_sticky_messages(self, guild_id, guild_sticky_data):
+        """Ersetzt die Sticky Messages einer einzelnen Guild"""
+        guild_id = str(guild_id)
+        with self._lock, self.conn:
+            existing = [row[0] for row in self.conn.execute(
+                "SELECT channel_id FROM sticky_messages WHERE guild_id = ?", (guild_id,)
+            )]
+            removed = [cid for cid in existing if cid not in guild_sticky_data]
+            self.conn.executemany(
+                "DELETE FROM sticky_messages WHERE channel_id = ?", [(cid,) for cid in removed]
+            )
+            self.conn.executemany(
+                "INSERT INTO sticky_messages (channel_id, guild_id, payload) VALUES (?, ?, ?) "
+                "ON CONFLICT(channel_id) DO UPDATE SET guild_id = excluded.guild_id, payload = excluded.payload",
+                [(cid, guild_id, self._encrypt(data)) for cid, data in guild_sticky_data.items()]
+            )
+
+            if self._sticky_digests is not None:
+                for cid in removed:
+                    self._sticky_digests.pop(cid, None)
+                for cid, data in guild_sticky_data.items():
+                    self._sticky_digests[cid] = _digest(data)
+
+        return True
+
+    # --- Bot-Rollen ------------------------------------------------------
+
+    def load_bot_roles(self):
+        """Lädt die Bot-Rollen aller Guilds"""
+        with self._lock:
+            rows = self.conn.execute("SELECT guild_id, payload FROM bot_roles ORDER BY rowid").fetchall()
+            bot_roles = {guild_id: self._decrypt(payload) for guild_id, payload in rows}
+            self._roles_digests = {gid: _digest(roles) for gid, roles in bot_roles.items()}
+        return bot_roles
+
+    def save_bot_roles(self, bot_roles):
+        """Speichert nur die Guilds mit geänderten Rollen"""
+        with self._lock:
+            if self._roles_digests is None:
+                self.load_bot_roles()
+
+            removed = [gid for gid in self._roles_digests if gid not in bot_roles]
+            changed = {str(gid): roles for gid, roles in bot_roles.items()
+                       if self._roles_digests.get(str(gid)) != _digest(roles)}
+
+            with self.conn:
+                self.conn.executemany(
+                    "DELETE FROM bot_roles WHERE guild_id = ?", [(gid,) for gid in removed]
+                )
+                self.conn.executemany(
+                    "INSERT INTO bot_roles (guild_id, payload) VALUES (?, ?) "
+                    "ON CONFLICT(guild_id) DO UPDATE SET payload = excluded.payload",
+                    [(gid, self._encrypt(roles)) for gid, roles in changed.items()]
+                )
+
+            for gid in removed:
+                del self._roles_digests[gid]
+            for gid, roles in changed.items():
+                self._roles_digests[gid] = _digest(roles)
+
+        return True
+
+    # --- Archive ---------------------------------------------------------
+
+    @staticmethod
+    def _archive_row(channel_id, data, encrypt):
+        # Indizierte Spalte: tatsächlicher Löschzeitpunkt (ungültiges Datum -> 48h nach Archivierung)
+        from src.utils.secure_storage import archive_expiry
+        expiry = archive_expiry(data, channel_id)
+        return (
+            channel_id,
+            str(data.get('guild_id', '')),
+            data.get('archived_at'),
+            expiry.isoformat() if expiry is not None else None,
+            encrypt(data)
+        )
+
+    def load_archived(self, guild_id=None):
+        """Lädt alle (oder nur die archivierten Sticky Messages einer Guild - indiziert)"""
+        with self._lock:
+            if guild_id is None:
+                rows = self.conn.execute("SELECT channel_id, payload FROM archived_stickies").fetchall()
+            else:
+                rows = self.conn.execute(
+                    "SELECT channel_id, payload FROM archived_stickies WHERE guild_id = ?",
+                    (str(guild_id),)
+                ).fetchall()
+        return {channel_id: self._decrypt(payload) for channel_id, payload in rows}
+
+    def save_archived(self, archived_messages):
+        """Ersetzt das komplette Archiv"""
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM archived_stickies")
+            self.conn.executemany(
+                "INSERT INTO archived_stickies (channel_id, guild_id, archived_at, auto_delete_at, payload) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [self._archive_row(cid, data, self._encrypt) for cid, data in archived_messages.items()]
+            )
+        return True
+
+    def add_archived(self, archived_entries):
+        """Fügt archivierte Sticky Messages hinzu bzw. überschreibt sie"""
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT INTO archived_stickies (channel_id, guild_id, archived_at, auto_delete_at, payload) "
+                "VALUES (?, ?, ?, ?, ?) ON CONFLICT(channel_id) DO UPDATE SET "
+                "guild_id = excluded.guild_id, archived_at = excluded.archived_at, "
+                "auto_delete_at = excluded.auto_delete_at, payload = excluded.payload",
+                [self._archive_row(cid, data, self._encrypt) for cid, data in archived_entries.items()]
+            )
+        return True
+
+    def delete_archived(self, channel_ids):
+        """Entfernt archivierte Sticky Messages"""
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "DELETE FROM archived_stickies WHERE channel_id = ?", [(cid,) for cid in channel_ids]
+            )
+        return True
+
+    def delete_expired_archives(self, now_iso):
+        """
+        Löscht abgelaufene Archive über den auto_delete_at Index
+        (Archive ohne Löschdatum bleiben erhalten)
+
+        Args:
+            now_iso: Aktueller Zeitpunkt (ISO-Format)
+
+        Returns:
+            dict: Gelöschte Einträge {channel_id: daten}
+        """
+        with self._lock, self.conn:
+            rows = self.conn.execute(
+                "SELECT channel_id, payload FROM archived_stickies WHERE auto_delete_at <= ?",
+                (now_iso,)
+            ).fetchall()
+            self.conn.executemany(
+                "DELETE FROM archived_stickies WHERE channel_id = ?", [(row[0],) for row in rows]
+            )
+        return {channel_id: self._decrypt(payload) for channel_id, payload in rows}
+
+    # --- Migration -------------------------------------------------------
+
+    def migrate_from_files(self, sticky_messages, bot_roles, archived_messages, guild_id_of):
+        """Übernimmt einmalig die Daten aus den bisherigen .enc Dateien"""
+        if self.get_meta('migrated_from_files'):
+            return False
+
+        with self._lock:
+            self.save_sticky_messages(sticky_messages, guild_id_of)
+            self.save_bot_roles(bot_roles)
+            self.add_archived(archived_messages)
+            self.set_meta('migrated_from_files', '1')
+
+        logging.info(f"✅ SQLite-Migration: {len(sticky_messages)} Sticky Messages, "
+                     f"{len(bot_roles)} Server-Rollen, {len(archived_messages)} Archive übernommen")
+        return True
@@ -0,0 +1,122 @@
+"""
+Abgleich und Aufräumen der Sticky-Channels
+Beim Start wird jeder Sticky-Channel mit einer begrenzten Anzahl Worker geprüft
+und die Sticky nur dort neu gesendet, wo sie fehlt oder verdeckt ist.
+
+Abstürze, Races oder verlorene IDs können mehrere alte Stickies in einem Channel
+hinterlassen. Sie werden pro Channel gesammelt und mit channel.delete_messages
+in Blöcken von bis zu 100 Nachrichten entfernt (Bulk Delete). Nachrichten älter
+als 14 Tage erlaubt Discord nicht im Bulk Delete - sie werden einzeln gelöscht,
+ebenso alle, wenn dem Bot die Berechtigung "Nachrichten verwalten" fehlt.
+"""
+import random
+import asyncio
+import logging
+import datetime
+import discord
+from src.utils.request_scheduler import PRIORITY_CLEANUP
+from src.utils.sticky_embeds import is_sticky_embed
+
+BULK_DELETE_LIMIT = 100
+BULK_DELETE_MAX_AGE = datetime.timedelta(days=13, hours=12)  # Discord-Grenze: 14 Tage (mit Puffer)
+HISTORY_LIMIT = 100        # Durchsuchte Nachrichten pro Channel
+CLEANUP_CONCURRENCY = 3    # Gleichzeitig bearbeitete Channels
+CLEANUP_INTERVAL = 6 * 60 * 60  # Sekunden zwischen zwei Durchläufen
+RECONCILE_CONCURRENCY = 5  # Gleichzeitig geprüfte Channels beim Start
+RECONCILE_JITTER = 1.5     # Maximale zufällige Pause (Sekunden) vor jedem Channel
+
+
+def is_sticky_message(message, bot_user):
+    """
+    True wenn die Nachricht eine Sticky des Bots ist: eigene Nachricht (keine Interaction-Antwort)
+    mit Sticky-Embed. Erkannt wird an der festen Sticky-Farbe statt am Titel - Stickies von vor
+    einer Titeländerung werden so ebenfalls gefunden, andere Embeds des Bots (z.B. Hinweise) nicht.
+    """
+    return (
+        message.author == bot_user and
+        bool(message.embeds) and
+        is_sticky_embed(message.embeds[0]) and
+        getattr(message, 'interaction_metadata', None) is None
+    )
+
+
+async def find_sticky_messages(channel, bot_user, requests, limit=HISTORY_LIMIT):
+    """
+    IDs aller Stickies des Bots in den letzten Nachrichten (neueste zuerst)
+    """
+    async def fetch_history():
+        return [message async for message in channel.history(limit=limit)]
+
+    history = await requests.submit(fetch_history, PRIORITY_CLEANUP, channel.id)
+    return [message.id for message in history if is_sticky_message(message, bot_user)]
+
+
+async def bulk_delete(channel, message_ids, requests):
+    """
+    Löscht Nachrichten in Blöcken von bis zu 100 (ältere als 14 Tage einzeln)
+    Bulk Delete braucht "Nachrichten verwalten" - ohne die Berechtigung wird jede
+    Nachricht einzeln gelöscht (eigene Nachrichten darf der Bot immer löschen).
+
+    Returns:
+        int: Anzahl gelöschter Nachrichten
+    """
+    if channel.permissions_for(channel.guild.me).manage_messages:
+        cutoff = discord.utils.utcnow() - BULK_DELETE_MAX_AGE
+        recent = [message_id for message_id in message_ids if discord.utils.snowflake_time(message_id) > cutoff]
+        old = [message_id for message_id in message_ids if discord.utils.snowflake_time(message_id) <= cutoff]
+    else:
+        recent, old = [], list(message_ids)
+
+    deleted = 0
+    for start in range(0, len(recent), BULK_DELETE_LIMIT):
+        chunk = [discord.Object(id=message_id) for message_id in recent[start:start + BULK_DELETE_LIMIT]]
+        try:
+            await requests.submit(lambda chunk=chunk: channel.delete_messages(chunk), PRIORITY_CLEANUP, channel.id)
+            deleted += len(chunk)
+        except discord.HTTPException as e:
+            # z.B. eine Nachricht wurde inzwischen gelöscht - Block einzeln versuchen
+            logging.warning(f"⚠️ Bulk Delete in Channel {channel.id} fehlgeschlagen ({e}) - lösche einzeln")
+            old.extend(item.id for item in chunk)
+
+    for message_id in old:
+        try:
+            await requests.submit(
+                lambda message_id=message_id: channel.get_partial_message(message_id).delete(),
+                PRIORITY_CLEANUP, channel.id
+            )
+            deleted += 1
+        except discord.NotFound:
+            pass
+        except discord.HTTPException as e:
+            logging.error(f"❌ Sticky {message_id} konnte nicht gelöscht werden: {e}")
+    return deleted
+
+
+def with_jitter(worker, max_delay=RECONCILE_JITTER):
+    """Verteilt Aufrufe zeitlich: wartet vor jedem worker(item) eine zufällige Zeit"""
+    async def run(item):
+        await asyncio.sleep(random.uniform(0, max_delay))
+        return await worker(item)
+    return run
+
+
+async def run_bounded(items, worker, concurrency=CLEANUP_CONCURRENCY):
+    """
+    Führt worker(item) für alle Einträge mit einer festen Anzahl Worker aus
+    (keine Task pro Eintrag, auch bei tausenden Channels)
+
+    Returns:
+        list: Ergebnisse in Abarbeitungsreihenfolge (Exceptions als Ergebnis)
+    """
+    pending = iter(items)
+    results = []
+
+    async def consume():
+        for item in pending:
+            try:
+                results.append(await worker(item))
+            except Exception as e:
+                results.append(e)
+
+    await asyncio.gather(*(consume() for _ in range(concurrency)))
+    return results
@@ -0,0 +1,78 @@
+"""
+Vorgerenderte Sticky Embeds
+Das Embed einer Sticky Message wird einmal pro Channel aus der Konfiguration
+gebaut und als serialisiertes Dict gecached. Beim Senden wird nur noch der
+dynamische Teil (Pokémon-Thumbnail) ergänzt.
+"""
+import discord
+
+# Feste Farbe aller Sticky Embeds - andere Embeds des Bots nutzen andere Farben,
+# daran werden alte Stickies unabhängig vom (evtl. geänderten) Titel erkannt
+STICKY_COLOR = discord.Color.blue()
+
+
+def build_sticky_embed(sticky_data):
+    """Baut das Embed einer Sticky Message aus ihrer Konfiguration"""
+    embed = discord.Embed(
+        title=sticky_data["title"],
+        description=sticky_data["message"],
+        color=STICKY_COLOR
+    )
+
+    if sticky_data.get("example"):
+        embed.add_field(
+            name="Weitere Infos",
+            value=sticky_data["example"],
+            inline=False
+        )
+
+    if sticky_data.get("footer"):
+        embed.set_footer(text=sticky_data['footer'])
+
+    return embed
+
+
+def is_sticky_embed(embed):
+    """True wenn das Embed wie eine Sticky Message aufgebaut ist (feste Sticky-Farbe)"""
+    return embed.colour == STICKY_COLOR
+
+
+class StickyEmbedCache:
+    """Cache channel_id -> fertiges Embed-Payload (embed.to_dict())"""
+
+    def __init__(self):
+        self._payloads = {}  # channel_id -> (Konfiguration, Payload)
+        self.hits = 0
+        self.misses = 0
+
+    def get_embed(self, channel_id, sticky_data, thumbnail_url=None):
+        """
+        Gibt ein sendefertiges Embed zurück (baut es nur bei Bedarf neu)
+
+        Args:
+            channel_id: Channel der Sticky Message
+            sticky_data: Aktuelle Konfiguration des Channels
+            thumbnail_url: Dynamisches Thumbnail (z.B. Pokémon), wird erst beim Senden gesetzt
+        """
+        cached = self._payloads.get(channel_id)
+        # Neu geladene Konfigurationen (z.B. GUI-Änderung) sind neue Objekte
+        if cached is None or cached[0] is not sticky_data:
+            cached = (sticky_data, build_sticky_embed(sticky_data).to_dict())
+            self._payloads[channel_id] = cached
+            self.misses += 1
+        else:
+            self.hits += 1
+
+        # Flache Kopie - set_thumbnail ersetzt nur den Thumbnail-Eintrag
+        embed = discord.Embed.from_dict(dict(cached[1]))
+        if thumbnail_url:
+            embed.set_thumbnail(url=thumbnail_url)
+        return embed
+
+    def invalidate(self, *channel_ids):
+        """Verwirft gecachte Embeds (ohne Angabe: alle)"""
+        if not channel_ids:
+            self._payloads.clear()
+            return
+        for channel_id in channel_ids:
+            self._payloads.pop(channel_id, None)
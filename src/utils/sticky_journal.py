@@ -0,0 +1,150 @@
+"""
+Append-Only Journal für Sticky Messages
+Jede Änderung wird als kleiner verschlüsselter Datensatz angehängt, statt die
+komplette Datei neu zu schreiben. Beim Kompaktieren wird das Journal in den
+Snapshot (Guild-Shards) übernommen und geleert.
+"""
+import os
+import logging
+import threading
+from src.utils.path_manager import get_application_path
+from src.utils.sticky_records import discard_record
+
+
+def apply_journal_records(records, sticky_messages, guild_id=None, guild_id_of=None):
+    """
+    Wendet bereits entschlüsselte Journal-Einträge auf einen Stand an (in-place)
+
+    Args:
+        records: Einträge aus StickyJournal.records()
+        sticky_messages: Stand {channel_id: daten}
+        guild_id: Optional nur Einträge dieser Guild berücksichtigen
+        guild_id_of: Funktion die die Guild ID einer Konfiguration liefert
+    """
+    for record in records:
+        channel_id = record['channel_id']
+        data = record.get('data')
+        if record.get('op') == 'del' or data is None:
+            discard_record(sticky_messages, channel_id)
+        elif guild_id is not None and guild_id_of(data) != str(guild_id):
+            # Channel gehört (inzwischen) zu einer anderen Guild
+            discard_record(sticky_messages, channel_id)
+        else:
+            sticky_messages[channel_id] = data
+    return sticky_messages
+
+
+class StickyJournal:
+    """Verschlüsseltes Write-Ahead-Journal: eine Zeile pro Änderung"""
+
+    def __init__(self, filename, storage):
+        """
+        Args:
+            filename: Pfad relativ zum Anwendungsordner (z.B. data/sticky_journal.log)
+            storage: SecureStorage Instanz für die Ver-/Entschlüsselung
+        """
+        self.path = os.path.join(get_application_path(), filename)
+        self.storage = storage
+        self.lock = threading.RLock()
+        self._record_count = None
+
+    def append(self, changes):
+        """
+        Hängt Änderungen an das Journal an
+
+        Args:
+            changes: {channel_id: daten} - None bedeutet "entfernt"
+
+        Returns:
+            int: Anzahl Datensätze im Journal nach dem Anhängen (0 bei Fehler)
+        """
+        lines = []
+        for channel_id, data in changes.items():
+            record = {'op': 'del' if data is None else 'set', 'channel_id': channel_id}
+            if data is not None:
+                record['data'] = data
+            encrypted = self.storage.encrypt_data(record)
+            if not encrypted:
+                return 0
+            lines.append(encrypted + '\n')
+
+        with self.lock:
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    if not self._ends_with_newline():
+                        # Abgebrochene letzte Zeile (Absturz) abschließen
+                        f.write('\n')
+                    f.writelines(lines)
+                    f.flush()
+                    os.fsync(f.fileno())
+            except Exception as e:
+                logging.error(f"❌ Journal-Schreiben fehlgeschlagen: {e}")
+                return 0
+            return self.record_count(len(lines))
+
+    def record_count(self, appended=0):
+        """Anzahl Datensätze im Journal (wird nur beim ersten Aufruf gezählt)"""
+        with self.lock:
+            if self._record_count is None:
+                self._record_count = len(self._read_lines())
+            else:
+                self._record_count += appended
+            return self._record_count
+
+    def _ends_with_newline(self):
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                return f.read(1) == b'\n'
+        except OSError:
+            # Leere oder fehlende Datei
+            return True
+
+    def _read_lines(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return f.readlines()
+        except OSError:
+            return []
+
+    def records(self):
+        """Liest alle gültigen Datensätze in Schreibreihenfolge"""
+        with self.lock:
+            lines = self._read_lines()
+
+        records = []
+        for index, line in enumerate(lines):
+            line = line.strip()
+            if not line:
+                continue
+            record = self.storage.decrypt_data(line)
+            if not isinstance(record, dict) or 'channel_id' not in record:
+                # Abgebrochener Schreibvorgang (Absturz) - Eintrag überspringen
+                logging.warning(f"⚠️ Unvollständiger Journal-Eintrag in Zeile {index + 1} übersprungen")
+                continue
+            records.append(record)
+        return records
+
+    def replay(self, sticky_messages, guild_id=None, guild_id_of=None):
+        """
+        Wendet das Journal auf einen Snapshot an (in-place)
+
+        Args:
+            sticky_messages: Snapshot {channel_id: daten}
+            guild_id: Optional nur Einträge dieser Guild berücksichtigen
+            guild_id_of: Funktion die die Guild ID einer Konfiguration liefert
+        """
+        return apply_journal_records(self.records(), sticky_messages, guild_id, guild_id_of)
+
+    def truncate(self):
+        """Leert das Journal nach erfolgreicher Kompaktierung"""
+        with self.lock:
+            try:
+                if os.path.exists(self.path):
+                    os.remove(self.path)
+                self._record_count = 0
+                return True
+            except Exception as e:
+                logging.error(f"❌ Journal konnte nicht geleert werden: {e}")
+                return False
@@ -0,0 +1,235 @@
+"""
+Satzweise Verschlüsselung für Sticky Messages
+Jeder Channel-Eintrag wird als eigener verschlüsselter Datensatz gespeichert.
+Ein separat verschlüsselter Index (channel_id -> Offset, Länge, Guild, Kurzinfo)
+erlaubt es, Einträge erst beim ersten Zugriff zu entschlüsseln.
+
+Dateiformat (data/guilds/<guild_id>/sticky.rec):
+    Header (Magic, Version, Index-Länge) + verschlüsselter Index + Datensätze (v2 Format)
+"""
+import copy
+import json
+import struct
+import hashlib
+import logging
+from collections.abc import MutableMapping
+
+RECORD_MAGIC = b'STBR'
+RECORD_VERSION = 1
+_RECORD_HEADER = struct.Struct('>4sBI')
+
+# Felder, die im Index als Kurzinfo mitgespeichert werden (z.B. für /sticky_list)
+# Ältere Indizes ohne neue Felder liefern dafür None
+SUMMARY_FIELDS = ('title', 'delay', 'channel_name', 'adaptive_delay', 'message_count')
+
+
+def record_digest(data):
+    """Stabiler Digest eines Eintrags (erkennt unveränderte Einträge ohne Verschlüsselung)"""
+    json_str = json.dumps(data, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(json_str.encode('utf-8')).hexdigest()
+
+
+def make_summary(data):
+    """Kurzinfo eines Eintrags für den Index"""
+    return {field: data.get(field) for field in SUMMARY_FIELDS}
+
+
+class _Encrypted:
+    """Noch nicht entschlüsselter Datensatz"""
+    __slots__ = ('blob', 'guild_id', 'summary')
+
+    def __init__(self, blob, guild_id, summary=None):
+        self.blob = blob
+        self.guild_id = guild_id
+        self.summary = summary
+
+
+class LazyRecords(MutableMapping):
+    """
+    Sticky Messages {channel_id: daten}, deren Einträge erst beim ersten Zugriff
+    entschlüsselt und danach gecached werden
+    """
+
+    def __init__(self, decrypt=None):
+        """
+        Args:
+            decrypt: Funktion(blob) -> daten zum Entschlüsseln eines Datensatzes
+        """
+        self._decrypt = decrypt
+        self._entries = {}  # channel_id -> daten oder _Encrypted
+        self._blobs = {}    # channel_id -> (blob, digest) des zuletzt gespeicherten Stands
+        self.decrypted = 0
+
+    def add_encrypted(self, channel_id, blob, guild_id, summary=None):
+        """Fügt einen verschlüsselten Datensatz hinzu (wird erst bei Bedarf entschlüsselt)"""
+        self._entries[channel_id] = _Encrypted(blob, guild_id, summary)
+
+    def __getitem__(self, channel_id):
+        value = self._entries[channel_id]
+        if isinstance(value, _Encrypted):
+            data = self._decrypt(value.blob)
+            if data is None:
+                logging.error(f"❌ Sticky-Datensatz für Channel {channel_id} konnte nicht entschlüsselt werden")
+                data = {}
+            self._entries[channel_id] = data
+            self._blobs[channel_id] = (value.blob, record_digest(data))
+            self.decrypted += 1
+            return data
+        return value
+
+    def __setitem__(self, channel_id, data):
+        self._entries[channel_id] = data
+
+    def __delitem__(self, channel_id):
+        del self._entries[channel_id]
+        self._blobs.pop(channel_id, None)
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, channel_id):
+        return channel_id in self._entries
+
+    def discard(self, channel_id):
+        """Entfernt einen Eintrag ohne ihn vorher zu entschlüsseln (fehlende werden ignoriert)"""
+        self._entries.pop(channel_id, None)
+        self._blobs.pop(channel_id, None)
+
+    def clear(self):
+        self._entries.clear()
+        self._blobs.clear()
+
+    def is_loaded(self, channel_id):
+        """True wenn der Eintrag bereits entschlüsselt ist (oder neu gesetzt wurde)"""
+        return not isinstance(self._entries.get(channel_id), _Encrypted)
+
+    def guild_of(self, channel_id, guild_id_of):
+        """Guild eines Eintrags - ohne Entschlüsselung, falls noch verschlüsselt"""
+        value = self._entries[channel_id]
+        if isinstance(value, _Encrypted):
+            return value.guild_id
+        return guild_id_of(value)
+
+    def summary(self, channel_id):
+        """Kurzinfo (Titel, Verzögerung, Channel-Name) - aus dem Index, falls noch verschlüsselt"""
+        value = self._entries[channel_id]
+        if isinstance(value, _Encrypted) and value.summary is not None:
+            return value.summary
+        return make_summary(self[channel_id])
+
+    def reusable_blob(self, channel_id):
+        """Gibt den gespeicherten Datensatz zurück, falls der Eintrag unverändert ist"""
+        value = self._entries[channel_id]
+        if isinstance(value, _Encrypted):
+            return value.blob
+        blob, digest = self._blobs.get(channel_id, (None, None))
+        if blob is not None and digest == record_digest(value):
+            return blob
+        return None
+
+    def replace_from(self, other):
+        """Übernimmt den Inhalt eines anderen Stands in-place (Referenzen bleiben gültig)"""
+        self.clear()
+        if isinstance(other, LazyRecords):
+            self._decrypt = other._decrypt
+            self._entries.update(other._entries)
+            self._blobs.update(other._blobs)
+        else:
+            self._entries.update(other)
+
+    def merge_from(self, other):
+        """Übernimmt die Einträge eines anderen Stands, ohne sie zu entschlüsseln"""
+        for channel_id in other._entries:
+            self._blobs.pop(channel_id, None)
+        self._entries.update(other._entries)
+        self._blobs.update(other._blobs)
+
+    def snapshot(self):
+        """Kopie für den Schreib-Thread: entschlüsselte Einträge tief kopiert, Datensätze geteilt"""
+        clone = LazyRecords(self._decrypt)
+        for channel_id, value in self._entries.items():
+            clone._entries[channel_id] = value if isinstance(value, _Encrypted) else copy.deepcopy(value)
+        clone._blobs.update(self._blobs)
+        return clone
+
+    def to_dict(self):
+        """Vollständig entschlüsselte Kopie als normales Dict"""
+        return {channel_id: self[channel_id] for channel_id in list(self._entries)}
+
+
+def is_loaded(sticky_data, channel_id):
+    """True wenn ein Eintrag ohne Entschlüsselung gelesen werden kann (normale Dicts immer)"""
+    if isinstance(sticky_data, LazyRecords):
+        return sticky_data.is_loaded(channel_id)
+    return True
+
+
+def discard_record(sticky_data, channel_id):
+    """Entfernt einen Eintrag - bei LazyRecords ohne Entschlüsselung"""
+    if isinstance(sticky_data, LazyRecords):
+        sticky_data.discard(channel_id)
+    else:
+        sticky_data.pop(channel_id, None)
+
+
+def read_record_file(path, storage, guild_id, records):
+    """
+    Liest Index und Datensätze einer Record-Datei in ein LazyRecords (ohne die Datensätze zu entschlüsseln)
+
+    Returns:
+        list: [(channel_id, blob, summary)] oder None wenn die Datei fehlt oder beschädigt ist
+    """
+    try:
+        with open(path, 'rb') as f:
+            raw = f.read()
+    except OSError:
+        return None
+
+    if len(raw) < _RECORD_HEADER.size:
+        return None
+
+    magic, version, index_length = _RECORD_HEADER.unpack_from(raw)
+    if magic != RECORD_MAGIC or version != RECORD_VERSION:
+        logging.error(f"❌ Unbekanntes Record-Format: {path}")
+        return None
+
+    data_start = _RECORD_HEADER.size + index_length
+    index = storage.decrypt_bytes(raw[_RECORD_HEADER.size:data_start])
+    if index is None:
+        return None
+
+    entries = []
+    view = memoryview(raw)
+    for channel_id, (offset, length, summary) in index.items():
+        start = data_start + offset
+        blob = bytes(view[start:start + length])
+        records.add_encrypted(channel_id, blob, guild_id, summary)
+        entries.append((channel_id, blob, summary))
+    return entries
+
+
+def build_record_file(entries, storage):
+    """
+    Baut den Inhalt einer Record-Datei
+
+    Args:
+        entries: Liste von (channel_id, blob, summary)
+
+    Returns:
+        bytes oder None bei Fehler
+    """
+    index = {}
+    offset = 0
+    for channel_id, blob, summary in entries:
+        index[channel_id] = [offset, len(blob), summary]
+        offset += len(blob)
+
+    index_blob = storage.encrypt_bytes(index)
+    if index_blob is None:
+        return None
+
+    header = _RECORD_HEADER.pack(RECORD_MAGIC, RECORD_VERSION, len(index_blob))
+    return b''.join([header, index_blob] + [blob for _, blob, _ in entries])
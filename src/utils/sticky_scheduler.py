@@ -0,0 +1,149 @@
+"""
+Zentraler Timer für Sticky-Reposts
+Alle ausstehenden Reposts liegen in einem Heap (Fälligkeit, Channel). Eine
+einzige Schleife wartet auf den nächsten fälligen Eintrag und stößt den Repost
+an - statt einer schlafenden Coroutine bzw. eines Tasks pro Channel.
+"""
+import time
+import heapq
+import asyncio
+import logging
+import itertools
+
+
+class StickyScheduler:
+    """Heap-basierter Scheduler: channel_id -> Fälligkeit (monotone Zeit)"""
+
+    def __init__(self, dispatch):
+        """
+        Args:
+            dispatch: Coroutine-Funktion(channel_id), wird bei Fälligkeit aufgerufen
+        """
+        self.dispatch = dispatch
+        self._heap = []        # (fällig_um, laufende_nummer, channel_id) - veraltete Einträge werden übersprungen
+        self._deadlines = {}   # channel_id -> aktuelle Fälligkeit
+        self._counter = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self._running = set()  # Laufende Reposts (Referenzen halten)
+
+        # Statistiken
+        self.scheduled = 0
+        self.dispatched = 0
+        self.max_lateness = 0.0
+
+    def start(self):
+        """Startet die Scheduler-Schleife"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Beendet die Schleife und laufende Reposts (ausstehende Reposts verfallen)"""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        running = list(self._running)
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+        self._heap.clear()
+        self._deadlines.clear()
+
+    def schedule(self, channel_id, delay, reset=False):
+        """
+        Plant einen Repost in `delay` Sekunden - O(log n)
+
+        Args:
+            channel_id: Channel der Sticky Message
+            delay: Verzögerung in Sekunden
+            reset: True verschiebt eine bereits geplante Fälligkeit,
+                   False behält sie (früherer Termin bleibt bestehen)
+
+        Returns:
+            float: Fälligkeit des Channels (monotone Zeit)
+        """
+        due = time.monotonic() + max(0.0, delay)
+        current = self._deadlines.get(channel_id)
+        if current is not None and not reset:
+            return current
+
+        self._deadlines[channel_id] = due
+        heapq.heappush(self._heap, (due, next(self._counter), channel_id))
+        self.scheduled += 1
+
+        # Veraltete Einträge gelegentlich entfernen, damit der Heap nicht wächst
+        if len(self._heap) > 2 * len(self._deadlines) + 64:
+            self._compact()
+
+        # Schleife wecken, falls der neue Termin vor dem bisher nächsten liegt
+        if self._heap[0][2] == channel_id:
+            self._wakeup.set()
+        return due
+
+    def cancel(self, channel_id):
+        """Verwirft einen geplanten Repost - O(1), der Heap-Eintrag verfällt"""
+        return self._deadlines.pop(channel_id, None) is not None
+
+    def is_scheduled(self, channel_id):
+        return channel_id in self._deadlines
+
+    def deadline(self, channel_id):
+        """Fälligkeit eines geplanten Reposts (monotone Zeit) oder None"""
+        return self._deadlines.get(channel_id)
+
+    def pending(self):
+        """Anzahl geplanter Reposts"""
+        return len(self._deadlines)
+
+    def stats(self):
+        return {
+            'pending': len(self._deadlines),
+            'heap_size': len(self._heap),
+            'scheduled': self.scheduled,
+            'dispatched': self.dispatched,
+            'running': len(self._running),
+            'max_lateness_ms': round(self.max_lateness * 1000, 1)
+        }
+
+    def _compact(self):
+        self._heap = [(due, seq, channel_id) for due, seq, channel_id in self._heap
+                      if self._deadlines.get(channel_id) == due]
+        heapq.heapify(self._heap)
+
+    async def _run(self):
+        while True:
+            # Veraltete Einträge (verschoben oder abgebrochen) überspringen
+            while self._heap and self._deadlines.get(self._heap[0][2]) != self._heap[0][0]:
+                heapq.heappop(self._heap)
+
+            self._wakeup.clear()
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+
+            due, _, channel_id = self._heap[0]
+            remaining = due - time.monotonic()
+            if remaining > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heapq.heappop(self._heap)
+            del self._deadlines[channel_id]
+            self.dispatched += 1
+            self.max_lateness = max(self.max_lateness, -remaining)
+
+            task = asyncio.create_task(self._dispatch(channel_id))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _dispatch(self, channel_id):
+        try:
+            await self.dispatch(channel_id)
+        except Exception as e:
+            logging.error(f"❌ Geplanter Sticky-Repost für Channel {channel_id} fehlgeschlagen: {e}")
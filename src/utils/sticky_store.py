@@ -0,0 +1,288 @@
+"""
+In-Memory Sticky Store für Sticky-Bot
+Hält alle Sticky Messages im Speicher des Bot-Prozesses und lädt die
+verschlüsselte Datei nur neu, wenn sie sich tatsächlich geändert hat
+"""
+import copy
+import time
+import logging
+from src.utils.persistence_worker import PersistenceWorker
+from src.utils.sticky_records import LazyRecords
+from src.utils.sticky_journal import apply_journal_records
+from src.utils.secure_storage import (
+    load_sticky_messages_lazy,
+    load_sticky_guilds_lazy,
+    save_sticky_messages_secure,
+    load_sticky_message_ids_secure,
+    save_sticky_message_ids_secure,
+    append_sticky_mutations_secure,
+    read_sticky_state,
+    follow_sticky_compactions,
+    changed_shard_guilds,
+    get_sticky_write_version,
+    get_sticky_guild_id
+)
+
+
+# Zeitfenster für die IDs der geposteten Stickies - beim Beenden wird sofort geschrieben
+MESSAGE_ID_WRITE_DELAY = 30.0
+
+
+class StickyStore:
+    """Autoritativer Sticky-Speicher mit Change Detection (Version/mtime/Größe)"""
+
+    def __init__(self, bot_token=None, check_interval=1.0, write_delay=0.5, message_id_delay=MESSAGE_ID_WRITE_DELAY):
+        """
+        Args:
+            bot_token: Schlüssel für die verschlüsselte Speicherung
+            check_interval: Mindestabstand in Sekunden zwischen zwei Datei-Prüfungen
+            write_delay: Zeitfenster in Sekunden, in dem Änderungen gebündelt geschrieben werden
+            message_id_delay: Zeitfenster in Sekunden für die IDs der geposteten Stickies
+        """
+        self.bot_token = bot_token
+        self.check_interval = check_interval
+        self.data = LazyRecords()  # Einträge werden erst beim ersten Zugriff entschlüsselt
+        self.guild_index = {}      # guild_id -> set(channel_ids)
+        self._channel_guilds = {}  # channel_id -> guild_id
+        self._signature = None
+        self._guild_stamps = None  # guild_id -> Signatur der Shard-Dateien beim letzten Laden
+        self._last_check = 0.0
+        self.writer = PersistenceWorker(
+            "Sticky Messages", self._write_changes, self._write_full, delay=write_delay
+        )
+        # IDs der geposteten Stickies ändern sich bei jedem Repost - nur im Speicher halten
+        # und gebündelt als eigener Datensatz schreiben (kein Journal-Eintrag pro Repost,
+        # der Worker erhält immer den kompletten Stand)
+        self.message_ids = None  # channel_id -> message_id, wird beim ersten Zugriff geladen
+        self.message_id_writer = PersistenceWorker(
+            "Sticky Message IDs", self._write_message_ids, self._write_message_ids, delay=message_id_delay
+        )
+
+    def __contains__(self, channel_id):
+        return channel_id in self.data
+
+    def __len__(self):
+        return len(self.data)
+
+    def get(self, channel_id, default=None):
+        """Gibt die Konfiguration eines Channels zurück (entschlüsselt beim ersten Zugriff)"""
+        return self.data.get(channel_id, default)
+
+    def channels_for_guild(self, guild_id):
+        """Alle Sticky-Channels einer Guild (Kopie, ohne Channel-Cache oder Entschlüsselung)"""
+        return set(self.guild_index.get(str(guild_id), ()))
+
+    def rebuild_index(self):
+        """Baut den Guild -> Channels Index komplett neu auf"""
+        self.guild_index = {}
+        self._channel_guilds = {}
+        self._reindex(*self.data)
+
+    def _reindex(self, *channel_ids):
+        """Aktualisiert den Guild-Index für geänderte, neue oder entfernte Channels"""
+        for channel_id in channel_ids:
+            old_guild = self._channel_guilds.pop(channel_id, None)
+            if old_guild is not None:
+                channels = self.guild_index.get(old_guild)
+                if channels is not None:
+                    channels.discard(channel_id)
+                    if not channels:
+                        del self.guild_index[old_guild]
+
+            if channel_id in self.data:
+                guild_id = self.data.guild_of(channel_id, get_sticky_guild_id)
+                self._channel_guilds[channel_id] = guild_id
+                self.guild_index.setdefault(guild_id, set()).add(channel_id)
+
+    def summary(self, channel_id):
+        """Titel, Verzögerung und Channel-Name - ohne den Eintrag zu entschlüsseln"""
+        return self.data.summary(channel_id)
+
+    def is_stale(self):
+        """Prüft ob die Datei seit dem letzten Laden geändert wurde"""
+        if self._signature is None:
+            return True
+
+        # Schreibvorgänge in diesem Prozess (z.B. GUI) sofort erkennen
+        if get_sticky_write_version() != self._signature[0]:
+            return True
+
+        # Externe Änderungen nur im Prüfintervall per stat() erkennen
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return False
+        self._last_check = now
+
+        # Nur die Signatur - Guild-Stempel werden erst beim Neuladen ermittelt
+        state = read_sticky_state(self.bot_token, blocking=False, guild_stamps=False)
+        if state is None:
+            # Gerade wird geschrieben oder kompaktiert - beim nächsten Intervall prüfen
+            return False
+
+        # Eigene Kompaktierungen ändern nur die Dateien, nicht den Inhalt
+        compacted = follow_sticky_compactions(self._signature)
+        if compacted is not None:
+            self._signature, self._guild_stamps = compacted
+        return state[0] != self._signature
+
+    def needs_refresh(self):
+        """Prüft ohne zu blockieren, ob neu geladen werden muss (im Event Loop aufrufbar)"""
+        if self.writer.pending():
+            # Eigene Änderungen noch nicht geschrieben - Neuladen würde sie verwerfen
+            return False
+        return self.is_stale()
+
+    def refresh(self, force=False):
+        """
+        Lädt die Sticky Messages neu, falls sich die Datei geändert hat
+
+        Returns:
+            bool: True wenn neu geladen wurde
+        """
+        if not force and not self.needs_refresh():
+            return False
+        return self.apply_changes(self.load_changes(force))
+
+    def load_changes(self, force=False):
+        """
+        Lädt den geänderten Stand, ohne die Live-Daten zu verändern - blockiert
+        (Journal-Lock, Entschlüsselung), daher im Bot über asyncio.to_thread aufrufen
+
+        Returns:
+            dict: Geladener Stand für apply_changes
+        """
+        if force and self.writer.pending():
+            self.writer.flush()
+
+        # Zähler und Signatur VOR dem Laden merken - spätere Änderungen lösen erneutes Laden aus
+        marks = self.writer.marks
+        signature, guild_stamps = read_sticky_state(self.bot_token)
+        changed = None if force else self._changed_guilds(signature, guild_stamps)
+
+        if changed is None:
+            records, journal_records = load_sticky_messages_lazy(self.bot_token), None
+        else:
+            records, journal_records = load_sticky_guilds_lazy(changed, self.bot_token)
+        return {
+            "marks": marks, "signature": signature, "guild_stamps": guild_stamps,
+            "changed": changed, "records": records, "journal_records": journal_records
+        }
+
+    def apply_changes(self, loaded):
+        """
+        Übernimmt einen mit load_changes geladenen Stand (nur Dict-Operationen, im Event Loop)
+
+        Returns:
+            bool: True wenn übernommen wurde
+        """
+        if self.writer.marks != loaded["marks"]:
+            # Während des Ladens lokal geändert - der geladene Stand würde das verwerfen
+            return False
+
+        changed = loaded["changed"]
+        if changed is None:
+            # In-Place aktualisieren, damit bestehende Referenzen (z.B. Modals) gültig bleiben
+            self.data.replace_from(loaded["records"])
+            logging.debug(f"🔐 Sticky Store neu geladen: {len(self.data)} Einträge (Entschlüsselung bei Bedarf)")
+        else:
+            # Nur geänderte Guilds ersetzen - alle anderen Einträge (und ihre Embeds) bleiben
+            for guild_id in changed:
+                for channel_id in self.channels_for_guild(guild_id):
+                    self.data.discard(channel_id)
+            self.data.merge_from(loaded["records"])
+            apply_journal_records(loaded["journal_records"], self.data)
+            logging.debug(f"🔐 Sticky Store: {len(changed)} geänderte Guild(s) neu geladen")
+
+        self.rebuild_index()
+        self._signature = loaded["signature"]
+        self._guild_stamps = loaded["guild_stamps"]
+        self._last_check = time.monotonic()
+        return True
+
+    def _changed_guilds(self, signature, guild_stamps):
+        """
+        Guilds, die seit dem letzten Laden geändert wurden
+
+        Returns:
+            set oder None wenn komplett neu geladen werden muss (erstes Laden,
+            SQLite-Backend oder alte monolithische Dateien geändert)
+        """
+        if self._signature is None or self._guild_stamps is None or guild_stamps is None:
+            return None
+        if signature[3:] != self._signature[3:]:
+            # sticky_messages.json(.enc) - Migration nur beim kompletten Laden
+            return None
+        return changed_shard_guilds(self._guild_stamps, guild_stamps)
+
+    def save(self, *channel_ids):
+        """
+        Merkt den aktuellen Stand zum verschlüsselten Speichern im Hintergrund vor
+
+        Args:
+            channel_ids: Geänderte Channels - werden nur als Journal-Einträge angehängt.
+                         Ohne Angabe wird der komplette Stand geschrieben.
+        """
+        if channel_ids:
+            self._reindex(*channel_ids)
+        else:
+            self.rebuild_index()
+
+        # Kopien übergeben - der Worker-Thread darf die Live-Daten nicht lesen
+        if channel_ids:
+            changes = {channel_id: copy.deepcopy(self.data.get(channel_id)) for channel_id in channel_ids}
+            self.writer.mark_dirty(changes=changes)
+        else:
+            self.writer.mark_dirty(snapshot=self.data.snapshot())
+        return True
+
+    def message_id(self, channel_id):
+        """
+        ID der aktuell geposteten Sticky eines Channels
+
+        Returns:
+            str oder None (ältere Einträge: aus der Konfiguration)
+        """
+        message_id = self._get_message_ids().get(channel_id)
+        if message_id is None:
+            message_id = (self.data.get(channel_id) or {}).get("last_message_id")
+        return message_id
+
+    def set_message_id(self, channel_id, message_id):
+        """Merkt die ID der neu geposteten Sticky (geschrieben wird gebündelt im Hintergrund)"""
+        message_ids = self._get_message_ids()
+        if message_id is None:
+            message_ids.pop(channel_id, None)
+        else:
+            message_ids[channel_id] = str(message_id)
+        # Nur IDs aktiver Channels speichern - entfernte Stickies fallen beim nächsten Schreiben heraus
+        self.message_id_writer.mark_dirty(snapshot={
+            channel_id: message_id for channel_id, message_id in message_ids.items() if channel_id in self.data
+        })
+
+    def _get_message_ids(self):
+        if self.message_ids is None:
+            self.message_ids = load_sticky_message_ids_secure(self.bot_token)
+        return self.message_ids
+
+    def flush(self, timeout=10.0):
+        """Schreibt ausstehende Änderungen sofort (z.B. beim Beenden)"""
+        return self.writer.flush(timeout) and self.message_id_writer.flush(timeout)
+
+    def _write_full(self, snapshot):
+        if not save_sticky_messages_secure(snapshot, self.bot_token):
+            raise Exception("Verschlüsseltes Speichern fehlgeschlagen")
+        self._mark_saved()
+
+    def _write_changes(self, changes):
+        if not append_sticky_mutations_secure(changes, self.bot_token):
+            raise Exception("Verschlüsseltes Speichern fehlgeschlagen")
+        self._mark_saved()
+
+    def _write_message_ids(self, message_ids):
+        if not save_sticky_message_ids_secure(dict(message_ids), self.bot_token):
+            raise Exception("Verschlüsseltes Speichern fehlgeschlagen")
+
+    def _mark_saved(self):
+        # Eigene Schreibvorgänge lösen kein erneutes Laden aus
+        self._signature, self._guild_stamps = read_sticky_state(self.bot_token)
+        self._last_check = time.monotonic()
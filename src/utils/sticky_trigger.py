@@ -0,0 +1,74 @@
+"""
+Auslöser einer Sticky Message: Zeit, Nachrichtenanzahl oder beides
+Eingabeformat in Modal und GUI: "Sekunden/Nachrichten"
+    "20"     -> Repost 20 Sekunden nach der ersten neuen Nachricht
+    "20/10"  -> nach 10 neuen Nachrichten oder 20 Sekunden (was zuerst eintritt)
+    "/10"    -> nur nach 10 neuen Nachrichten (delay = 0, kein Timer)
+"""
+
+MIN_DELAY = 5
+MIN_MESSAGE_COUNT = 2
+DEFAULT_DELAY = 20
+
+
+def parse_trigger(text, default_delay=DEFAULT_DELAY):
+    """
+    Liest die Eingabe "Sekunden/Nachrichten"
+
+    Returns:
+        tuple: (delay, message_count) - message_count None wenn nicht gesetzt
+
+    Raises:
+        ValueError: mit einer Fehlermeldung für den Benutzer
+    """
+    text = (text or '').strip()
+    seconds, _, messages = text.partition('/')
+    seconds, messages = seconds.strip(), messages.strip()
+
+    try:
+        message_count = int(messages) if messages else None
+        if seconds:
+            delay = int(seconds)
+        else:
+            delay = 0 if message_count else default_delay
+    except ValueError:
+        raise ValueError("Bitte gib eine gültige Zahl für die Verzögerung ein (z.B. 20, 20/10 oder /10).")
+
+    if message_count is not None and message_count < MIN_MESSAGE_COUNT:
+        raise ValueError(f"Die minimale Nachrichtenanzahl beträgt {MIN_MESSAGE_COUNT}.")
+    if message_count and delay == 0:
+        return 0, message_count
+    if delay < MIN_DELAY:
+        raise ValueError(f"Die minimale Verzögerung beträgt {MIN_DELAY} Sekunden.")
+    return delay, message_count
+
+
+def apply_trigger(sticky_data, delay, message_count):
+    """Schreibt Verzögerung und Nachrichtenanzahl in eine Konfiguration"""
+    sticky_data["delay"] = delay
+    if message_count:
+        sticky_data["message_count"] = message_count
+    else:
+        sticky_data.pop("message_count", None)
+    return sticky_data
+
+
+def format_trigger(sticky_data):
+    """Eingabewert für Modal/GUI aus einer Konfiguration"""
+    delay = sticky_data.get("delay", DEFAULT_DELAY)
+    message_count = sticky_data.get("message_count")
+    if not message_count:
+        return str(delay)
+    return f"{delay or ''}/{message_count}"
+
+
+def describe_trigger(sticky_data):
+    """Lesbare Beschreibung, z.B. "20 Sekunden oder 10 Nachrichten" """
+    delay = sticky_data.get("delay")
+    message_count = sticky_data.get("message_count")
+    if message_count and not delay:
+        return f"{message_count} Nachrichten"
+    text = f"{delay if delay is not None else DEFAULT_DELAY} Sekunden"
+    if message_count:
+        text += f" oder {message_count} Nachrichten"
+    return text
@@ -27,9 +27,16 @@ def setup_token():
             has_gui = False
         
         if has_gui:
-            return setup_token_gui()
+            success = setup_token_gui()
         else:
-            return setup_token_console()
+            success = setup_token_console()
+        
+        if success:
+            # Neuer Token - gecachte Schlüssel verwerfen
+            from src.utils.permissions import invalidate_key_cache
+            invalidate_key_cache()
+        
+        return success
             
     except Exception as e:
         logging.error(f"❌ Token Setup Fehler: {e}")
@@ -0,0 +1,27 @@
+"""
+Gemeinsame Fixtures für die Tests des Sticky-Bots
+"""
+import os
+import sys
+
+import pytest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+
+@pytest.fixture
+def app_path(tmp_path, monkeypatch):
+    """Leitet alle Datenpfade (data/, Journal) in ein temporäres Verzeichnis um"""
+    import src.utils.secure_storage as secure_storage
+    import src.utils.sticky_journal as sticky_journal
+
+    monkeypatch.setattr(secure_storage, 'get_application_path', lambda: str(tmp_path))
+    monkeypatch.setattr(sticky_journal, 'get_application_path', lambda: str(tmp_path))
+    monkeypatch.setattr(secure_storage, 'use_sqlite_backend', lambda: False)
+    # Prozessweite Caches gehören zum jeweiligen Datenordner
+    for name in ('_shard_digests', '_sticky_record_signatures', '_sticky_blob_cache',
+                 '_sticky_journals', '_sticky_compactions'):
+        monkeypatch.setattr(secure_storage, name, {})
+    return tmp_path
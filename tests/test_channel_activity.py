@@ -0,0 +1,33 @@
+"""
+Tests für die Nachrichtenrate pro Channel und die adaptive Verzögerung
+"""
+import math
+
+import pytest
+
+from src.utils.channel_activity import ChannelActivity, adaptive_delay, REFERENCE_RATE
+
+
+def test_reference_rate_keeps_base_delay():
+    assert adaptive_delay(20, REFERENCE_RATE, 5, 120) == pytest.approx(20)
+
+
+def test_delay_grows_with_square_root_of_rate():
+    assert adaptive_delay(20, REFERENCE_RATE * 4, 5, 120) == pytest.approx(40)
+    assert adaptive_delay(20, REFERENCE_RATE / 4, 5, 120) == pytest.approx(10)
+
+
+def test_delay_is_clamped_to_min_and_max():
+    assert adaptive_delay(20, 0.0, 5, 120) == 5
+    assert adaptive_delay(20, REFERENCE_RATE * 10000, 5, 120) == 120
+
+
+def test_rate_decays_exponentially():
+    activity = ChannelActivity(time_constant=60.0)
+    assert activity.record('10', now=0.0) == pytest.approx(1.0)
+    assert activity.record('10', now=0.0) == pytest.approx(2.0)
+    assert activity.rate('10', now=60.0) == pytest.approx(2.0 / math.e)
+    assert activity.rate('11', now=60.0) == 0.0
+
+    activity.forget('10')
+    assert activity.rate('10', now=60.0) == 0.0
@@ -0,0 +1,39 @@
+"""
+Tests für den zentralen Message-Router
+"""
+import asyncio
+from types import SimpleNamespace
+
+from src.utils.message_router import MessageRouter
+
+
+def message(channel_id, bot=False, guild=True):
+    return SimpleNamespace(
+        id=1,
+        author=SimpleNamespace(bot=bot),
+        guild=object() if guild else None,
+        channel=SimpleNamespace(id=channel_id)
+    )
+
+
+def test_bot_messages_only_reach_routes_that_include_them():
+    received = {'all': [], 'users': []}
+
+    def handler(name):
+        async def handle(msg, channel_id):
+            received[name].append((channel_id, msg.author.bot))
+        return handle
+
+    router = MessageRouter()
+    router.add_route('all', handler('all'), {'10'}, include_bots=True)
+    router.add_route('users', handler('users'), {'10'})
+
+    async def scenario():
+        await router.on_message(message(10))
+        await router.on_message(message(10, bot=True))
+        await router.on_message(message(11))
+        await router.on_message(message(10, guild=False))
+
+    asyncio.run(scenario())
+    assert received == {'all': [('10', False), ('10', True)], 'users': [('10', False)]}
+    assert router.stats()['dropped'] == 2
@@ -0,0 +1,103 @@
+"""
+Tests für den entprellten Hintergrund-Schreiber
+"""
+import threading
+
+from src.utils.persistence_worker import PersistenceWorker
+
+
+class FakeBackend:
+    """Speichert geschriebene Stände im Speicher - der erste Schreibvorgang kann blockieren und fehlschlagen"""
+
+    def __init__(self, fail_first=False):
+        self.state = {}
+        self.calls = []
+        self.fail_first = fail_first
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def write_full(self, snapshot):
+        self._write('full', dict(snapshot))
+        self.state = dict(snapshot)
+
+    def write_changes(self, changes):
+        self._write('changes', dict(changes))
+        for key, value in changes.items():
+            if value is None:
+                self.state.pop(key, None)
+            else:
+                self.state[key] = value
+
+    def _write(self, kind, payload):
+        self.calls.append((kind, payload))
+        self.started.set()
+        self.release.wait(5)
+        if self.fail_first:
+            self.fail_first = False
+            raise OSError("Festplatte voll")
+
+
+def make_worker(backend):
+    return PersistenceWorker("Test", backend.write_changes, backend.write_full, delay=0.01)
+
+
+def test_changes_are_batched_and_flushed():
+    backend = FakeBackend()
+    worker = make_worker(backend)
+
+    worker.mark_dirty(changes={'a': 1})
+    worker.mark_dirty(changes={'a': 2, 'b': 3})
+    assert worker.flush(5)
+
+    assert backend.state == {'a': 2, 'b': 3}
+    assert not worker.pending()
+
+
+def test_changes_after_snapshot_are_written_after_it():
+    backend = FakeBackend()
+    worker = make_worker(backend)
+
+    worker.mark_dirty(changes={'stale': 1})
+    worker.mark_dirty(snapshot={'a': 1, 'b': 2})
+    worker.mark_dirty(changes={'b': None, 'c': 3})
+    assert worker.flush(5)
+
+    assert [kind for kind, _ in backend.calls] == ['full', 'changes']
+    assert backend.state == {'a': 1, 'c': 3}
+
+
+def test_failed_changes_do_not_overwrite_newer_snapshot():
+    backend = FakeBackend(fail_first=True)
+    backend.release.clear()
+    worker = make_worker(backend)
+
+    worker.mark_dirty(changes={'a': 'alt'})
+    assert backend.started.wait(5)
+    # Während der (fehlschlagende) Schreibvorgang läuft, wird ein neuerer Stand vorgemerkt
+    worker.mark_dirty(snapshot={'a': 'neu', 'b': 'neu'})
+    backend.release.set()
+    assert worker.flush(10)
+
+    assert worker.errors == 1
+    assert backend.calls[-1] == ('full', {'a': 'neu', 'b': 'neu'})
+    assert backend.state == {'a': 'neu', 'b': 'neu'}
+
+
+def test_failed_changes_are_folded_into_retried_snapshot():
+    backend = FakeBackend()
+    worker = make_worker(backend)
+    backend.fail_first = True
+    backend.release.clear()
+
+    worker.mark_dirty(snapshot={'a': 1, 'b': 2})
+    worker.mark_dirty(changes={'b': None, 'c': 3})
+    assert backend.started.wait(5)
+    worker.mark_dirty(changes={'c': 4})
+    backend.release.set()
+    assert worker.flush(10)
+
+    assert worker.errors == 1
+    # Der erneute Versuch schreibt einen Stand inkl. der alten Änderungen, danach nur neuere Marks
+    assert backend.calls[1:] == [('full', {'a': 1, 'c': 3}), ('changes', {'c': 4})]
+    assert backend.state == {'a': 1, 'c': 4}
@@ -0,0 +1,128 @@
+"""
+Tests für die Prioritäts-Warteschlange der Discord-Anfragen
+"""
+import asyncio
+import logging
+
+import pytest
+
+from src.utils.request_scheduler import (
+    RequestScheduler,
+    PRIORITY_INTERACTION,
+    PRIORITY_REPOST,
+    PRIORITY_CLEANUP
+)
+
+
+def test_higher_priority_requests_run_first():
+    async def scenario():
+        scheduler = RequestScheduler(max_concurrency=1)
+        order = []
+        release = asyncio.Event()
+
+        async def blocker():
+            await release.wait()
+            order.append('blocker')
+
+        def call(name):
+            async def run():
+                order.append(name)
+                return name
+            return run
+
+        first = asyncio.create_task(scheduler.submit(blocker, PRIORITY_REPOST))
+        await asyncio.sleep(0.01)
+        waiting = [
+            asyncio.create_task(scheduler.submit(call('cleanup'), PRIORITY_CLEANUP)),
+            asyncio.create_task(scheduler.submit(call('repost'), PRIORITY_REPOST)),
+            asyncio.create_task(scheduler.submit(call('interaction'), PRIORITY_INTERACTION)),
+        ]
+        await asyncio.sleep(0.01)
+        release.set()
+        results = await asyncio.gather(first, *waiting)
+        await scheduler.stop()
+        return order, results
+
+    order, results = asyncio.run(scenario())
+    assert order == ['blocker', 'interaction', 'repost', 'cleanup']
+    assert results == [None, 'cleanup', 'repost', 'interaction']
+
+
+def test_errors_are_passed_to_the_caller():
+    async def scenario():
+        scheduler = RequestScheduler()
+
+        async def fail():
+            raise ValueError("kaputt")
+
+        try:
+            await scheduler.submit(fail)
+        finally:
+            await scheduler.stop()
+
+    with pytest.raises(ValueError):
+        asyncio.run(scenario())
+
+
+def test_cancelled_call_resolves_the_future():
+    async def scenario():
+        scheduler = RequestScheduler()
+
+        async def cancelled():
+            raise asyncio.CancelledError()
+
+        try:
+            await asyncio.wait_for(scheduler.submit(cancelled), 1)
+        finally:
+            await scheduler.stop()
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(scenario())
+
+
+def test_stop_cancels_running_requests_and_allows_restart():
+    async def first_loop(scheduler):
+        started = asyncio.Event()
+
+        async def hang():
+            started.set()
+            await asyncio.sleep(10)
+
+        pending = asyncio.create_task(scheduler.submit(hang))
+        await started.wait()
+        await scheduler.stop()
+        with pytest.raises(asyncio.CancelledError):
+            await pending
+        return scheduler.stats()['in_flight']
+
+    async def second_loop(scheduler):
+        async def ok():
+            return 'ok'
+        try:
+            return await scheduler.submit(ok)
+        finally:
+            await scheduler.stop()
+
+    scheduler = RequestScheduler()
+    assert asyncio.run(first_loop(scheduler)) == 0
+    # Neuer Event Loop (z.B. Bot-Neustart aus der GUI)
+    assert asyncio.run(second_loop(scheduler)) == 'ok'
+
+
+def test_rate_limit_log_counts_each_429_once():
+    async def scenario():
+        scheduler = RequestScheduler()
+
+        async def noop():
+            return None
+
+        await scheduler.submit(noop)
+        log = logging.getLogger('discord.http')
+        log.warning('We are being rate limited. %s %s responded with 429. Retrying in %.2f seconds.', 'POST', '/x', 1.0)
+        log.warning('Global rate limit has been hit. Retrying in %.2f seconds.', 1.0)
+        log.warning('Something else with 429 in it')
+        await scheduler.stop()
+        log.warning('We are being rate limited. %s %s responded with 429. Retrying in %.2f seconds.', 'POST', '/x', 1.0)
+        return scheduler.rate_limited
+
+    assert asyncio.run(scenario()) == 1
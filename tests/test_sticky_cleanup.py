@@ -0,0 +1,78 @@
+"""
+Tests für das Erkennen und Aufräumen alter Stickies
+"""
+import asyncio
+from types import SimpleNamespace
+
+import discord
+
+from src.utils.sticky_cleanup import bulk_delete, is_sticky_message
+from src.utils.sticky_embeds import build_sticky_embed
+
+BOT = object()
+
+
+class DirectRequests:
+    async def submit(self, call, priority=None, channel_id=None):
+        return await call()
+
+
+class FakeChannel:
+    def __init__(self, manage_messages):
+        self.id = 1
+        self.guild = SimpleNamespace(me=object())
+        self.manage_messages = manage_messages
+        self.bulk = []
+        self.single = []
+
+    def permissions_for(self, member):
+        return SimpleNamespace(manage_messages=self.manage_messages)
+
+    async def delete_messages(self, messages):
+        self.bulk.append([message.id for message in messages])
+
+    def get_partial_message(self, message_id):
+        async def delete():
+            self.single.append(message_id)
+        return SimpleNamespace(delete=delete)
+
+
+def recent_ids(count):
+    now = discord.utils.time_snowflake(discord.utils.utcnow())
+    return [now - index for index in range(count)]
+
+
+def test_sticky_detection_ignores_the_title():
+    embed = build_sticky_embed({'title': "Alter Titel", 'message': "Text"})
+    assert is_sticky_message(SimpleNamespace(author=BOT, embeds=[embed], interaction_metadata=None), BOT)
+    assert not is_sticky_message(SimpleNamespace(author=BOT, embeds=[], interaction_metadata=None), BOT)
+    assert not is_sticky_message(SimpleNamespace(author=object(), embeds=[embed], interaction_metadata=None), BOT)
+    assert not is_sticky_message(SimpleNamespace(author=BOT, embeds=[embed], interaction_metadata=object()), BOT)
+
+
+def test_other_bot_embeds_are_not_stickies():
+    # z.B. Hinweis nach der Wiederherstellung aus dem Archiv (Events.on_guild_join)
+    notice = discord.Embed(title="🔄 Sticky Messages wiederhergestellt!", description="...", color=0x00ff00)
+    notice.set_footer(text="💾 Daten werden automatisch 24h nach Bot-Kick gespeichert")
+    plain = discord.Embed(title="Ohne Farbe")
+
+    for embed in (notice, plain):
+        assert not is_sticky_message(SimpleNamespace(author=BOT, embeds=[embed], interaction_metadata=None), BOT)
+
+
+def test_bulk_delete_uses_chunks_with_manage_messages():
+    channel = FakeChannel(manage_messages=True)
+    ids = recent_ids(150)
+
+    assert asyncio.run(bulk_delete(channel, ids, DirectRequests())) == 150
+    assert [len(chunk) for chunk in channel.bulk] == [100, 50]
+    assert channel.single == []
+
+
+def test_bulk_delete_falls_back_to_single_deletes_without_permission():
+    channel = FakeChannel(manage_messages=False)
+    ids = recent_ids(3)
+
+    assert asyncio.run(bulk_delete(channel, ids, DirectRequests())) == 3
+    assert channel.bulk == []
+    assert channel.single == ids
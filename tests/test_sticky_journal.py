@@ -0,0 +1,90 @@
+"""
+Tests für das Sticky-Journal und seine Kompaktierung
+"""
+import os
+
+import pytest
+
+import src.utils.secure_storage as secure_storage
+from src.utils.secure_storage import SecureStorage, get_sticky_guild_id
+from src.utils.sticky_journal import StickyJournal
+from src.utils.sticky_store import StickyStore
+
+TOKEN = "test-token"
+JOURNAL_FILE = "data/sticky_journal.log"
+
+
+def sticky(title, guild_id="1"):
+    return {'title': title, 'message': 'Text', 'delay': 10, 'channel_name': title, 'guild_id': guild_id}
+
+
+@pytest.fixture
+def journal(app_path):
+    return StickyJournal(JOURNAL_FILE, SecureStorage(TOKEN))
+
+
+def test_replay_applies_changes_in_order_and_is_idempotent(journal):
+    assert journal.append({'10': sticky('a'), '11': sticky('b')}) == 2
+    assert journal.append({'10': sticky('a2'), '11': None}) == 4
+
+    snapshot = {'11': sticky('alt'), '12': sticky('c')}
+    once = journal.replay(dict(snapshot))
+    twice = journal.replay(journal.replay(dict(snapshot)))
+
+    assert once == {'10': sticky('a2'), '12': sticky('c')}
+    assert twice == once
+
+
+def test_replay_for_one_guild_drops_moved_channels(journal):
+    journal.append({'10': sticky('a', guild_id='1'), '11': sticky('b', guild_id='2')})
+    journal.append({'10': sticky('a', guild_id='2')})
+
+    guild_one = journal.replay({'10': sticky('a')}, '1', get_sticky_guild_id)
+    assert guild_one == {}
+
+
+def test_torn_last_line_is_skipped_and_later_appends_survive(journal):
+    journal.append({'10': sticky('a')})
+    with open(journal.path, 'a', encoding='utf-8') as f:
+        f.write('gAAAAabgebrochen')
+
+    assert journal.append({'11': sticky('b')}) == 2
+    assert journal.replay({}) == {'10': sticky('a'), '11': sticky('b')}
+    assert len(journal.records()) == 2
+
+
+def test_truncate_empties_the_journal(journal):
+    journal.append({'10': sticky('a')})
+
+    assert journal.truncate()
+    assert not os.path.exists(journal.path)
+    assert journal.record_count() == 0
+    assert journal.replay({'12': sticky('c')}) == {'12': sticky('c')}
+
+
+def test_compaction_moves_journal_into_records_without_reload(app_path):
+    store = StickyStore(TOKEN, check_interval=0)
+    store.refresh(force=True)
+    store.data['10'] = sticky('a')
+    store.data['11'] = sticky('b', guild_id='2')
+    store.save()
+    assert store.flush()
+
+    store.data['10']['title'] = 'a2'
+    del store.data['11']
+    store.save('10', '11')
+    assert store.flush()
+    journal = secure_storage.get_sticky_journal(TOKEN)
+    assert journal.record_count() == 2
+
+    assert secure_storage.compact_sticky_journal_secure(TOKEN)
+    assert journal.record_count() == 0
+    assert not os.path.exists(journal.path)
+
+    # Eigene Kompaktierung ändert nur die Dateien, nicht den Inhalt
+    assert not store.is_stale()
+    assert not store.refresh()
+
+    fresh = StickyStore(TOKEN)
+    fresh.refresh(force=True)
+    assert fresh.data.to_dict() == {'10': {**sticky('a'), 'title': 'a2'}}
@@ -0,0 +1,163 @@
+"""
+Tests für LazyRecords, das binäre v2 Format und Record-Dateien
+"""
+import base64
+
+import pytest
+
+from src.utils.secure_storage import SecureStorage, FORMAT_MAGIC, FLAG_ZLIB, _FORMAT_HEADER
+from src.utils.sticky_records import (
+    LazyRecords,
+    build_record_file,
+    discard_record,
+    make_summary,
+    read_record_file
+)
+
+TOKEN = "test-token"
+
+
+@pytest.fixture
+def storage():
+    return SecureStorage(TOKEN)
+
+
+def sticky(title, guild_id="1", **extra):
+    return {'title': title, 'delay': 10, 'channel_name': f"#{title}", 'guild_id': guild_id, **extra}
+
+
+def encrypted_records(storage, entries):
+    records = LazyRecords(storage.decrypt_bytes)
+    for channel_id, data in entries.items():
+        records.add_encrypted(channel_id, storage.encrypt_bytes(data), data['guild_id'], make_summary(data))
+    return records
+
+
+def test_entries_are_decrypted_once_on_access(storage):
+    records = encrypted_records(storage, {'10': sticky('a'), '11': sticky('b')})
+
+    assert records.decrypted == 0
+    assert not records.is_loaded('10')
+    assert records.summary('10')['title'] == 'a'
+    assert records.decrypted == 0
+
+    assert records['10']['title'] == 'a'
+    assert records['10']['title'] == 'a'
+    assert records.decrypted == 1
+    assert records.is_loaded('10')
+
+
+def test_pop_returns_decrypted_entry(storage):
+    records = encrypted_records(storage, {'10': sticky('a')})
+
+    assert records.pop('10') == sticky('a')
+    assert '10' not in records
+    assert records.pop('10', 'fehlt') == 'fehlt'
+    with pytest.raises(KeyError):
+        records.pop('10')
+
+
+def test_discard_removes_without_decrypting(storage):
+    records = encrypted_records(storage, {'10': sticky('a'), '11': sticky('b')})
+
+    records.discard('10')
+    records.discard('unbekannt')
+    discard_record(records, '11')
+
+    assert len(records) == 0
+    assert records.decrypted == 0
+
+    plain = {'10': sticky('a')}
+    discard_record(plain, '10')
+    assert plain == {}
+
+
+def test_reusable_blob_only_for_unchanged_entries(storage):
+    records = encrypted_records(storage, {'10': sticky('a')})
+    blob = records.reusable_blob('10')
+    assert blob is not None
+
+    records['10']
+    assert records.reusable_blob('10') == blob
+
+    records['10']['title'] = 'geändert'
+    assert records.reusable_blob('10') is None
+
+
+def test_snapshot_is_independent_of_live_data(storage):
+    records = encrypted_records(storage, {'10': sticky('a'), '11': sticky('b')})
+    records['10']
+
+    clone = records.snapshot()
+    records['10']['title'] = 'geändert'
+    records.discard('11')
+
+    assert clone['10']['title'] == 'a'
+    assert clone['11']['title'] == 'b'
+
+
+def test_v2_header_round_trip(storage):
+    small = {'title': 'kurz'}
+    large = {'description': 'x' * 2000}
+
+    small_blob = storage.encrypt_bytes(small)
+    large_blob = storage.encrypt_bytes(large)
+
+    assert small_blob.startswith(FORMAT_MAGIC)
+    _, version, key_id, flags = _FORMAT_HEADER.unpack_from(large_blob)
+    assert version == 2
+    assert key_id == storage.key_id
+    assert flags & FLAG_ZLIB
+    assert not _FORMAT_HEADER.unpack_from(small_blob)[3] & FLAG_ZLIB
+
+    assert storage.decrypt_bytes(small_blob) == small
+    assert storage.decrypt_bytes(large_blob) == large
+    assert not storage.last_load_legacy
+
+
+def test_v2_rejects_other_key_and_reads_legacy_text(storage):
+    blob = storage.encrypt_bytes({'a': 1})
+    assert SecureStorage("anderer-token").decrypt_bytes(blob) is None
+
+    legacy = storage.encrypt_data({'a': 1}).encode('utf-8')
+    assert storage.decrypt_bytes(legacy) == {'a': 1}
+    assert storage.last_load_legacy
+
+
+def test_legacy_double_base64_and_unknown_version(storage):
+    # Altes Textformat: Fernet-Token zusätzlich base64-kodiert
+    legacy = base64.b64encode(storage.encrypt_data({'a': 1}).encode('ascii'))
+    assert storage.decrypt_data(legacy.decode('ascii')) == {'a': 1}
+    assert storage.decrypt_bytes(legacy + b'\n') == {'a': 1}
+    assert storage.last_load_legacy
+
+    blob = bytearray(storage.encrypt_bytes({'a': 1}))
+    blob[len(FORMAT_MAGIC)] = 3
+    assert storage.decrypt_bytes(bytes(blob)) is None
+
+
+def test_record_file_round_trip(storage, tmp_path):
+    data = {'10': sticky('a'), '11': sticky('b', description='y' * 500)}
+    entries = [(channel_id, storage.encrypt_bytes(value), make_summary(value)) for channel_id, value in data.items()]
+
+    path = tmp_path / 'sticky.rec'
+    path.write_bytes(build_record_file(entries, storage))
+
+    records = LazyRecords(storage.decrypt_bytes)
+    read = read_record_file(str(path), storage, '1', records)
+
+    assert [channel_id for channel_id, _, _ in read] == ['10', '11']
+    assert records.decrypted == 0
+    assert records.summary('11') == make_summary(data['11'])
+    assert records.guild_of('10', lambda value: None) == '1'
+    assert records.to_dict() == data
+
+
+def test_record_file_missing_or_corrupt(storage, tmp_path):
+    records = LazyRecords(storage.decrypt_bytes)
+    assert read_record_file(str(tmp_path / 'fehlt.rec'), storage, '1', records) is None
+
+    corrupt = tmp_path / 'kaputt.rec'
+    corrupt.write_bytes(b'XXXX' + b'\0' * 16)
+    assert read_record_file(str(corrupt), storage, '1', records) is None
+    assert len(records) == 0
@@ -0,0 +1,49 @@
+"""
+Tests für den zentralen Repost-Timer
+"""
+import asyncio
+
+from src.utils.sticky_scheduler import StickyScheduler
+
+
+def test_due_channels_are_dispatched_in_order():
+    async def scenario():
+        dispatched = []
+
+        async def dispatch(channel_id):
+            dispatched.append(channel_id)
+
+        scheduler = StickyScheduler(dispatch)
+        scheduler.start()
+        scheduler.schedule('b', 0.05)
+        scheduler.schedule('a', 0.01)
+        scheduler.schedule('c', 0.02)
+        scheduler.cancel('c')
+        await asyncio.sleep(0.2)
+        await scheduler.stop()
+        return dispatched
+
+    assert asyncio.run(scenario()) == ['a', 'b']
+
+
+def test_stop_cancels_and_awaits_running_reposts():
+    async def scenario():
+        started = asyncio.Event()
+        cancelled = []
+
+        async def dispatch(channel_id):
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(channel_id)
+                raise
+
+        scheduler = StickyScheduler(dispatch)
+        scheduler.start()
+        scheduler.schedule('a', 0)
+        await asyncio.wait_for(started.wait(), 1)
+        await scheduler.stop()
+        return cancelled, scheduler.stats()['running']
+
+    assert asyncio.run(scenario()) == (['a'], 0)
@@ -0,0 +1,103 @@
+"""
+Tests für den In-Memory Sticky Store
+"""
+from src.utils.sticky_store import StickyStore
+
+TOKEN = "test-token"
+
+
+def sticky(title, guild_id="1"):
+    return {'title': title, 'message': 'Text', 'delay': 10, 'channel_name': title, 'guild_id': guild_id}
+
+
+def test_message_ids_are_kept_out_of_the_sticky_records(app_path):
+    store = StickyStore(TOKEN, message_id_delay=60)
+    store.refresh(force=True)
+    store.data['10'] = sticky('a')
+    store.save('10')
+    assert store.flush()
+    writes = store.writer.writes
+
+    store.set_message_id('10', 111)
+    store.set_message_id('10', 222)
+
+    # Ein Repost schreibt weder Journal noch Datensätze
+    assert store.writer.writes == writes
+    assert not store.writer.pending()
+    assert store.message_id('10') == '222'
+    assert 'last_message_id' not in store.data['10']
+
+    assert store.flush()
+    reloaded = StickyStore(TOKEN)
+    reloaded.refresh(force=True)
+    assert reloaded.message_id('10') == '222'
+
+
+def test_message_id_falls_back_to_config_and_skips_removed_channels(app_path):
+    store = StickyStore(TOKEN, message_id_delay=60)
+    store.refresh(force=True)
+    store.data['10'] = {**sticky('a'), 'last_message_id': '5'}
+    store.data['11'] = sticky('b')
+    store.save()
+    assert store.message_id('10') == '5'
+
+    store.set_message_id('11', 7)
+    del store.data['11']
+    store.save('11')
+    store.set_message_id('10', 6)
+    assert store.flush()
+
+    reloaded = StickyStore(TOKEN)
+    reloaded.refresh(force=True)
+    assert reloaded.message_id('10') == '6'
+    assert reloaded.message_id('11') is None
+
+
+def test_periodic_check_does_not_scan_guild_shards(app_path, monkeypatch):
+    import src.utils.secure_storage as secure_storage
+
+    store = StickyStore(TOKEN, check_interval=0)
+    store.refresh(force=True)
+
+    scans = []
+    original = secure_storage.get_sticky_guild_stamps
+    monkeypatch.setattr(secure_storage, 'get_sticky_guild_stamps', lambda: scans.append(1) or original())
+
+    for _ in range(3):
+        assert not store.is_stale()
+    assert scans == []
+
+
+def test_reload_is_loaded_first_and_applied_separately(app_path):
+    store = StickyStore(TOKEN)
+    store.refresh(force=True)
+    store.data['10'] = sticky('a')
+    store.data['20'] = sticky('b', guild_id="2")
+    store.save()
+    assert store.flush()
+
+    other = StickyStore(TOKEN)
+    other.refresh(force=True)
+    store.data['20'] = sticky('c', guild_id="2")
+    del store.data['10']
+    store.save('10', '20')
+    assert store.flush()
+
+    # Laden verändert die Live-Daten nicht - erst apply_changes übernimmt den Stand
+    assert other.needs_refresh()
+    loaded = other.load_changes()
+    assert other.data['20']['title'] == 'b' and '10' in other.data
+    assert other.apply_changes(loaded)
+    assert other.data.to_dict() == {'20': sticky('c', guild_id="2")}
+    assert other.channels_for_guild('1') == set()
+
+
+def test_reload_is_dropped_after_local_change(app_path):
+    store = StickyStore(TOKEN, write_delay=60)
+    store.refresh(force=True)
+    loaded = store.load_changes(force=True)
+
+    store.data['10'] = sticky('a')
+    store.save('10')
+    assert not store.apply_changes(loaded)
+    assert '10' in store.data
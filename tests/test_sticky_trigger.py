@@ -0,0 +1,30 @@
+"""
+Tests für das Eingabeformat "Sekunden/Nachrichten" der Sticky-Auslöser
+"""
+import pytest
+
+from src.utils.sticky_trigger import parse_trigger, format_trigger, apply_trigger, DEFAULT_DELAY
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("20", (20, None)),
+    ("20/10", (20, 10)),
+    (" 20 / 10 ", (20, 10)),
+    ("/10", (0, 10)),
+    ("0/10", (0, 10)),
+    ("/", (DEFAULT_DELAY, None)),
+    ("", (DEFAULT_DELAY, None)),
+])
+def test_parse_trigger(text, expected):
+    assert parse_trigger(text) == expected
+
+
+@pytest.mark.parametrize("text", ["0/0", "0", "3", "/1", "abc", "20/x", "-5/10"])
+def test_parse_trigger_rejects_invalid_input(text):
+    with pytest.raises(ValueError):
+        parse_trigger(text)
+
+
+@pytest.mark.parametrize("text", ["20", "20/10", "/10"])
+def test_format_round_trip(text):
+    assert format_trigger(apply_trigger({}, *parse_trigger(text))) == text